@@ -0,0 +1,993 @@
+import numpy as np
+import pandas as pd
+
+from helper_functions import (SHIP_TYPES, ICE_CLASSES, PROPULSION_TYPES,
+                              ENGINE_STROKES, SPEED_POWER_EQUS, CALC_PREFS,
+                              load_variables, load_cf_dict, load_me_data, load_ae_data)
+from fuel_functions import (NO_FUEL, fuel_codes, fuel_registry, engine_fuel_codes,
+                            power_by_fuel, tank_volumes, gas_fuel_ratios)
+
+# Vectorised versions of the calculation in helper_functions.py. Every
+# function takes NumPy arrays with one element per ship and returns arrays of
+# the same length. String inputs (ship type, ice class, propulsion type) are
+# converted once to integer codes so branching becomes a masked select.
+#
+# Functions keep the names of their scalar counterparts, so import the module
+# as a namespace:
+#     import batch_functions as bf
+
+
+ENGINE_COLUMNS = ['engine_number', 'engine_type', 'mcr', 'limited_power', 'liquid_fuel_type',
+                  'pilot_fuel_type', 'gas_fuel_type', 'sfc_liquid_fuel',
+                  'sfc_pilot_fuel', 'sfc_gas_fuel_kj']
+FUEL_TYPES = ('liquid', 'pilot', 'gas')
+#engine columns gathered from the cf table for each fuel type, with the cf
+#table column (0 lcv, 1 cf)
+FUEL_COLUMNS = {'liquid': (('cf_liquid_fuel', 1),),
+                'pilot': (('cf_pilot_fuel', 1),),
+                'gas': (('lcv_gas_fuel', 0), ('cf_gas_fuel', 1))}
+
+def _code(values, categories:tuple)->np.ndarray:
+    """convert labels to integer codes. Unknown labels become -1"""
+    if isinstance(values, np.ndarray) and values.dtype.kind in 'iu':
+        return values
+    return pd.Categorical(np.atleast_1d(values), categories=categories).codes.astype(np.int64)
+
+def ship_type_codes(ship_type)->np.ndarray:
+    """convert ship type names to codes into SHIP_TYPES"""
+    return _code(ship_type, SHIP_TYPES)
+
+def ice_class_codes(ice_class)->np.ndarray:
+    """convert ice class names to codes into ICE_CLASSES. '-' and 'none' become -1"""
+    return _code(ice_class, ICE_CLASSES)
+
+def propulsion_codes(me_type)->np.ndarray:
+    """convert propulsion type names to codes into PROPULSION_TYPES"""
+    return _code(me_type, PROPULSION_TYPES)
+
+def _st(name:str)->int:
+    return SHIP_TYPES.index(name)
+
+def _is_standard(me_type:np.ndarray)->np.ndarray:
+    return ((me_type == 0) | (me_type == 1) | (me_type == 3))
+
+def _positive(*args)->np.ndarray:
+    out = True
+    for v in args:
+        out = out & (np.asarray(v) > 0)
+    return out
+
+def capacity_calc(dwt:np.ndarray, ship_type:np.ndarray)->np.ndarray:
+    """vectorised capacity_calc
+
+    Args:
+        dwt (np.ndarray): deadweight of the ships in tonnes
+        ship_type (np.ndarray): ship type codes
+
+    Returns:
+        np.ndarray: deadweight used in EEDI calculation
+    """
+    return np.where(ship_type == _st('container_ship'), dwt * 0.7, dwt)
+
+def main_engine_power(mcr_me:np.ndarray,
+                      me_type:np.ndarray,
+                      pto_dediction:np.ndarray=0,
+                      electrical_eff:np.ndarray=0.913)->np.ndarray:
+    """vectorised main_engine_power
+
+    Args:
+        mcr_me (np.ndarray): total ME installed power in kW
+        me_type (np.ndarray): propulsion type codes
+        pto_dediction (np.ndarray, optional): corrections applied for pto
+            in kW. Defaults to 0.
+        electrical_eff (np.ndarray, optional): electrical efficiency for
+            diesel electric propulsion. Defaults to 0.913.
+
+    Returns:
+        np.ndarray: Pme - main engine power for the EEDI calculation
+    """
+    me_75 = np.select(
+        [(me_type == 0) | (me_type == 1),
+         me_type == 2,
+         me_type == 3],
+        [mcr_me * 0.75,
+         mcr_me * 0.83,
+         (mcr_me * 0.83) / electrical_eff],
+        np.nan)
+    return me_75 - pto_dediction
+
+def shaft_gen_reduc_to_me(pae:np.ndarray,
+                          p_pto:np.ndarray,
+                          me_type:np.ndarray)->np.ndarray:
+    """vectorised shaft_gen_reduc_to_me"""
+    reduction = np.minimum(pae / 0.75, p_pto * 0.75)
+    return np.select([_is_standard(me_type), me_type == 2],
+                     [reduction * 0.75, reduction * 0.83], np.nan)
+
+def p_pto_calc(p_pto_rated:np.ndarray,
+               me_type:np.ndarray)->np.ndarray:
+    """vectorised p_pto_calc"""
+    return np.select([_is_standard(me_type), me_type == 2],
+                     [p_pto_rated * 0.75, p_pto_rated * 0.83], np.nan)
+
+def shaft_motor_power(p_sm_rated:np.ndarray,
+                      me_type:np.ndarray,
+                      mpp:np.ndarray,
+                      gen_efficiency:np.ndarray=0.93,
+                      pti_eff:np.ndarray=0.97)->tuple:
+    """vectorised shaft_motor_power
+
+    Args:
+        p_sm_rated (np.ndarray): rated power consumption of all shaft motors
+            in kW
+        me_type (np.ndarray): propulsion type codes
+        mpp (np.ndarray): rated output of the electrical propulsion motors
+            in kW
+        gen_efficiency (np.ndarray, optional): weighted efficiency of the
+            generators. Defaults to 0.93.
+        pti_eff (np.ndarray, optional): efficiency of the shaft motors.
+            Defaults to 0.97.
+
+    Returns:
+        tuple: p_pti, p_pti_shaft
+    """
+    standard = _is_standard(me_type)
+    steam = me_type == 2
+    factor = np.select([standard, steam], [0.75, 0.83], np.nan)
+    motor = (p_sm_rated * factor) / (gen_efficiency * pti_eff)
+    p_pti = np.select(
+        [mpp == 0, mpp > 0],
+        [(p_sm_rated * factor) / gen_efficiency, motor], 0.)
+    p_pti_shaft = np.select(
+        [(mpp == 0) & (standard | steam), mpp > 0],
+        [p_sm_rated * pti_eff * 0.75, motor], np.where(mpp < 0, 0., np.nan))
+    return p_pti, p_pti_shaft
+
+def reliqu_addition(cube:np.ndarray,
+                    bor:np.ndarray,
+                    cop_cooling:np.ndarray=0.166,
+                    r_reliq:np.ndarray=1)->np.ndarray:
+    """vectorised reliqu_addition"""
+    cop_reliq = (425 * 511) / (24 * 3600 * cop_cooling)
+    return cube * bor / 100 * cop_reliq * r_reliq
+
+def fuel_compressor(ship_type:np.ndarray,
+                    me_engine_stroke:np.ndarray,
+                    sfc_me_gas_mode:np.ndarray,
+                    p_me:np.ndarray,
+                    cop_comp:np.ndarray=0.33)->np.ndarray:
+    """vectorised fuel_compressor
+
+    Args:
+        ship_type (np.ndarray): ship type codes
+        me_engine_stroke (np.ndarray): codes into ENGINE_STROKES
+        sfc_me_gas_mode (np.ndarray): sfc of main engine in gas mode in g/kWh
+        p_me (np.ndarray): main engine power in kW
+        cop_comp (np.ndarray, optional): design power performance of
+            compressors in kWh/kg. Defaults to 0.33.
+
+    Returns:
+        np.ndarray: additional auxiliary power load in kW
+    """
+    lng = ship_type == _st('lng_carrier')
+    return np.select(
+        [lng & (me_engine_stroke == 0), lng & (me_engine_stroke == 1), lng],
+        [(p_me / 1000) * cop_comp * sfc_me_gas_mode, p_me * 0.02, np.nan],
+        0.)
+
+def calc_pae(mcr_me:np.ndarray,
+             p_pti:np.ndarray=0)->np.ndarray:
+    """vectorised calc_pae"""
+    limit = mcr_me + (p_pti / 0.75)
+    return np.where(limit >= 10000, (limit * 0.025) + 250, limit * 0.05)
+
+def p_ae_iterative_calc(ship_type:np.ndarray,
+                        mcr_me:np.ndarray,
+                        me_type:np.ndarray,
+                        p_sm_rated:np.ndarray,
+                        mpp:np.ndarray,
+                        p_pto_rated:np.ndarray,
+                        cube:np.ndarray,
+                        me_engine_stroke:np.ndarray,
+                        sfc_me_gas_mode:np.ndarray,
+                        electrical_eff:np.ndarray=0.913,
+                        gen_efficiency:np.ndarray=0.93,
+                        pti_eff:np.ndarray=0.97,
+                        bor:np.ndarray=0,
+                        cop_cooling:np.ndarray=0.166,
+                        r_reliq:np.ndarray=1,
+                        cop_comp:np.ndarray=0.33,
+                        add_load:np.ndarray=0,
+                        tol:float=1e-10,
+                        max_iter:int=50,
+                        return_iterations:bool=False)->np.ndarray:
+    """vectorised p_ae_iterative_calc
+
+    See helper_functions.p_ae_iterative_calc for the meaning of the
+    arguments. ship_type, me_type and me_engine_stroke are integer codes.
+    Only the ships whose pae has not yet converged are updated in each
+    iteration.
+
+    Returns:
+        np.ndarray: ae power with additional ae loads such as reliq system.
+            If return_iterations is True, a tuple of (ae power, iterations
+            used by each ship)
+    """
+    mcr = np.where((me_type == 3) & (mpp > 0), mpp, mcr_me)
+    pme = main_engine_power(mcr_me = mcr,
+                            me_type = me_type,
+                            pto_dediction = 0,
+                            electrical_eff = electrical_eff)
+    reliq = reliqu_addition(cube = cube,
+                            bor = bor,
+                            cop_cooling = cop_cooling,
+                            r_reliq = r_reliq)
+    p_sm = shaft_motor_power(p_sm_rated = p_sm_rated,
+                             me_type = me_type,
+                             mpp = mpp,
+                             gen_efficiency = gen_efficiency,
+                             pti_eff = pti_eff)[0]
+    base = calc_pae(mcr_me = mcr, p_pti = p_sm) + reliq + add_load
+
+    #only lng carriers with a shaft generator couple pae and pme
+    compressors = fuel_compressor(ship_type = ship_type,
+                                  me_engine_stroke = me_engine_stroke,
+                                  sfc_me_gas_mode = sfc_me_gas_mode,
+                                  p_me = pme,
+                                  cop_comp = cop_comp)
+    pae = np.asarray(base + compressors, dtype=float)
+    n = np.broadcast_shapes(pae.shape, np.shape(ship_type), np.shape(p_pto_rated))
+    pae = np.broadcast_to(pae, n).copy()
+    iterations = np.ones(n, dtype=int)
+    active = np.broadcast_to((ship_type == _st('lng_carrier')) & (p_pto_rated > 0), n)
+    idx = np.flatnonzero(active)
+
+    arg = lambda x: np.broadcast_to(x, n).ravel()[idx]
+    flat = pae.reshape(-1)
+    for i in range(2, max_iter + 1):
+        if len(idx) == 0:
+            break
+        pme = main_engine_power(
+            mcr_me = arg(mcr),
+            me_type = arg(me_type),
+            pto_dediction = shaft_gen_reduc_to_me(flat[idx], arg(p_pto_rated),
+                                                  arg(me_type)),
+            electrical_eff = arg(electrical_eff))
+        compressors = fuel_compressor(ship_type = arg(ship_type),
+                                      me_engine_stroke = arg(me_engine_stroke),
+                                      sfc_me_gas_mode = arg(sfc_me_gas_mode),
+                                      p_me = pme,
+                                      cop_comp = arg(cop_comp))
+        new = arg(base) + compressors
+        done = np.abs(new - flat[idx]) <= tol * np.abs(new)
+        flat[idx] = new
+        iterations.reshape(-1)[idx] = i
+        idx = idx[~done]
+
+    if return_iterations:
+        return pae, iterations
+    return pae
+
+def update_vref(v_ref:np.ndarray,
+                p_me_deduct:np.ndarray,
+                p_sm_rated:np.ndarray,
+                p_pto_rated:np.ndarray,
+                v_ref_override:np.ndarray,
+                speed_power_equ:np.ndarray,
+                speed_power_a:np.ndarray,
+                speed_power_b:np.ndarray,
+                speed_power_c:np.ndarray)->np.ndarray:
+    """vectorised update_vref
+
+    Args:
+        v_ref (np.ndarray): reference speed from the inputs in knots
+        p_me_deduct (np.ndarray): main engine power corrected for PTO and PTI
+            in kW
+        p_sm_rated (np.ndarray): rated power of the shaft motors in kW
+        p_pto_rated (np.ndarray): rated power of the shaft generators in kW
+        v_ref_override (np.ndarray): reference speed override in knots
+        speed_power_equ (np.ndarray): codes into SPEED_POWER_EQUS
+        speed_power_a (np.ndarray): speed-power coefficient a
+        speed_power_b (np.ndarray): speed-power coefficient b
+        speed_power_c (np.ndarray): speed-power coefficient c
+
+    Returns:
+        np.ndarray: reference speed in knots
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        v_calc = np.select(
+            [v_ref_override > 0,
+             speed_power_equ == 0,
+             speed_power_equ == 1,
+             speed_power_equ == 2],
+            [v_ref_override,
+             (p_me_deduct / speed_power_a) ** (1 / speed_power_b),
+             ((p_me_deduct - speed_power_a) ** (1 / 3)
+              / speed_power_b ** (1 / 3)),
+             ((p_me_deduct - speed_power_a) ** (1 / speed_power_b)
+              / speed_power_c ** (1 / speed_power_b))],
+            np.nan)
+    return np.where((p_sm_rated > 0) | (p_pto_rated > 0), v_calc, v_ref)
+
+def ice_class_correction(ship_type:np.ndarray,
+                         ice_class:np.ndarray,
+                         mcr:np.ndarray,
+                         dwt:np.ndarray)->np.ndarray:
+    """vectorised ice_class_correction
+
+    Args:
+        ship_type (np.ndarray): ship type codes
+        ice_class (np.ndarray): ice class codes
+        mcr (np.ndarray): sum of maximum continuous rating of main engines
+            in kW
+        dwt (np.ndarray): deadweight tonnes of ship in tonnes
+
+    Returns:
+        np.ndarray: ice class power correction factor, fj
+    """
+    # coefficients (a, b) of a * dwt ** b, one row per ship type and one
+    # column per ice class in the order of ICE_CLASSES
+    fj_0_coef = {'tanker': (17.444, 0.5766),
+                 'bulk_carrier': (17.207, 0.5705),
+                 'general_cargo': (1.974, 0.7987),
+                 'refrigerated_cargo': (5.598, 0.696)}
+    fj_min_coef = {'tanker': [(0.2488, 0.0903), (0.4541, 0.0524),
+                              (0.7783, 0.0145), (0.8741, 0.0079)],
+                   'bulk_carrier': [(0.2515, 0.0851), (0.3918, 0.0556),
+                                    (0.8075, 0.0071), (0.8573, 0.0087)],
+                   'general_cargo': [(0.1381, 0.1435), (0.1574, 0.1440),
+                                     (0.3256, 0.0922), (0.4966, 0.0583)],
+                   'refrigerated_cargo': [(0.5254, 0.0357), (0.6325, 0.0278),
+                                          (0.7670, 0.0159), (0.8918, 0.0079)]}
+    n_ship = len(SHIP_TYPES)
+    a_0 = np.full(n_ship, np.nan)
+    b_0 = np.zeros(n_ship)
+    a_min = np.ones((n_ship, len(ICE_CLASSES) + 1))
+    b_min = np.zeros((n_ship, len(ICE_CLASSES) + 1))
+    for name, (a, b) in fj_0_coef.items():
+        a_0[_st(name)], b_0[_st(name)] = a, b
+        for j, (a, b) in enumerate(fj_min_coef[name]):
+            a_min[_st(name), j], b_min[_st(name), j] = a, b
+
+    # code -1 (unknown ship type or no ice class) selects the last row/column
+    st = np.where(ship_type >= 0, ship_type, n_ship - 1)
+    ic = np.where(ice_class >= 0, ice_class, len(ICE_CLASSES))
+    known = np.isin(ship_type, [_st(k) for k in fj_0_coef])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fj_0 = np.where(known, a_0[st] * dwt ** b_0[st] / mcr, 1.)
+        fj_min = np.where(known, a_min[st, ic] * dwt ** b_min[st, ic], 1.)
+    return np.minimum(np.maximum(fj_0, fj_min), 1)
+
+def roro_correction(ship_type:np.ndarray,
+                    l:np.ndarray,
+                    b:np.ndarray,
+                    d:np.ndarray,
+                    disp_m3:np.ndarray,
+                    v_ref:np.ndarray,
+                    g:float=9.81)->np.ndarray:
+    """vectorised roro_correction"""
+    passenger = ship_type == _st('roro_passenger')
+    alpha = np.where(passenger, 2.5, 2.)
+    beta = np.where(passenger, 0.75, 0.5)
+    gamma = 0.75
+    delta = 1.
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fn = (0.5144 * v_ref) / ((l * g) ** 0.5)
+        fj_calc = (1
+                   / ((fn ** alpha)
+                      * ((l / b) ** beta)
+                      * ((b / d) ** gamma)
+                      * ((l / disp_m3 ** (1 / 3)) ** delta)))
+    fj_calc = np.where(passenger | (ship_type == _st('roro_cargo')), fj_calc, 1.)
+    return np.minimum(fj_calc, 1)
+
+def general_cargo_correction(ship_type:np.ndarray,
+                             l:np.ndarray,
+                             b:np.ndarray,
+                             d:np.ndarray,
+                             disp_m3:np.ndarray,
+                             v_ref:np.ndarray,
+                             g:float=9.81)->np.ndarray:
+    """vectorised general_cargo_correction"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fn_disp = np.minimum((0.5144 * v_ref) / (g * disp_m3 ** (1 / 3)) ** 0.5, 0.6)
+        cb = disp_m3 / (l * b * d)
+        fj_calc = 0.174 / (fn_disp ** 2.3 * cb ** 0.3)
+    fj_calc = np.where(ship_type == _st('general_cargo'), fj_calc, 1.)
+    return np.minimum(fj_calc, 1)
+
+def fj(ship_type:np.ndarray,
+       ice_class:np.ndarray,
+       mcr:np.ndarray,
+       dwt:np.ndarray,
+       propulsion_redundancy:np.ndarray,
+       l:np.ndarray,
+       b:np.ndarray,
+       d:np.ndarray,
+       disp_m3:np.ndarray,
+       v_ref:np.ndarray,
+       g:float=9.81)->np.ndarray:
+    """vectorised fj
+
+    Args:
+        ship_type (np.ndarray): ship type codes
+        ice_class (np.ndarray): ice class codes
+        mcr (np.ndarray): sum of maximum continuous rating of main engines
+            in kW
+        dwt (np.ndarray): deadweight tonnes of ship in tonnes
+        propulsion_redundancy (np.ndarray): does the ship have propulsion
+            redundancy?
+        l (np.ndarray): length between perpendiculars in m
+        b (np.ndarray): beam in m
+        d (np.ndarray): draught in m
+        disp_m3 (np.ndarray): displacement in m^3
+        v_ref (np.ndarray): reference velocity in knots
+        g (float, optional): acceleration due to gravity. Defaults to 9.81.
+
+    Returns:
+        np.ndarray: value for fj - ship-specific design elements
+    """
+    ice_ships = [_st(k) for k in ['tanker', 'bulk_carrier',
+                                  'general_cargo', 'refrigerated_cargo']]
+    ice_test = (np.isin(ship_type, ice_ships)
+                & (ice_class >= 0)
+                & _positive(mcr, dwt))
+    shut_redun_test = ((ship_type == _st('shuttle_tanker'))
+                       & (propulsion_redundancy == True)
+                       & (dwt >= 80000) & (dwt <= 160000))
+    hull_test = _positive(l, b, d, disp_m3, v_ref)
+    roro_test = (np.isin(ship_type, [_st('roro_cargo'), _st('roro_passenger')])
+                 & hull_test)
+    genal_cargo_test = (ship_type == _st('general_cargo')) & hull_test
+
+    return np.select(
+        [ice_test, shut_redun_test, roro_test, genal_cargo_test],
+        [ice_class_correction(ship_type, ice_class, mcr, dwt),
+         0.77,
+         roro_correction(ship_type, l, b, d, disp_m3, v_ref, g),
+         general_cargo_correction(ship_type, l, b, d, disp_m3, v_ref, g)],
+        1.)
+
+def ice_capacity_correction(ship_type:np.ndarray,
+                            ice_class:np.ndarray,
+                            dwt:np.ndarray,
+                            l:np.ndarray,
+                            b:np.ndarray,
+                            d:np.ndarray,
+                            disp_m3:np.ndarray)->np.ndarray:
+    """vectorised ice_capacity_correction"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fi_ice_class = np.select(
+            [ice_class == 0, ice_class == 1, ice_class == 2, ice_class == 3],
+            [1.0151 + 228.7 / dwt, 1.0099 + 95.1 / dwt,
+             1.0067 + 62.7 / dwt, 1.0041 + 58.5 / dwt],
+            1.)
+        # the scalar version keys the bulk carrier bands on 'bulker', so bulk
+        # carriers take cb_ref = 1 there as well
+        cb_ref = np.select(
+            [(ship_type == _st('tanker')) & (dwt < 25000),
+             (ship_type == _st('tanker')) & (dwt < 55000),
+             ship_type == _st('tanker'),
+             ship_type == _st('general_cargo')],
+            [0.78, 0.82, 0.83, 0.8],
+            1.)
+        fi_cb = np.where(
+            np.isin(ship_type, [_st('bulk_carrier'), _st('tanker'), _st('general_cargo')]),
+            cb_ref / (disp_m3 / (l * b * d)),
+            1.)
+    return fi_ice_class * fi_cb
+
+def fi(ship_type:np.ndarray,
+       csr:np.ndarray,
+       calc_pref:np.ndarray=-1,
+       ice_class:np.ndarray=-1,
+       dwt:np.ndarray=0,
+       l:np.ndarray=0,
+       b:np.ndarray=0,
+       d:np.ndarray=0,
+       disp_m3:np.ndarray=0,
+       disp_t:np.ndarray=0,
+       lwt_ref:np.ndarray=0,
+       lwt_enhance:np.ndarray=0,
+       lwt_csr:np.ndarray=0,
+       dwt_csr:np.ndarray=0)->np.ndarray:
+    """vectorised fi
+
+    Args:
+        ship_type (np.ndarray): ship type codes
+        csr (np.ndarray): is the ship under common structural rules (csr)?
+        calc_pref (np.ndarray, optional): codes into CALC_PREFS. Defaults
+            to -1 ('none').
+        ice_class (np.ndarray, optional): ice class codes. Defaults to -1.
+
+    The remaining arguments are as for helper_functions.fi.
+
+    Returns:
+        np.ndarray: fi - capacity factor for technical/regulatory limitation
+            on capacity
+    """
+    ice_test = (np.isin(ship_type, [_st('tanker'), _st('bulk_carrier'), _st('general_cargo')])
+                & (csr == False)
+                & (calc_pref == 0)
+                & (ice_class >= 0)
+                & _positive(l, b, d, disp_m3))
+    struct_test = ((calc_pref == 1)
+                   & (csr == False)
+                   & _positive(disp_t, lwt_ref, lwt_enhance))
+    csr_test = (np.isin(ship_type, [_st('bulk_carrier'), _st('tanker')])
+                & (csr == True)
+                & _positive(lwt_csr, dwt_csr))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.select(
+            [ice_test, struct_test, csr_test],
+            [ice_capacity_correction(ship_type, ice_class, dwt, l, b, d, disp_m3),
+             (disp_t - lwt_ref) / (disp_t - lwt_enhance),
+             1 + (0.08 * lwt_csr / dwt_csr)],
+            1.)
+
+def fc(ship_type:np.ndarray,
+       dwt:np.ndarray=0,
+       cube:np.ndarray=0,
+       diesel_direct_drive:np.ndarray=False,
+       marpol_annex:np.ndarray='none',
+       gt:np.ndarray=0)->np.ndarray:
+    """vectorised fc
+
+    Args:
+        ship_type (np.ndarray): ship type codes
+        dwt (np.ndarray, optional): ship deadweight in tonnes. Defaults to 0.
+        cube (np.ndarray, optional): ship cargo capacity in m^3. Defaults to 0.
+        diesel_direct_drive (np.ndarray, optional): gas carrier with direct
+            diesel driven propulsion system. Defaults to False.
+        marpol_annex (np.ndarray, optional): MARPOL ANNEX VI definition.
+            Defaults to 'none'.
+        gt (np.ndarray, optional): gross tonnage. Defaults to 0.
+
+    Returns:
+        np.ndarray: fc - cubic capacity correction factor
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = dwt / cube
+        ratio = dwt / gt
+        chemical = np.where(r < 0.98, r ** (-0.7) - 0.014, 1.)
+        gas = np.where(ship_type == _st('gas_carrier'), r ** -0.56, 1.)
+        roro = np.where(ratio < 0.25, (ratio / 0.25) ** -0.8, 1.)
+        bulk = np.where(r < 0.55, r ** -0.15, 1.)
+
+    chemical_test = (ship_type == _st('chemical_tanker')) & _positive(dwt, cube)
+    gas_test = (np.isin(ship_type, [_st('gas_carrier'), _st('lng_carrier')])
+                & (diesel_direct_drive == True)
+                & (np.asarray(marpol_annex) == '2.2.14'))
+    roro_test = (ship_type == _st('roro_passenger')) & _positive(dwt, gt)
+    bulk_test = ship_type == _st('bulk_carrier')
+
+    return np.select([chemical_test, gas_test, roro_test, bulk_test],
+                     [chemical, gas, roro, bulk], 1.)
+
+def fl(ship_type:np.ndarray,
+       dwt_ref:np.ndarray,
+       number_of_cranes:np.ndarray=0,
+       swl_crane:np.ndarray=0,
+       reach_crane:np.ndarray=0,
+       side_loader_weight:np.ndarray=0,
+       roro_weight:np.ndarray=0)->np.ndarray:
+    """vectorised fl"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f_cranes = np.where(
+            _positive(number_of_cranes, swl_crane, reach_crane),
+            1 + (number_of_cranes * (0.0519 * swl_crane * reach_crane + 32.11)) / dwt_ref,
+            1.)
+        f_sideloader = np.where(side_loader_weight > 0,
+                                dwt_ref / (dwt_ref + side_loader_weight), 1.)
+        f_roro = np.where(roro_weight > 0, dwt_ref / (dwt_ref + roro_weight), 1.)
+    return np.where(ship_type == _st('general_cargo'),
+                    f_cranes * f_sideloader * f_roro, 1.)
+
+def fm(ice_class:np.ndarray)->np.ndarray:
+    """vectorised fm"""
+    return np.where((ice_class == 0) | (ice_class == 1), 1.05, 1.)
+
+def cat_b1_short(p_p_eff_al:np.ndarray, p_ae_eff_al:np.ndarray,
+                 p_me:np.ndarray, p_pti_shaft:np.ndarray,
+                 cf_sfc_me:np.ndarray, cf_sfc_ae:np.ndarray)->tuple:
+    """vectorised cat_b1_short"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cf_sfc_weighted = (((p_me * cf_sfc_me) + (p_pti_shaft * cf_sfc_ae))
+                           / (p_me + p_pti_shaft))
+        p_eff = p_p_eff_al - p_ae_eff_al * (cf_sfc_ae / cf_sfc_weighted)
+    return p_eff, cf_sfc_weighted
+
+def cat_c1(w_e:np.ndarray,
+           eta_g:np.ndarray,
+           p_ae_eff_loss:np.ndarray)->np.ndarray:
+    """vectorised cat_c1"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_ae_eff_dash = np.where((w_e > 0) & (eta_g > 0), w_e / eta_g, 0.)
+    return p_ae_eff_dash - p_ae_eff_loss
+
+def cat_c2(f_temp:np.ndarray,
+           p_max:np.ndarray,
+           etad_gen:np.ndarray,
+           n:np.ndarray,
+           f_rad:float=0.2,
+           l_others:float=10)->np.ndarray:
+    """vectorised cat_c2"""
+    l_temp = f_temp * (40 - 25)
+    f_eff = f_rad * (1 + l_temp / 100)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_ae_eff = np.where((n > 0) & (etad_gen > 0),
+                            p_max * (1 - l_others / 100) * n / etad_gen, 0.)
+    return f_eff * p_ae_eff
+
+def _nan_product(a:np.ndarray, b:np.ndarray)->np.ndarray:
+    # pandas product(axis=1) skips missing values, keep the same behaviour
+    return np.where(np.isnan(a), 1., a) * np.where(np.isnan(b), 1., b)
+
+def fuel_code_column(engines, fuel:str)->np.ndarray:
+    """fuel codes of the engines, from the code column when present
+
+    Args:
+        engines (pd.DataFrame or dict): engines as built by fleet_tables
+        fuel (str): one of FUEL_TYPES
+
+    Returns:
+        np.ndarray: codes into fuel_registry, NO_FUEL for missing fuels
+    """
+    if fuel + '_fuel_code' in engines:
+        return np.asarray(engines[fuel + '_fuel_code'], dtype=np.int64)
+    return fuel_codes(np.asarray(engines[fuel + '_fuel_type']))
+
+def fleet_tables(records)->tuple:
+    """build the batch input tables from loaded ship inputs
+
+    Args:
+        records (iterable): tuples of (df_inpt, cf_dict, df_me, df_ae) as
+            returned by the load_* functions in helper_functions
+
+    Returns:
+        tuple: ships (pd.DataFrame) with one row per ship and engines
+            (pd.DataFrame) with one row per engine. Engine rows refer to their
+            ship by position in the 'ship' column, carry the codes of their
+            fuels in fuel_registry and the lcv and cf of their fuels from the
+            ship's own cf table.
+    """
+    registry = fuel_registry()
+    ships = []
+    engines = []
+    cf_dicts = []
+    for n, (df_inpt, cf_dict, df_me, df_ae) in enumerate(records):
+        ships.append(df_inpt)
+        cf_dicts.append(cf_dict)
+        for kind, df in (('me', df_me), ('ae', df_ae)):
+            df = df.reindex(columns=ENGINE_COLUMNS).copy()
+            df['limited_power'] = df['limited_power'].fillna(0).astype(float)
+            df.insert(0, 'ship', n)
+            df.insert(1, 'kind', kind)
+            engines.append(df)
+
+    ships = pd.concat(ships, ignore_index=True)
+    ships.columns.name = None
+    engines = pd.concat(engines, ignore_index=True)
+
+    #lcv and cf of every (ship, fuel code), gathered for all engines at once
+    tables = np.stack([registry.cf_table(x) for x in cf_dicts])
+    ship = engines['ship'].to_numpy()
+    codes = {x: registry.code(engines[x + '_fuel_type']) for x in FUEL_TYPES}
+    def gather(fuel:str, column:int)->np.ndarray:
+        code = codes[fuel]
+        values = np.where(code == NO_FUEL, np.nan, tables[ship, code, column])
+        names = engines[fuel + '_fuel_type'].to_numpy()
+        #fuels unknown to the registry are looked up by name
+        for i in np.flatnonzero(code == NO_FUEL):
+            values[i] = cf_dicts[ship[i]].get(names[i], [np.nan, np.nan])[column]
+        return values
+    for x in FUEL_TYPES:
+        for column, index in FUEL_COLUMNS[x]:
+            engines[column] = gather(x, index)
+    for x in FUEL_TYPES:
+        engines[x + '_fuel_code'] = codes[x]
+    return ships, engines
+
+def load_fleet(inpts)->tuple:
+    """build the batch input tables from raw input sheets
+
+    Args:
+        inpts (iterable): input sheets read with pd.read_excel
+
+    Returns:
+        tuple: ships, engines as returned by fleet_tables
+    """
+    def records():
+        for inpt in inpts:
+            df_inpt = load_variables(inpt)
+            yield (df_inpt, load_cf_dict(inpt),
+                   load_me_data(inpt, df_inpt), load_ae_data(inpt))
+    return fleet_tables(records())
+
+def compute_eedi_batch(ships, engines, multi_fuel:bool=False)->pd.DataFrame:
+    """calculate the EEDI for a fleet of ships with array operations
+
+    Args:
+        ships (pd.DataFrame or dict): one row per ship with the columns
+            returned by load_variables
+        engines (pd.DataFrame or dict): one row per engine with a 'ship'
+            column (position of the ship in ships), a 'kind' column ('me' or
+            'ae'), the engine columns of load_me_data and the fuel lcv/cf
+            columns added by fleet_tables
+        multi_fuel (bool, optional): give each dual fuel engine the f_DFgas
+            of its own gas fuel from gas_fuel_ratios, with the tank volumes
+            and filling rates of tank_volumes. By default every gas fuel is
+            counted as LNG as in the notebook. Defaults to False.
+
+    Returns:
+        pd.DataFrame: one row per ship with the same terms as
+            helper_functions.EEDIResult. With multi_fuel, fd_gas is the
+            f_DFgas of the gas fuel with the most dual fuel engine power.
+    """
+    col = lambda x: np.asarray(ships[x], dtype=float)
+    eng = lambda x: np.asarray(engines[x], dtype=float)
+
+    ship_type = ship_type_codes(np.asarray(ships['ship_type']))
+    ice_class = ice_class_codes(np.asarray(ships['ice_class']))
+    me_type = propulsion_codes(np.asarray(ships['propulsion_type']))
+    stroke = _code(np.asarray(ships['me_engine_stroke']), ENGINE_STROKES)
+    equ = _code(np.asarray(ships['speed_power_equ']), SPEED_POWER_EQUS)
+    calc_pref = (_code(np.asarray(ships['calc_pref']), CALC_PREFS)
+                 if 'calc_pref' in ships else -1)
+    n_ship = len(ship_type)
+
+    mpp = col('mpp')
+    hload = col('hload')
+    p_sm_rated = col('p_sm_rated')
+    p_pto_rated = col('p_pto_rated')
+    gen_efficiency = col('gen_efficiency')
+    pti_eff = col('pti_eff')
+    electrical_eff = col('electrical_eff')
+
+    #engine table
+    ship = np.asarray(engines['ship'], dtype=np.int64)
+    is_me = np.asarray(engines['kind']) == 'me'
+    is_df = np.asarray(engines['engine_type']) == 'dual_fuel'
+    is_diesel = np.asarray(engines['engine_type']) == 'diesel'
+    total = lambda w, mask: np.bincount(ship, weights=np.where(mask, w, 0.),
+                                        minlength=n_ship)
+
+    mcr = eng('mcr')
+    limited_power = eng('limited_power')
+    n_me = total(1., is_me)
+    n_ae = total(1., ~is_me)
+    mcr_me = total(mcr, is_me)
+    limited = total(limited_power, is_me & (limited_power > 0)) > 0
+
+    #derived inputs
+    sfc_gas_fuel = np.where(is_df, eng('sfc_gas_fuel_kj') / eng('lcv_gas_fuel') * 1000, np.nan)
+    cf_sfc_liquid = _nan_product(eng('cf_liquid_fuel'), eng('sfc_liquid_fuel'))
+    cf_sfc_gas = np.where(is_df,
+                          _nan_product(eng('cf_pilot_fuel'), eng('sfc_pilot_fuel'))
+                          + _nan_product(eng('cf_gas_fuel'), sfc_gas_fuel),
+                          0.)
+    sfc_me_df = total(np.nan_to_num(eng('sfc_pilot_fuel')) + np.nan_to_num(sfc_gas_fuel),
+                      is_me & is_df)
+
+    lng_mpp = (ship_type == _st('lng_carrier')) & (mpp > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_me_eng = np.where(
+            lng_mpp[ship],
+            main_engine_power(mpp, me_type)[ship] / n_me[ship],
+            main_engine_power(np.where(limited_power > 0, limited_power, mcr),
+                              me_type[ship]))
+    p_me_eng = np.where(is_me, p_me_eng, 0.)
+    p_me = total(p_me_eng, is_me)
+
+    capacity = capacity_calc(col('dwt'), ship_type)
+    disp_t = col('disp_m3') * 1.025
+
+    #pae
+    p_ae = np.select(
+        [hload == 0, hload > 0],
+        [p_ae_iterative_calc(ship_type = ship_type,
+                             mcr_me = mcr_me,
+                             me_type = me_type,
+                             p_sm_rated = p_sm_rated,
+                             mpp = mpp,
+                             p_pto_rated = p_pto_rated,
+                             cube = col('cube'),
+                             me_engine_stroke = stroke,
+                             sfc_me_gas_mode = sfc_me_df,
+                             electrical_eff = electrical_eff,
+                             gen_efficiency = gen_efficiency,
+                             pti_eff = pti_eff,
+                             bor = col('bor'),
+                             cop_cooling = col('cop_cooling'),
+                             r_reliq = col('r_reliq'),
+                             cop_comp = col('cop_comp'),
+                             add_load = col('p_ae_eff_al')),
+         hload / gen_efficiency],
+        np.nan)
+
+    #pto
+    p_pto = p_pto_calc(p_pto_rated, me_type)
+    pto_ratio = np.select([me_type == 2, _is_standard(me_type)], [0.85, 0.75], 0.)
+    pto_share = pto_ratio * p_pto < p_ae
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_pto_remove_me = np.where(pto_share, pto_ratio * p_pto,
+                                   pto_ratio * p_ae / 0.75) / n_me
+        p_ae_calc = np.where(pto_share, (p_ae - pto_ratio * p_pto) / n_ae, 0.)
+
+    p_me_calc_eng = np.where(limited[ship], p_me_eng, p_me_eng - p_pto_remove_me[ship])
+    p_me_calc = total(p_me_calc_eng, is_me)
+    cruise_mpp = (mpp > 0) & (ship_type == _st('cruise_ship'))
+    p_me = np.select([mpp == 0, cruise_mpp], [p_me_calc, 0.], p_me)
+
+    #pti
+    p_pti, p_pti_shaft = shaft_motor_power(
+        p_sm_rated = np.where(cruise_mpp, mpp, p_sm_rated),
+        me_type = me_type,
+        mpp = mpp,
+        gen_efficiency = gen_efficiency,
+        pti_eff = pti_eff)
+    pti_applies = (mpp == 0) | cruise_mpp
+    p_pti = np.where(pti_applies, p_pti, 0.)
+    p_pti_shaft = np.where(pti_applies, p_pti_shaft, 0.)
+
+    p_me_deduct = p_me + p_pti_shaft - p_pto_remove_me
+    v_ref = update_vref(v_ref = col('v_ref'),
+                        p_me_deduct = p_me_deduct,
+                        p_sm_rated = p_sm_rated,
+                        p_pto_rated = p_pto_rated,
+                        v_ref_override = col('v_ref_override'),
+                        speed_power_equ = equ,
+                        speed_power_a = col('speed_power_a'),
+                        speed_power_b = col('speed_power_b'),
+                        speed_power_c = col('speed_power_c'))
+
+    #fuel ratio
+    p_fuel = np.where(is_me, p_me_eng, p_ae_calc[ship])
+    gas_code = fuel_code_column(engines, 'gas')
+    code = engine_fuel_codes(is_diesel = is_diesel,
+                             is_df = is_df,
+                             liquid_code = fuel_code_column(engines, 'liquid'),
+                             gas_code = gas_code,
+                             legacy = not multi_fuel)
+    volume, filling_rate = tank_volumes(ships, n_ship, legacy = not multi_fuel)
+    ratios = gas_fuel_ratios(power_by_fuel(ship, code, p_fuel, n_ship, volume.shape[1]),
+                             volume, filling_rate)
+    if multi_fuel:
+        fd_eng = np.where(gas_code == NO_FUEL, 0., ratios[ship, np.maximum(gas_code, 0)])
+        #gas fuel with the most dual fuel engine power, 0 without one
+        df_power = power_by_fuel(ship, np.where(is_df, gas_code, NO_FUEL), p_fuel,
+                                 n_ship, ratios.shape[1])
+        fd_gas = ratios[np.arange(n_ship), np.argmax(df_power, axis=1)]
+    else:
+        fd_gas = ratios[:, fuel_codes('liquefied_natural_gas')]
+        fd_eng = fd_gas[ship]
+    fd_gas_eng = np.where(is_df, np.where(fd_eng >= 0.5, 1., fd_eng), 0.)
+    cf_sfc_eng = fd_gas_eng * cf_sfc_gas + (1 - fd_gas_eng) * cf_sfc_liquid
+
+    #gather terms
+    me_term = total(p_me_calc_eng * cf_sfc_eng, is_me)
+    pto_term = total(p_pto_remove_me[ship] * cf_sfc_eng, is_me)
+    ae_term = total(p_ae_calc[ship] * cf_sfc_eng, ~is_me)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cf_sfc_me = np.nan_to_num(me_term / p_me_calc)
+        cf_sfc_ae = np.where(p_ae_calc * n_ae == 0, cf_sfc_me,
+                             ae_term / (p_ae_calc * n_ae))
+
+    #innovative
+    c_1_val = cat_c1(col('w_e'), col('eta_g'), col('p_ae_eff_loss'))
+    c_2_val = cat_c2(col('f_temp'), col('p_max'), col('etad_gen'), col('n'),
+                     f_rad = 0.2, l_others = 10)
+    p_eff, cf_sfc_me_pti = cat_b1_short(col('p_p_eff_al'), col('p_ae_eff_al'),
+                                        p_me, p_pti_shaft, cf_sfc_me, cf_sfc_ae)
+    b1_term = p_eff * cf_sfc_me_pti
+
+    #correction factors
+    fj_term = fj(ship_type = ship_type,
+                 ice_class = ice_class,
+                 mcr = mcr_me,
+                 dwt = col('dwt'),
+                 propulsion_redundancy = np.asarray(ships['propulsion_redundancy'], dtype=bool),
+                 l = col('lpp'),
+                 b = col('b'),
+                 d = col('ds'),
+                 disp_m3 = col('disp_m3'),
+                 v_ref = v_ref)
+    fi_term = fi(ship_type = ship_type,
+                 csr = np.asarray(ships['csr'], dtype=bool),
+                 calc_pref = calc_pref,
+                 ice_class = ice_class,
+                 dwt = col('dwt'),
+                 l = col('lpp'),
+                 b = col('b'),
+                 d = col('ds'),
+                 disp_m3 = col('disp_m3'),
+                 disp_t = disp_t,
+                 lwt_ref = col('lwt_ref'),
+                 lwt_enhance = col('lwt_enhance'),
+                 lwt_csr = col('lwt_csr'),
+                 dwt_csr = col('dwt_csr'))
+    fc_term = fc(ship_type = ship_type,
+                 dwt = capacity,
+                 cube = col('cube'),
+                 diesel_direct_drive = np.asarray(ships['diesel_direct_drive'], dtype=bool),
+                 marpol_annex = np.asarray(ships['marpol_annex']),
+                 gt = col('gt'))
+    fl_term = fl(ship_type = ship_type,
+                 dwt_ref = col('dwt'),
+                 number_of_cranes = col('number_of_cranes'),
+                 swl_crane = col('swl_crane'),
+                 reach_crane = col('reach_crane'),
+                 side_loader_weight = col('side_loader_weight'),
+                 roro_weight = col('roro_weight'))
+    fw_term = np.ones(n_ship)
+    fm_term = fm(ice_class)
+
+    #pti term
+    no_ae = ae_term == 0
+    pti_term = np.where(no_ae, 0., (fj_term * p_pti) * cf_sfc_ae)
+    pti_and_c_term = np.where(no_ae, 0.,
+                              ((fj_term * p_pti) - (c_1_val + c_2_val)) * cf_sfc_ae)
+
+    #final eedi
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denominator = (fi_term * fc_term * fl_term * capacity
+                       * fw_term * v_ref * fm_term)
+        eedi_no_tech = (fj_term * me_term + pto_term + ae_term + pti_term) / denominator
+        eedi_with_tech = ((fj_term * me_term + pto_term + ae_term
+                           + pti_and_c_term - b1_term) / denominator)
+
+    return pd.DataFrame({
+        'eedi_no_tech': eedi_no_tech, 'eedi_with_tech': eedi_with_tech,
+        'capacity': capacity, 'disp_t': disp_t, 'mcr_me': mcr_me, 'p_me': p_me,
+        'p_ae': p_ae, 'p_pto': p_pto, 'p_pto_remove_me': p_pto_remove_me,
+        'p_ae_calc': p_ae_calc, 'p_pti': p_pti, 'p_pti_shaft': p_pti_shaft,
+        'p_me_deduct': p_me_deduct, 'v_ref': v_ref, 'fd_gas': fd_gas,
+        'cf_sfc_me': cf_sfc_me, 'cf_sfc_ae': cf_sfc_ae, 'me_term': me_term,
+        'pto_term': pto_term, 'ae_term': ae_term, 'pti_term': pti_term,
+        'pti_and_c_term': pti_and_c_term, 'c_1_val': c_1_val, 'c_2_val': c_2_val,
+        'p_eff': p_eff, 'cf_sfc_me_pti': cf_sfc_me_pti, 'b1_term': b1_term,
+        'fj_term': fj_term, 'fi_term': fi_term, 'fc_term': fc_term,
+        'fl_term': fl_term, 'fw_term': fw_term, 'fm_term': fm_term},
+        index=getattr(ships, 'index', None))
+
+def iter_eedi_batch(ships, engines, chunk_size:int=100000, columns:list=None,
+                    multi_fuel:bool=False):
+    """calculate the EEDI of a fleet in chunks of ships
+
+    Args:
+        ships (pd.DataFrame or dict): ships as built by fleet_tables
+        engines (pd.DataFrame or dict): engines as built by fleet_tables
+        chunk_size (int, optional): number of ships calculated at once.
+            Defaults to 100000.
+        columns (list, optional): result columns of compute_eedi_batch to
+            keep. Defaults to all of them.
+        multi_fuel (bool, optional): f_DFgas per gas fuel, see
+            compute_eedi_batch. Defaults to False.
+
+    Yields:
+        pd.DataFrame: ship_type and gt of the ships followed by the result
+            columns, indexed by the position of the ship in ships
+    """
+    ships = {x: np.asarray(ships[x]) for x in ships}
+    engines = {x: np.asarray(engines[x]) for x in engines}
+    ship = engines['ship'].astype(np.int64)
+    order = np.argsort(ship, kind='stable')
+    n_ship = len(ships['ship_type'])
+    starts = np.searchsorted(ship[order], np.arange(0, n_ship + chunk_size, chunk_size))
+
+    for i, start in enumerate(range(0, n_ship, chunk_size)):
+        stop = min(start + chunk_size, n_ship)
+        take = order[starts[i]:starts[i + 1]]
+        chunk_ships = {x: v[start:stop] for x, v in ships.items()}
+        chunk_engines = {x: v[take] for x, v in engines.items()}
+        chunk_engines['ship'] = ship[take] - start
+        result = compute_eedi_batch(chunk_ships, chunk_engines, multi_fuel = multi_fuel)
+        if columns is not None:
+            result = result[list(columns)]
+        result.index = pd.RangeIndex(start, stop)
+        result.insert(0, 'ship_type', chunk_ships['ship_type'])
+        result.insert(1, 'gt', chunk_ships['gt'].astype(float))
+        yield result
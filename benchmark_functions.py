@@ -0,0 +1,294 @@
+import argparse
+import glob
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from helper_functions import (SHIP_TYPES, load_variables, load_cf_dict,
+                              load_me_data, load_ae_data, calc_eedi)
+from reader_functions import read_input, read_rows, record_from_rows
+from batch_functions import fleet_tables, compute_eedi_batch
+from reference_functions import reference_index, required_eedi, phase_met
+from fuel_functions import fuel_registry, set_fuel_registry
+
+# Benchmarks of the EEDI calculation. The verification and example sheets
+# are timed stage by stage and their results are checked against the
+# reference values of MEPC.364(79) Appendix 4 and IACS PR 38 Rev4, and
+# synthetic fleets built from a base ship are timed through the batch path.
+#
+#   python benchmark_functions.py --sizes 1000 100000 1000000
+#
+# Cold import times of the numeric core are checked against a fixed budget
+# first, so the tool fails when a heavy import creeps into it.
+#
+#   python benchmark_functions.py --imports-only --import-budget 0.5
+
+HOMEPATH = os.path.dirname(os.path.abspath(__file__))
+
+# eedi_no_tech, eedi_with_tech
+REFERENCE_EEDI = {
+    'mepc_79_1.xlsx': (3.7596, 3.7596),
+    'mepc_79_2.xlsx': (2.7782, 2.7782),
+    'mepc_79_3.xlsx': (3.6077, 3.6077),
+    'mepc_79_4.xlsx': (3.2841, 3.2841),
+    'mepc_79_5.xlsx': (3.5601, 3.5601),
+    'pr_38_rev4_1.xlsx': (24.1352, 24.1352),
+    'pr_38_rev4_2.xlsx': (23.7813, 23.7813),
+    'pr_38_rev4_3.xlsx': (23.1792, 23.1792),
+    'pr_38_rev4_4.xlsx': (23.1788, 23.1788),
+    'pr_38_rev4_5.xlsx': (22.3602, 22.3602),
+    'pr_38_rev4_6.xlsx': (24.507, 24.507),
+    'pr_38_rev4_app_6_1.xlsx': (8.0389, 8.0389),
+    'pr_38_rev4_app_6_2.xlsx': (7.7826, 7.7826),
+    'pr_38_rev4_app_6_3.xlsx': (8.6679, 8.6679),
+    'mepc_79_1_innovative.xlsx': (3.8781, 3.4624),
+}
+TOLERANCE = 1e-3
+
+# liquid fuel added to the registry, which must not change any result
+EXTRA_FUEL = ('biodiesel', 37200., 2.834)
+
+# modules that must import quickly and without pandas, and the budget in s
+# for a cold import in a fresh interpreter
+CORE_MODULES = ['core_functions', 'reference_functions', 'fuel_functions']
+IMPORT_BUDGET = 0.5
+HEAVY_MODULES = ['pandas', 'openpyxl', 'matplotlib']
+
+def timeit(fn, repeat:int=5)->tuple:
+    """time a function call
+
+    Args:
+        fn (callable): function without arguments
+        repeat (int, optional): number of calls. Defaults to 5.
+
+    Returns:
+        tuple: best time in seconds, return value of the last call
+    """
+    best = np.inf
+    for i in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+def reference_paths()->list:
+    """paths of the sheets with reference values
+
+    Returns:
+        list: paths in the verifications and examples folders
+    """
+    return [p for folder in ('verifications', 'examples')
+            for p in sorted(glob.glob(os.path.join(HOMEPATH, folder, '*.xlsx')))
+            if os.path.basename(p) in REFERENCE_EEDI]
+
+def _legacy_load(path:str)->tuple:
+    inpt = pd.read_excel(path)
+    df_inpt = load_variables(inpt)
+    return (df_inpt, load_cf_dict(inpt), load_me_data(inpt, df_inpt),
+            load_ae_data(inpt))
+
+def _matches(name:str, eedi_no_tech:float, eedi_with_tech:float)->bool:
+    ref_no_tech, ref_with_tech = REFERENCE_EEDI[name]
+    return (abs(eedi_no_tech - ref_no_tech) < TOLERANCE
+            and abs(eedi_with_tech - ref_with_tech) < TOLERANCE)
+
+def bench_files(paths:list=None, repeat:int=5)->pd.DataFrame:
+    """time every stage of the calculation for each reference sheet
+
+    Args:
+        paths (list, optional): sheets to time. Defaults to reference_paths().
+        repeat (int, optional): number of calls per stage, the best time is
+            kept. Defaults to 5.
+
+    Returns:
+        pd.DataFrame: one row per sheet with the time of each stage in ms and
+            whether the scalar and batch results match the reference values,
+            also with EXTRA_FUEL added to the fuel registry
+    """
+    paths = reference_paths() if paths is None else paths
+    rows, records = [], []
+    for path in paths:
+        name = os.path.basename(path)
+        t_parse, sheet = timeit(lambda: read_rows(path), repeat)
+        t_record, record = timeit(lambda: record_from_rows(sheet), repeat)
+        t_legacy, legacy = timeit(lambda: _legacy_load(path), repeat)
+        t_calc, result = timeit(lambda: calc_eedi(*record), repeat)
+        t_end, result = timeit(lambda: calc_eedi(*read_input(path)), repeat)
+        t_required, required = timeit(lambda: required_eedi(
+            record.df_inpt['ship_type'].iloc[0], result.capacity,
+            record.df_inpt['gt'].iloc[0]), repeat)
+        records.append(record)
+        rows.append({'file': name,
+                     'parse_ms': t_parse * 1e3,
+                     'record_ms': t_record * 1e3,
+                     'read_excel_load_ms': t_legacy * 1e3,
+                     'calc_eedi_ms': t_calc * 1e3,
+                     'required_ms': t_required * 1e3,
+                     'end_to_end_ms': t_end * 1e3,
+                     'eedi_no_tech': result.eedi_no_tech,
+                     'eedi_with_tech': result.eedi_with_tech,
+                     'phase_met': int(phase_met(result.eedi_with_tech, required)),
+                     'matches': _matches(name, result.eedi_no_tech,
+                                         result.eedi_with_tech)})
+
+    out = pd.DataFrame(rows)
+    ships, engines = fleet_tables(records)
+    batch = compute_eedi_batch(ships, engines)
+    out['batch_matches'] = [_matches(name, a, b) for name, a, b in zip(
+        out['file'], batch['eedi_no_tech'], batch['eedi_with_tech'])]
+
+    registry = fuel_registry()
+    set_fuel_registry(registry.with_fuel(*EXTRA_FUEL))
+    try:
+        scalar = [calc_eedi(*r) for r in records]
+        batch = compute_eedi_batch(*fleet_tables(records))
+    finally:
+        set_fuel_registry(registry)
+    out['registry_matches'] = [
+        _matches(name, r.eedi_no_tech, r.eedi_with_tech) and _matches(name, a, b)
+        for name, r, a, b in zip(out['file'], scalar, batch['eedi_no_tech'],
+                                 batch['eedi_with_tech'])]
+    return out
+
+def synthetic_fleet(n:int, base=None, seed:int=0)->tuple:
+    """build a synthetic fleet by varying a base ship
+
+    Ship types are drawn from the SHIP_TYPES with a reference line, and dwt,
+    gt, v_ref and the main engine mcr are drawn at random.
+
+    Args:
+        n (int): number of ships
+        base (tuple, optional): ShipRecord of the base ship. Defaults to
+            verifications/mepc_79_1.xlsx.
+        seed (int, optional): random seed. Defaults to 0.
+
+    Returns:
+        tuple: ships, engines (dict of arrays) for compute_eedi_batch
+    """
+    if base is None:
+        base = read_input(os.path.join(HOMEPATH, 'verifications', 'mepc_79_1.xlsx'))
+    rng = np.random.default_rng(seed)
+    ships, engines = fleet_tables([base])
+    n_eng = len(engines)
+
+    ships = {x: np.repeat(ships[x].to_numpy(), n) for x in ships.columns}
+    types = [x for x in SHIP_TYPES if reference_index().codes(x) >= 0]
+    ships['ship_type'] = rng.choice(np.array(types, dtype=object), n)
+    ships['dwt'] = np.exp(rng.uniform(np.log(2000), np.log(200000), n))
+    ships['gt'] = ships['dwt'] * rng.uniform(0.5, 1.5, n)
+    ships['v_ref'] = rng.uniform(10, 22, n)
+
+    engines = {x: np.tile(engines[x].to_numpy(), n) for x in engines.columns}
+    engines['ship'] = np.repeat(np.arange(n), n_eng)
+    engines['mcr'] = engines['mcr'] * np.repeat(rng.uniform(0.5, 2, n), n_eng)
+    return ships, engines
+
+def bench_fleet(n:int, repeat:int=3, seed:int=0)->dict:
+    """time the batch calculation of a synthetic fleet
+
+    Args:
+        n (int): number of ships
+        repeat (int, optional): number of calls, the best time is kept.
+            Defaults to 3.
+        seed (int, optional): random seed. Defaults to 0.
+
+    Returns:
+        dict: fleet size, build, compute and compliance times in s and ships
+            per second of the compute stage
+    """
+    t_build, (ships, engines) = timeit(lambda: synthetic_fleet(n, seed=seed), 1)
+    t_calc, result = timeit(lambda: compute_eedi_batch(ships, engines), repeat)
+    t_required, required = timeit(lambda: required_eedi(
+        ships['ship_type'], result['capacity'].to_numpy(), ships['gt']), repeat)
+    t_phase, met = timeit(lambda: phase_met(result['eedi_with_tech'].to_numpy(),
+                                            required), repeat)
+    return {'ships': n, 'build_s': t_build, 'compute_eedi_batch_s': t_calc,
+            'required_s': t_required, 'phase_met_s': t_phase,
+            'ships_per_s': n / t_calc}
+
+def import_time(module:str, repeat:int=3)->dict:
+    """cold import time of a module in a fresh interpreter
+
+    Args:
+        module (str): module name, imported from the directory of this file
+        repeat (int, optional): number of interpreters started, the best
+            time is kept. Defaults to 3.
+
+    Returns:
+        dict: module, best import time in s and the HEAVY_MODULES it loaded
+    """
+    code = ('import sys, time\n'
+            't = time.perf_counter()\n'
+            'import {}\n'
+            'print(time.perf_counter() - t)\n'
+            'print(" ".join(m for m in {!r} if m in sys.modules))').format(
+                module, HEAVY_MODULES)
+    best = np.inf
+    for i in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code], cwd=HOMEPATH, check=True,
+                             capture_output=True, text=True).stdout.split('\n')
+        best = min(best, float(out[0]))
+    return {'module': module, 'import_s': best, 'loads': out[1]}
+
+def bench_imports(modules:list=None, budget:float=IMPORT_BUDGET,
+                  repeat:int=3)->pd.DataFrame:
+    """cold import times of the core modules checked against a budget
+
+    Args:
+        modules (list, optional): modules to time, helper_functions is
+            added for comparison. Defaults to CORE_MODULES.
+        budget (float, optional): import time limit in s of each module.
+            Defaults to IMPORT_BUDGET.
+        repeat (int, optional): interpreters started per module.
+            Defaults to 3.
+
+    Returns:
+        pd.DataFrame: one row per module with the import time, the heavy
+            modules it loaded and whether it is within budget without
+            loading any of them
+    """
+    modules = CORE_MODULES if modules is None else list(modules)
+    df = pd.DataFrame([import_time(m, repeat) for m in modules + ['helper_functions']])
+    df['within_budget'] = (((df['import_s'] <= budget) & (df['loads'] == ''))
+                           .where(df['module'] != 'helper_functions'))
+    return df
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='benchmark the EEDI calculation')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[1000, 100000, 1000000],
+                        help='synthetic fleet sizes')
+    parser.add_argument('--repeat', type=int, default=5, help='calls per stage')
+    parser.add_argument('--import-budget', type=float, default=IMPORT_BUDGET,
+                        help='cold import time limit in s of the core modules')
+    parser.add_argument('--imports-only', action='store_true',
+                        help='only check the import times')
+    args = parser.parse_args()
+
+    imports = bench_imports(budget=args.import_budget)
+    print(imports.round(3).to_string(index=False))
+    print()
+    slow = imports[imports['within_budget'] == False]
+    if len(slow):
+        print('imports over the {} s budget or loading {}: {}'.format(
+            args.import_budget, ', '.join(HEAVY_MODULES), ', '.join(slow['module'])))
+        sys.exit(1)
+    if args.imports_only:
+        sys.exit(0)
+
+    files = bench_files(repeat=args.repeat)
+    fleets = pd.DataFrame([bench_fleet(n, repeat=min(args.repeat, 3)) for n in args.sizes])
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(files.round(3).to_string(index=False))
+        print()
+        print(fleets.round(3).to_string(index=False))
+
+    failed = files[~(files['matches'] & files['batch_matches']
+                     & files['registry_matches'])]
+    if len(failed):
+        print('results differ from the reference values: {}'.format(
+            ', '.join(failed['file'])))
+        sys.exit(1)
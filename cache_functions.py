@@ -0,0 +1,386 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+import core_functions
+import fuel_functions
+import helper_functions
+from reader_functions import record_to_dict
+
+# Content-addressed store of EEDI results. A ship record is converted to a
+# canonical JSON form (ship parameters, engine tables, cf table) and hashed
+# together with a fingerprint of the calculation code and the fuel registry,
+# so a result is reused only for identical inputs calculated by the same
+# code. Results are kept in
+# an in-memory LRU tier in front of an optional size-bounded SQLite file or
+# directory of files shared by processes and runs.
+#
+#   cache = ResultCache(SQLiteStore('results.sqlite'))
+#   set_result_cache(cache)     # calc_eedi now returns stored results
+#   cache.stats()
+#
+# Stored results are pickles, only point a store at files you trust.
+
+CACHE_FORMAT = 1
+MEMORY_BYTES = 64 * 1024 * 1024
+DISK_BYTES = 1024 * 1024 * 1024
+
+@lru_cache(maxsize=1)
+def _source_hash()->bytes:
+    #the calculation code does not change while the process runs
+    h = hashlib.sha256()
+    for module in (core_functions, fuel_functions, helper_functions):
+        with open(module.__file__, 'rb') as f:
+            h.update(f.read())
+    return h.digest()
+
+@lru_cache(maxsize=1)
+def _registry_version(registry:fuel_functions.FuelRegistry)->str:
+    #registries are immutable, set_fuel_registry installs a new object
+    h = hashlib.sha256(_source_hash())
+    h.update(repr(registry.fuels()).encode())
+    h.update(str(CACHE_FORMAT).encode())
+    return h.hexdigest()[:16]
+
+def library_version()->str:
+    """fingerprint of the calculation code
+
+    Returns:
+        str: hash of the source of core_functions.py, fuel_functions.py and
+            helper_functions.py, the fuels of the shared fuel_registry and
+            CACHE_FORMAT
+    """
+    return _registry_version(fuel_functions.fuel_registry())
+
+def _canonical(v):
+    #numbers as floats so 3 and 3.0 hash the same, bools kept
+    if isinstance(v, dict):
+        return {str(k): _canonical(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)):
+        return [_canonical(x) for x in v]
+    if isinstance(v, int) and not isinstance(v, bool):
+        return float(v)
+    return v
+
+def canonical_record(record)->bytes:
+    """canonical serialisation of a ship record
+
+    Args:
+        record (tuple): ShipRecord (or (df_inpt, cf_dict, df_me, df_ae))
+
+    Returns:
+        bytes: JSON with sorted keys, missing values as null and every
+            number as a float. The derived p_me column of the main engine
+            table is left out as it follows from the other inputs.
+    """
+    return json.dumps(_canonical(record_to_dict(record)), sort_keys=True,
+                      separators=(',', ':'), allow_nan=False).encode()
+
+def record_key(record)->str:
+    """content address of a ship record
+
+    Args:
+        record (tuple): ShipRecord (or (df_inpt, cf_dict, df_me, df_ae))
+
+    Returns:
+        str: sha256 hex digest of the canonical record and library_version
+    """
+    h = hashlib.sha256(library_version().encode())
+    h.update(canonical_record(record))
+    return h.hexdigest()
+
+class SQLiteStore:
+    """results in a single SQLite file, evicting the least recently used
+
+    A connection is opened per process and thread so the store can be used
+    from worker pools.
+    """
+    def __init__(self, path:str, max_bytes:int=DISK_BYTES):
+        """
+        Args:
+            path (str): database file, created if missing
+            max_bytes (int, optional): total size of the stored results.
+                Defaults to DISK_BYTES.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+    def _connection(self)->sqlite3.Connection:
+        con = getattr(self._local, 'con', None)
+        if con is None or self._local.pid != os.getpid():
+            con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            con.execute('PRAGMA journal_mode=WAL')
+            con.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, '
+                        'value BLOB, size INTEGER, accessed REAL)')
+            con.execute('CREATE INDEX IF NOT EXISTS accessed ON results (accessed)')
+            self._local.con, self._local.pid = con, os.getpid()
+        return con
+
+    def get(self, key:str):
+        """stored bytes of key, None if missing"""
+        con = self._connection()
+        row = con.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        con.execute('UPDATE results SET accessed = ? WHERE key = ?', (time.time(), key))
+        return row[0]
+
+    def put(self, key:str, value:bytes)->int:
+        """store value under key
+
+        Returns:
+            int: number of results evicted to stay within max_bytes
+        """
+        con = self._connection()
+        con.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                    (key, value, len(value), time.time()))
+        total = con.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        evicted = 0
+        if total > self.max_bytes:
+            rows = con.execute('SELECT key, size FROM results ORDER BY accessed').fetchall()
+            drop = []
+            for k, size in rows:
+                if total <= self.max_bytes:
+                    break
+                drop.append((k,))
+                total -= size
+            con.executemany('DELETE FROM results WHERE key = ?', drop)
+            evicted = len(drop)
+        return evicted
+
+    def usage(self)->tuple:
+        """number of stored results and their total size in bytes"""
+        return self._connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+
+    def clear(self):
+        """delete every stored result"""
+        self._connection().execute('DELETE FROM results')
+
+class DirectoryStore:
+    """results as one file each in a directory, evicting the least recently used
+
+    Access times are kept in the file modification times, so the directory
+    can be shared by processes.
+    """
+    def __init__(self, path:str, max_bytes:int=DISK_BYTES):
+        """
+        Args:
+            path (str): directory, created if missing
+            max_bytes (int, optional): total size of the stored results.
+                Defaults to DISK_BYTES.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key:str)->str:
+        return os.path.join(self.path, key[:2], key + '.pkl')
+
+    def _files(self)->list:
+        out = []
+        for folder in os.scandir(self.path):
+            if folder.is_dir():
+                out.extend(e for e in os.scandir(folder.path) if e.name.endswith('.pkl'))
+        return out
+
+    def get(self, key:str):
+        """stored bytes of key, None if missing"""
+        path = self._file(key)
+        try:
+            with open(path, 'rb') as f:
+                value = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return value
+
+    def put(self, key:str, value:bytes)->int:
+        """store value under key
+
+        Returns:
+            int: number of results evicted to stay within max_bytes
+        """
+        path = self._file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp, 'wb') as f:
+            f.write(value)
+        os.replace(tmp, path)
+
+        files = self._files()
+        total = sum(e.stat().st_size for e in files)
+        evicted = 0
+        if total > self.max_bytes:
+            for e in sorted(files, key=lambda e: e.stat().st_mtime):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    total -= e.stat().st_size
+                    os.remove(e.path)
+                    evicted += 1
+                except FileNotFoundError:
+                    pass
+        return evicted
+
+    def usage(self)->tuple:
+        """number of stored results and their total size in bytes"""
+        files = self._files()
+        return len(files), sum(e.stat().st_size for e in files)
+
+    def clear(self):
+        """delete every stored result"""
+        for e in self._files():
+            os.remove(e.path)
+
+class ResultCache:
+    """EEDI results by content address, in memory and in an optional store
+
+    Attributes:
+        store (SQLiteStore or DirectoryStore): persistent tier, None to keep
+            results in memory only
+        memory_bytes (int): size limit of the in-memory tier
+        counts (dict): memory_hits, store_hits, misses, memory_evictions and
+            store_evictions
+    """
+    def __init__(self, store=None, memory_bytes:int=MEMORY_BYTES):
+        """
+        Args:
+            store (SQLiteStore or DirectoryStore, optional): persistent tier.
+                Defaults to None.
+            memory_bytes (int, optional): size limit of the in-memory tier.
+                Defaults to MEMORY_BYTES.
+        """
+        self.store = store
+        self.memory_bytes = memory_bytes
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(['memory_hits', 'store_hits', 'misses',
+                                     'memory_evictions', 'store_evictions'], 0)
+
+    def _remember(self, key:str, value:bytes):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            self._memory[key] = value
+            self._memory_size += len(value)
+            while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+                k, v = self._memory.popitem(last=False)
+                self._memory_size -= len(v)
+                self.counts['memory_evictions'] += 1
+
+    def get(self, key:str):
+        """stored result of key
+
+        Returns:
+            EEDIResult: a fresh copy of the stored result, None if missing
+        """
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.counts['memory_hits'] += 1
+        if value is None and self.store is not None:
+            value = self.store.get(key)
+            if value is not None:
+                self.counts['store_hits'] += 1
+                self._remember(key, value)
+        return None if value is None else pickle.loads(value)
+
+    def put(self, key:str, result):
+        """store a result under key"""
+        value = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember(key, value)
+        if self.store is not None:
+            self.counts['store_evictions'] += self.store.put(key, value)
+
+    def lookup(self, record, calculate):
+        """stored result of a record, calculated and stored if missing
+
+        Args:
+            record (tuple): ShipRecord (or (df_inpt, cf_dict, df_me, df_ae))
+            calculate (callable): calculation called as calculate(*record)
+
+        Returns:
+            EEDIResult: result of the record
+        """
+        key = record_key(record)
+        result = self.get(key)
+        if result is None:
+            self.counts['misses'] += 1
+            result = calculate(*record)
+            self.put(key, result)
+        return result
+
+    def stats(self)->dict:
+        """hit, miss and eviction counts and the size of each tier
+
+        Returns:
+            dict: counts, hit_rate, memory_items, memory_bytes_used and, with a
+                store, store_items and store_bytes_used
+        """
+        out = dict(self.counts)
+        lookups = out['memory_hits'] + out['store_hits'] + out['misses']
+        out['hit_rate'] = (lookups - out['misses']) / lookups if lookups else 0.
+        out['memory_items'] = len(self._memory)
+        out['memory_bytes_used'] = self._memory_size
+        if self.store is not None:
+            out['store_items'], out['store_bytes_used'] = self.store.usage()
+        return out
+
+    def clear(self):
+        """empty both tiers and reset the counts"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+            for k in self.counts:
+                self.counts[k] = 0
+        if self.store is not None:
+            self.store.clear()
+
+def open_store(path:str, max_bytes:int=DISK_BYTES):
+    """open a SQLite store for a file path or a directory store for a directory
+
+    Args:
+        path (str): '.sqlite' or '.db' file, any other path is a directory
+        max_bytes (int, optional): total size of the stored results.
+            Defaults to DISK_BYTES.
+
+    Returns:
+        SQLiteStore or DirectoryStore: persistent tier
+    """
+    if path.endswith(('.sqlite', '.db')):
+        return SQLiteStore(path, max_bytes)
+    return DirectoryStore(path, max_bytes)
+
+def install(path:str=None, max_bytes:int=DISK_BYTES,
+            memory_bytes:int=MEMORY_BYTES)->ResultCache:
+    """create a result cache and route calc_eedi through it
+
+    Can be passed as the initializer of a worker pool so every worker shares
+    the same store.
+
+    Args:
+        path (str, optional): store path for open_store, None for a memory
+            only cache. Defaults to None.
+        max_bytes (int, optional): size limit of the store. Defaults to
+            DISK_BYTES.
+        memory_bytes (int, optional): size limit of the in-memory tier.
+            Defaults to MEMORY_BYTES.
+
+    Returns:
+        ResultCache: the installed cache
+    """
+    store = None if path is None else open_store(path, max_bytes)
+    cache = ResultCache(store, memory_bytes)
+    helper_functions.set_result_cache(cache)
+    return cache
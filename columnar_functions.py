@@ -0,0 +1,241 @@
+import argparse
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from helper_functions import (FLOAT_LIST, STR_LIST, BOOL_LIST, INT_VALS_ENG,
+                              STR_VALS_ENG, FLOAT_VALS_ENG, calc_me_power)
+from reader_functions import ShipRecord, input_paths, read_input
+from batch_functions import fleet_tables
+
+# Columnar storage of many ship inputs in a single uncompressed .npz file.
+#
+# Ship parameters are stored as one array per parameter with the dtypes of
+# FLOAT_LIST, STR_LIST and BOOL_LIST. Engines and cf tables are ragged: one
+# flat array per column plus an offsets array so the rows of ship i are
+# offsets[i]:offsets[i + 1]. Because the archive is not compressed every
+# member can be memory-mapped in place.
+
+FORMAT_VERSION = 1
+
+ENGINE_STR = ['kind'] + STR_VALS_ENG
+ENGINE_FLOAT = FLOAT_VALS_ENG + ['limited_power', 'lcv_gas_fuel', 'cf_liquid_fuel',
+                                 'cf_pilot_fuel', 'cf_gas_fuel']
+
+def _str_array(values)->np.ndarray:
+    values = ['' if (v is None or v != v) else str(v) for v in values]
+    return np.array(values, dtype='U{}'.format(max([len(v) for v in values] + [1])))
+
+def records_to_arrays(records, sources=None)->dict:
+    """convert ship records to the arrays of the columnar format
+
+    Args:
+        records (list): ShipRecord (or (df_inpt, cf_dict, df_me, df_ae)) tuples
+        sources (list, optional): name of the source of each record, such as
+            the path of its input sheet. Defaults to None.
+
+    Returns:
+        dict: array name to np.ndarray
+    """
+    records = list(records)
+    ships, engines = fleet_tables(records)
+
+    arrays = {'format_version': np.array(FORMAT_VERSION)}
+    arrays['source'] = _str_array(sources if sources is not None
+                                  else [''] * len(records))
+    for x in FLOAT_LIST:
+        arrays['ship.' + x] = ships[x].to_numpy(dtype=float)
+    for x in STR_LIST:
+        arrays['ship.' + x] = _str_array(ships[x])
+    for x in BOOL_LIST:
+        arrays['ship.' + x] = ships[x].to_numpy(dtype=bool)
+
+    counts = np.bincount(engines['ship'], minlength=len(records))
+    arrays['engine.offsets'] = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    arrays['engine.ship'] = engines['ship'].to_numpy(dtype=np.int64)
+    arrays['engine.engine_number'] = engines['engine_number'].to_numpy(dtype=np.int64)
+    for x in ENGINE_STR:
+        arrays['engine.' + x] = _str_array(engines[x])
+    for x in ENGINE_FLOAT:
+        arrays['engine.' + x] = engines[x].to_numpy(dtype=float)
+
+    fuel_name, fuel_lcv, fuel_cf, fuel_counts = [], [], [], []
+    for r in records:
+        cf_dict = r[1]
+        fuel_counts.append(len(cf_dict))
+        for name, (lcv, cf) in cf_dict.items():
+            fuel_name.append(name)
+            fuel_lcv.append(lcv)
+            fuel_cf.append(cf)
+    arrays['fuel.offsets'] = np.concatenate([[0], np.cumsum(fuel_counts)]).astype(np.int64)
+    arrays['fuel.name'] = _str_array(fuel_name)
+    arrays['fuel.lcv'] = np.array(fuel_lcv, dtype=float)
+    arrays['fuel.cf'] = np.array(fuel_cf, dtype=float)
+    return arrays
+
+def write_columnar(path:str, records, sources=None):
+    """write ship records to a columnar .npz file
+
+    Args:
+        path (str): output file path
+        records (list): ShipRecord tuples
+        sources (list, optional): name of the source of each record.
+            Defaults to None.
+    """
+    with open(path, 'wb') as f:
+        np.savez(f, **records_to_arrays(records, sources))
+
+def convert_inputs(source, path:str, read_only:bool=True,
+                   skip_invalid:bool=False)->list:
+    """convert input sheets to a columnar .npz file
+
+    Args:
+        source (str or list): directory, glob pattern or list of xlsx paths
+        path (str): output file path
+        read_only (bool, optional): stream the sheets with openpyxl's
+            read-only parser. Defaults to True.
+        skip_invalid (bool, optional): skip sheets that do not follow the
+            inputs.xlsx layout instead of raising. Defaults to False.
+
+    Returns:
+        list: paths of the sheets that were skipped
+    """
+    paths, records, skipped = [], [], []
+    for p in input_paths(source):
+        try:
+            records.append(read_input(p, read_only=read_only))
+            paths.append(p)
+        except ValueError:
+            if not skip_invalid:
+                raise
+            skipped.append(p)
+    write_columnar(path, records, sources=paths)
+    return skipped
+
+def _mmap_npz(path:str)->dict:
+    #locate the .npy members inside the stored (uncompressed) archive and map
+    #each one directly from the file
+    arrays = {}
+    with zipfile.ZipFile(path) as zf, open(path, 'rb') as f:
+        for info in zf.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError('{} is compressed and cannot be memory-mapped'.format(path))
+            f.seek(info.header_offset)
+            local = f.read(30)
+            name_len = int.from_bytes(local[26:28], 'little')
+            extra_len = int.from_bytes(local[28:30], 'little')
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            key = info.filename[:-len('.npy')]
+            if shape == ():
+                arrays[key] = np.lib.format.read_array(zf.open(info.filename))
+            else:
+                arrays[key] = np.memmap(path, dtype=dtype, mode='r', offset=f.tell(),
+                                        shape=shape, order='F' if fortran_order else 'C')
+    return arrays
+
+class ColumnarFleet:
+    """ship inputs loaded from a columnar .npz file
+
+    Attributes:
+        ships (dict): ship parameter name to array, one element per ship
+        engines (dict): engine column name to array, one element per engine
+        sources (np.ndarray): source name of every ship
+    """
+    def __init__(self, arrays:dict):
+        if int(arrays['format_version']) != FORMAT_VERSION:
+            raise ValueError('unsupported columnar format version {}'.format(
+                int(arrays['format_version'])))
+        self.arrays = arrays
+        self.sources = arrays['source']
+        self.ships = {k[5:]: v for k, v in arrays.items() if k.startswith('ship.')}
+        self.engines = {k[7:]: v for k, v in arrays.items()
+                        if k.startswith('engine.') and k != 'engine.offsets'}
+
+    def __len__(self)->int:
+        return len(self.sources)
+
+    def tables(self)->tuple:
+        """return the ships and engines tables for compute_eedi_batch
+
+        Returns:
+            tuple: ships (dict), engines (dict) of arrays
+        """
+        return self.ships, self.engines
+
+    def record(self, i:int)->ShipRecord:
+        """rebuild the ShipRecord of one ship
+
+        Args:
+            i (int): position of the ship in the file
+
+        Returns:
+            ShipRecord: loaded inputs of the ship
+        """
+        a = self.arrays
+        df_inpt = pd.DataFrame({x: self.ships[x][i:i + 1].astype(
+            float if x in FLOAT_LIST else bool if x in BOOL_LIST else object)
+            for x in FLOAT_LIST + STR_LIST + BOOL_LIST}, index=['value'])
+        df_inpt[STR_LIST] = df_inpt[STR_LIST].replace('', np.nan)
+        df_inpt.columns.name = 'ship parameters'
+
+        lo, hi = a['fuel.offsets'][i], a['fuel.offsets'][i + 1]
+        cf_dict = {str(name): [lcv, cf] for name, lcv, cf in zip(
+            a['fuel.name'][lo:hi], a['fuel.lcv'][lo:hi].tolist(), a['fuel.cf'][lo:hi].tolist())}
+
+        lo, hi = a['engine.offsets'][i], a['engine.offsets'][i + 1]
+        df = pd.DataFrame({x: np.asarray(self.engines[x][lo:hi])
+                           for x in INT_VALS_ENG + STR_VALS_ENG + FLOAT_VALS_ENG
+                           + ['kind', 'limited_power']})
+        df[STR_VALS_ENG] = df[STR_VALS_ENG].astype(object).replace('', np.nan)
+        df_me = df[df['kind'] == 'me'].drop(columns='kind').reset_index(drop=True)
+        df_ae = (df[df['kind'] == 'ae'].drop(columns=['kind', 'limited_power'])
+                 .reset_index(drop=True))
+
+        return ShipRecord(df_inpt, cf_dict, calc_me_power(df_me, df_inpt), df_ae)
+
+    def records(self):
+        """iterate over the ShipRecord of every ship
+
+        Yields:
+            ShipRecord: loaded inputs of each ship
+        """
+        for i in range(len(self)):
+            yield self.record(i)
+
+def load_columnar(path:str, mmap:bool=True)->ColumnarFleet:
+    """load a columnar .npz file written by write_columnar
+
+    Args:
+        path (str): path to the .npz file
+        mmap (bool, optional): memory-map the arrays instead of reading them
+            into memory. Defaults to True.
+
+    Returns:
+        ColumnarFleet: ship inputs
+    """
+    if mmap:
+        return ColumnarFleet(_mmap_npz(path))
+    with np.load(path) as npz:
+        return ColumnarFleet({k: npz[k] for k in npz.files})
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='convert input sheets to a columnar .npz file')
+    parser.add_argument('source', nargs='+',
+                        help='xlsx files, directories or glob patterns')
+    parser.add_argument('-o', '--output', required=True, help='output .npz file')
+    parser.add_argument('--skip-invalid', action='store_true',
+                        help='skip sheets that do not follow the inputs.xlsx layout')
+    args = parser.parse_args()
+
+    paths = [p for s in args.source for p in input_paths(s)]
+    skipped = convert_inputs(paths, args.output, skip_invalid=args.skip_invalid)
+    for p in skipped:
+        print('skipped {}'.format(p))
+    print('wrote {} ships to {}'.format(len(paths) - len(skipped), args.output))
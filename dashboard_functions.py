@@ -0,0 +1,251 @@
+import argparse
+import base64
+import html
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from reference_functions import PHASES, meets, reference_index, required_eedi
+
+# Fleet compliance report with one chart per ship type. The phase 0 to 3
+# reference lines of plotting_curves.csv and reduction_table.csv are
+# evaluated once per ship type on a shared capacity grid, and the attained
+# EEDI of every ship of the type is drawn on top with one draw call per
+# series, so a chart of thousands of ships costs about as much as a chart of
+# one. Charts are rendered in worker processes, one ship type each.
+#
+#   ships, engines = fleet_tables(records)
+#   result = pd.concat(iter_eedi_batch(ships, engines))
+#   fleet_report(result, 'report', formats = ('png', 'html'))
+#
+# matplotlib is imported by the workers only when a chart is rendered.
+
+FORMATS = ('png', 'svg', 'html')
+GRID_POINTS = 400
+SERIES = (('eedi_no_tech', 'EEDI without energy saving tech'),
+          ('eedi_with_tech', 'EEDI with energy saving tech'))
+
+def reference_curves(ship_type:str, capacity_max:float, n:int=GRID_POINTS,
+                     dwt_gt_ratio:float=np.nan)->tuple:
+    """required EEDI of phases 0 to 3 of a ship type on a capacity grid
+
+    Args:
+        ship_type (str): ship type of plotting_curves.csv
+        capacity_max (float): largest capacity of the grid
+        n (int, optional): number of grid points. Defaults to GRID_POINTS.
+        dwt_gt_ratio (float, optional): dwt / gt used for the
+            roro_cargo_vehicle reference line, which depends on it.
+            Defaults to NaN.
+
+    Returns:
+        tuple: grid (np.ndarray of n capacities from 100) and required EEDI
+            (np.ndarray of shape (n, 4))
+    """
+    grid = np.linspace(100, max(capacity_max, 200), n)
+    return grid, required_eedi(ship_type, grid, grid / dwt_gt_ratio)
+
+def fleet_summary(result)->list:
+    """number of ships and share meeting each phase per ship type
+
+    Args:
+        result (pd.DataFrame or dict): ship_type, capacity, v_ref and
+            eedi_with_tech of every ship and optionally gt, e.g. the chunks of
+            iter_eedi_batch or the csv written by runner_functions
+
+    Returns:
+        list: one dict per ship type with ship_type, ships, calculated (ships
+            with a finite attained EEDI and v_ref) and phase_0 to phase_3
+            (share of the calculated ships meeting the phase, NaN for ship
+            types without a reference line)
+    """
+    ship_type = np.asarray(result['ship_type']).astype(str)
+    capacity = np.asarray(result['capacity'], dtype=float)
+    gt = np.asarray(result['gt'], dtype=float) if 'gt' in result else np.nan
+    attained = np.asarray(result['eedi_with_tech'], dtype=float)
+    v_ref = np.asarray(result['v_ref'], dtype=float)
+    met = meets(attained[:, None], v_ref[:, None],
+                required_eedi(ship_type, capacity, gt))
+    ok = np.isfinite(attained) & np.isfinite(v_ref)
+
+    rows = []
+    for x in np.unique(ship_type):
+        mask = (ship_type == x) & ok
+        row = {'ship_type': x, 'ships': int((ship_type == x).sum()),
+               'calculated': int(mask.sum())}
+        has_reference = reference_index().codes(x) >= 0
+        for p in PHASES:
+            row['phase_{}'.format(p)] = (float(met[mask, p].mean())
+                                         if mask.any() and has_reference else np.nan)
+        rows.append(row)
+    return rows
+
+def _chart_data(result, ship_type:str, n:int)->dict:
+    #arrays of the ships of one type and its reference curves
+    types = np.asarray(result['ship_type']).astype(str)
+    mask = types == ship_type
+    capacity = np.asarray(result['capacity'], dtype=float)[mask]
+    data = {'ship_type': ship_type, 'capacity': capacity}
+    for column, label in SERIES:
+        data[column] = np.asarray(result[column], dtype=float)[mask]
+
+    ratio = np.nan
+    if 'gt' in result:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = np.nanmedian(capacity / np.asarray(result['gt'], dtype=float)[mask])
+    finite = capacity[np.isfinite(capacity)]
+    data['grid'], data['curves'] = reference_curves(
+        ship_type, finite.max() * 1.1 if len(finite) else 200., n, ratio)
+    return data
+
+def render_chart(data:dict, path:str, formats:tuple=('png',), dpi:int=100)->dict:
+    """draw the chart of one ship type
+
+    Args:
+        data (dict): ship_type, capacity, eedi_no_tech, eedi_with_tech, grid
+            and curves of the ship type
+        path (str): output path without extension
+        formats (tuple, optional): 'png' and/or 'svg' files to write, 'html'
+            returns the png bytes for embedding. Defaults to ('png',).
+        dpi (int, optional): resolution of the png. Defaults to 100.
+
+    Returns:
+        dict: format to written path, and 'png_bytes' when 'html' is
+            requested
+    """
+    import io
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+    #one Line2D per series, rasterized so large fleets stay small in svg
+    for column, label in SERIES:
+        y = data[column]
+        ax.plot(data['capacity'], y, linestyle='none', marker='o', markersize=3,
+                alpha=0.5, rasterized=True,
+                label='{} (n = {})'.format(label, int(np.isfinite(y).sum())))
+    for p in PHASES:
+        ax.plot(data['grid'], data['curves'][:, p], label='phase {} reference line'.format(p))
+
+    attained = np.concatenate([data[column] for column, label in SERIES])
+    attained = attained[np.isfinite(attained) & (attained > 0)]
+    top = np.percentile(attained, 99) * 1.5 if len(attained) else np.nanmax(data['curves'])
+    ax.set_xlim(0, data['grid'][-1])
+    ax.set_ylim(0, top)
+    if data['ship_type'] == 'cruise_ship':
+        ax.set_xlabel('Capacity [GT]')
+    else:
+        ax.set_xlabel('Capacity [DWT]')
+    ax.set_ylabel('EEDI')
+    ax.set_title('Calculated EEDI, {}'.format(data['ship_type']))
+    ax.legend()
+    ax.grid()
+
+    out = {}
+    for fmt in formats:
+        if fmt in ('png', 'svg'):
+            out[fmt] = '{}.{}'.format(path, fmt)
+            fig.savefig(out[fmt], dpi=dpi)
+    if 'html' in formats:
+        if 'png' in out:
+            with open(out['png'], 'rb') as f:
+                out['png_bytes'] = f.read()
+        else:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format='png', dpi=dpi)
+            out['png_bytes'] = buffer.getvalue()
+    plt.close(fig)
+    return out
+
+def _html(summary:list, charts:dict)->str:
+    #single page with the summary table and the embedded charts
+    head = ['ship type', 'ships', 'calculated'] + ['phase {}'.format(p) for p in PHASES]
+    rows = []
+    for row in summary:
+        cells = [html.escape(row['ship_type']), str(row['ships']), str(row['calculated'])]
+        cells += ['{:.1%}'.format(row['phase_{}'.format(p)])
+                  if row['phase_{}'.format(p)] == row['phase_{}'.format(p)] else '-'
+                  for p in PHASES]
+        rows.append('<tr>' + ''.join('<td>{}</td>'.format(c) for c in cells) + '</tr>')
+    images = ['<h2>{}</h2>\n<img alt="{}" src="data:image/png;base64,{}">'.format(
+                  html.escape(x), html.escape(x), base64.b64encode(png).decode())
+              for x, png in charts.items()]
+    return ('<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+            '<title>EEDI fleet compliance</title></head><body>\n'
+            '<h1>EEDI fleet compliance</h1>\n'
+            '<p>Share of the calculated ships whose attained EEDI with energy '
+            'saving technology meets each phase.</p>\n'
+            '<table border="1" cellpadding="4">\n<tr>'
+            + ''.join('<th>{}</th>'.format(h) for h in head) + '</tr>\n'
+            + '\n'.join(rows) + '\n</table>\n'
+            + '\n'.join(images) + '\n</body></html>\n')
+
+def fleet_report(result, outdir:str, formats:tuple=('png',), workers:int=None,
+                 n:int=GRID_POINTS, dpi:int=100)->dict:
+    """write one compliance chart per ship type of a batch result
+
+    Args:
+        result (pd.DataFrame or dict): ship_type, capacity, v_ref,
+            eedi_no_tech and eedi_with_tech of every ship and optionally gt,
+            e.g. the chunks of iter_eedi_batch or the csv written by
+            runner_functions
+        outdir (str): output directory, created if missing
+        formats (tuple, optional): any of FORMATS. png and svg write one file
+            per ship type, html writes index.html with the summary table and
+            every chart. Defaults to ('png',).
+        workers (int, optional): number of rendering processes, 1 to render
+            in this process. Defaults to the number of cpus.
+        n (int, optional): points of the reference line grid.
+            Defaults to GRID_POINTS.
+        dpi (int, optional): resolution of the png charts. Defaults to 100.
+
+    Returns:
+        dict: ship type to dict of format to written path, and 'html' to the
+            path of index.html when requested
+    """
+    bad = [x for x in formats if x not in FORMATS]
+    if bad:
+        raise ValueError('formats must be in {}, got {}'.format(', '.join(FORMATS), bad[0]))
+    os.makedirs(outdir, exist_ok=True)
+    #ship types without a reference line have no chart, fleet_summary lists them
+    types = [x for x in np.unique(np.asarray(result['ship_type']).astype(str))
+             if reference_index().codes(x) >= 0]
+    jobs = [(_chart_data(result, x, n), os.path.join(outdir, x), tuple(formats), dpi)
+            for x in types]
+
+    if workers == 1 or len(jobs) <= 1:
+        outputs = [render_chart(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(render_chart, *zip(*jobs)))
+
+    report = {}
+    charts = {}
+    for x, out in zip(types, outputs):
+        if 'png_bytes' in out:
+            charts[x] = out.pop('png_bytes')
+        report[x] = out
+    if 'html' in formats:
+        report['html'] = os.path.join(outdir, 'index.html')
+        with open(report['html'], 'w', encoding='utf-8') as f:
+            f.write(_html(fleet_summary(result), charts))
+    return report
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='write one EEDI compliance chart per ship type of a results file')
+    parser.add_argument('results', help='results csv of runner_functions or a batch result')
+    parser.add_argument('-o', '--output', required=True, help='output directory')
+    parser.add_argument('--formats', nargs='+', default=['png', 'html'], choices=FORMATS)
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='number of rendering processes (default: all cpus)')
+    args = parser.parse_args()
+
+    import pandas as pd
+    results = pd.read_csv(args.results)
+    if 'error' in results:
+        results = results[results['error'].fillna('') == '']
+    report = fleet_report(results, args.output, formats=tuple(args.formats),
+                          workers=args.workers)
+    print('wrote {} charts to {}'.format(len(report) - ('html' in report), args.output))
@@ -0,0 +1,329 @@
+import numpy as np
+
+from core_functions import GAS_FUELS
+
+# Fuel registry. Every fuel name is mapped once to an integer code, and the
+# lower calorific value, cf, density and tank filling rate of the fuels are
+# kept in arrays indexed by code. Engine tables carry the codes of their
+# fuels, so the fuel properties of a whole fleet are a single array gather
+# instead of a dict lookup per engine.
+#
+#   registry = fuel_registry()
+#   codes = registry.code(engines['liquid_fuel_type'])
+#   registry.cf[codes]
+#
+# The lcv and cf used for a ship always come from the cf table of its input
+# sheet, the defaults below are those of inputs.xlsx.
+#
+# The fuel ratio f_DFgas is computed for every fuel of the registry at once:
+# the engine power of a fleet is summed per ship and fuel code with one
+# bincount and compared to the energy in the tanks of each fuel.
+#
+#   code = engine_fuel_codes(is_diesel, is_df, liquid_code, gas_code)
+#   power = power_by_fuel(ship, code, p_engine, n_ship, len(fuel_registry()))
+#   volume, filling_rate = tank_volumes(ships, n_ship)
+#   f_dfgas = gas_fuel_ratios(power, volume, filling_rate)
+#
+# With legacy = True every gas fuel is counted as LNG, as the notebook does.
+
+# name, lower calorific value (kJ/kg), cf (t-CO2/t-fuel), density (kg/m^3),
+# filling rate of the tanks, gas fuel of dual fuel engines. Densities and
+# filling rates of diesel oils and LNG are the defaults of fuel_ratio.
+DEFAULT_FUELS = (
+    ('marine_diesel_oil', 42700, 3.206, 900, 0.98, False),
+    ('light_fuel_oil', 41200, 3.151, 980, 0.98, False),
+    ('heavy_fuel_oil', 40200, 3.114, 991, 0.98, False),
+    ('liquefied_petroleum_gas_propane', 46300, 3.000, 580, 0.95, True),
+    ('liquefied_petroleum_gas_butane', 45700, 3.030, 600, 0.95, True),
+    ('ethane', 46400, 2.927, 545, 0.95, True),
+    ('liquefied_natural_gas', 48000, 2.750, 450, 0.95, True),
+    ('methanol', 19900, 1.375, 796, 0.98, True),
+    ('ethanol', 26800, 1.913, 789, 0.98, True),
+    ('ammonia', 18600, 0.000, 682, 0.95, True))
+NO_FUEL = -1
+# tank volume and filling rate parameters of the input sheet, other fuels can
+# be given as 'v_<fuel>' and 'k_<fuel>', e.g. 'v_methanol'
+TANK_PARAMETERS = {'marine_diesel_oil': ('v_mdo', 'k_mdo'),
+                   'light_fuel_oil': ('v_lfo', 'k_lfo'),
+                   'heavy_fuel_oil': ('v_hfo', 'k_hfo'),
+                   'liquefied_natural_gas': ('v_lng', 'k_lng')}
+
+class FuelRegistry:
+    """integer codes and property arrays of the known fuels
+
+    Attributes:
+        names (tuple): fuel names, the code of a fuel is its position
+        lcv (np.ndarray): default lower calorific value in kJ/kg
+        cf (np.ndarray): default cf in t-CO2/t-fuel
+        density (np.ndarray): density in kg/m^3
+        filling_rate (np.ndarray): maximum filling rate of the tanks
+        is_gas (np.ndarray): gas fuel of dual fuel engines
+    """
+    __slots__ = ('names', '_codes', 'lcv', 'cf', 'density', 'filling_rate', 'is_gas')
+
+    def __init__(self, fuels:tuple):
+        """
+        Args:
+            fuels (tuple): (name, lcv, cf, density, filling_rate, is_gas) of
+                every fuel, as in DEFAULT_FUELS
+        """
+        names = tuple(f[0] for f in fuels)
+        if len(set(names)) != len(names):
+            raise ValueError('fuel names must be unique')
+        self.names = names
+        self._codes = {x: i for i, x in enumerate(names)}
+        for i, x in enumerate(('lcv', 'cf', 'density', 'filling_rate')):
+            values = np.array([f[i + 1] for f in fuels], dtype=float)
+            values.setflags(write=False)
+            setattr(self, x, values)
+        self.is_gas = np.array([bool(f[5]) for f in fuels], dtype=bool)
+        self.is_gas.setflags(write=False)
+
+    def __len__(self)->int:
+        return len(self.names)
+
+    def __contains__(self, name)->bool:
+        return name in self._codes
+
+    def fuels(self)->tuple:
+        """(name, lcv, cf, density, filling_rate, is_gas) of every fuel"""
+        return tuple(zip(self.names, self.lcv.tolist(), self.cf.tolist(),
+                         self.density.tolist(), self.filling_rate.tolist(),
+                         self.is_gas.tolist()))
+
+    def with_fuel(self, name:str, lcv:float, cf:float, density:float=np.nan,
+                  filling_rate:float=np.nan, is_gas:bool=False)->'FuelRegistry':
+        """registry with a fuel added, or replaced if the name is known
+
+        The codes of the other fuels are unchanged.
+
+        Args:
+            name (str): fuel name as in the cf table
+            lcv (float): lower calorific value in kJ/kg
+            cf (float): cf in t-CO2/t-fuel
+            density (float, optional): density in kg/m^3, required for gas
+                fuels. Defaults to NaN.
+            filling_rate (float, optional): maximum filling rate of the
+                tanks, required for gas fuels. Defaults to NaN.
+            is_gas (bool, optional): gas fuel of dual fuel engines.
+                Defaults to False.
+
+        Raises:
+            ValueError: when a gas fuel has no density or filling rate
+
+        Returns:
+            FuelRegistry: new registry
+        """
+        if is_gas and not (np.isfinite(density) and np.isfinite(filling_rate)):
+            raise ValueError('gas fuel {} needs a density and a filling rate'.format(name))
+        fuels = list(self.fuels())
+        fuel = (name, lcv, cf, density, filling_rate, is_gas)
+        if name in self._codes:
+            fuels[self._codes[name]] = fuel
+        else:
+            fuels.append(fuel)
+        return FuelRegistry(tuple(fuels))
+
+    def code(self, names)->np.ndarray:
+        """integer codes of fuel names
+
+        Args:
+            names (str or iterable): fuel names
+
+        Returns:
+            np.ndarray: code of each name, NO_FUEL for missing and unknown
+                names
+        """
+        if isinstance(names, str):
+            return np.array(self._codes.get(names, NO_FUEL))
+        get = self._codes.get
+        return np.fromiter((get(x, NO_FUEL) if isinstance(x, str) else NO_FUEL
+                            for x in names), dtype=np.int64)
+
+    def cf_table(self, cf_dict:dict)->np.ndarray:
+        """lcv and cf of every fuel from the cf table of a ship
+
+        Args:
+            cf_dict (dict): fuel lcv and cf from load_cf_dict
+
+        Returns:
+            np.ndarray: shape (fuels, 2) with the lcv and cf of each code,
+                NaN for fuels missing from cf_dict
+        """
+        table = np.full((len(self.names), 2), np.nan)
+        for x, values in cf_dict.items():
+            code = self._codes.get(x)
+            if code is not None:
+                table[code] = values[:2]
+        return table
+
+    def lookup(self, names, cf_dict:dict, column:int)->np.ndarray:
+        """lcv (column 0) or cf (column 1) of fuels from the cf table of a ship
+
+        Args:
+            names (iterable): fuel names
+            cf_dict (dict): fuel lcv and cf from load_cf_dict
+            column (int): 0 for the lcv, 1 for the cf
+
+        Returns:
+            np.ndarray: value of each fuel
+
+        Raises:
+            KeyError: for fuels missing from cf_dict
+        """
+        names = np.asarray(names, dtype=object)
+        codes = self.code(names)
+        values = np.where(codes >= 0, self.cf_table(cf_dict)[codes, column], np.nan)
+        for i in np.flatnonzero(np.isnan(values)):
+            #fuels unknown to the registry, or given as NaN in the sheet
+            values[i] = cf_dict[names[i]][column]
+        return values
+
+_registry = None
+
+def fuel_registry()->FuelRegistry:
+    """shared registry, DEFAULT_FUELS unless replaced by set_fuel_registry"""
+    global _registry
+    if _registry is None:
+        _registry = FuelRegistry(DEFAULT_FUELS)
+    return _registry
+
+def set_fuel_registry(registry:FuelRegistry=None):
+    """replace the shared registry, e.g. with fuels added by with_fuel
+
+    Set it before building the engine tables, and in every worker process.
+
+    Args:
+        registry (FuelRegistry, optional): new registry, None to go back to
+            DEFAULT_FUELS. Defaults to None.
+
+    Raises:
+        ValueError: when the codes of DEFAULT_FUELS would change
+    """
+    global _registry
+    default = tuple(f[0] for f in DEFAULT_FUELS)
+    if registry is not None and registry.names[:len(default)] != default:
+        raise ValueError('the registry must keep DEFAULT_FUELS first and in order')
+    _registry = registry
+
+def fuel_codes(names)->np.ndarray:
+    """integer codes of fuel names in the default registry
+
+    Args:
+        names (str or iterable): fuel names
+
+    Returns:
+        np.ndarray: code of each name, NO_FUEL for missing and unknown names
+    """
+    return fuel_registry().code(names)
+
+def engine_fuel_codes(is_diesel:np.ndarray, is_df:np.ndarray, liquid_code:np.ndarray,
+                      gas_code:np.ndarray, legacy:bool=False)->np.ndarray:
+    """fuel each engine is counted under in the fuel ratio
+
+    Diesel engines count under their liquid fuel and dual fuel engines under
+    their gas fuel, other engines are not counted.
+
+    Args:
+        is_diesel (np.ndarray): diesel engines
+        is_df (np.ndarray): dual fuel engines
+        liquid_code (np.ndarray): liquid fuel codes
+        gas_code (np.ndarray): gas fuel codes
+        legacy (bool, optional): count as fuel_ratio does, only diesel
+            engines on the TANK_PARAMETERS liquid fuels and dual fuel engines
+            on GAS_FUELS, all of them as liquefied natural gas.
+            Defaults to False.
+
+    Returns:
+        np.ndarray: fuel code of each engine, NO_FUEL for engines not counted
+    """
+    registry = fuel_registry()
+    if legacy:
+        liquid = np.isin(liquid_code, fuel_codes(list(TANK_PARAMETERS)[:3]))
+        gas = np.isin(gas_code, fuel_codes(GAS_FUELS))
+        return np.select([is_diesel & liquid, is_df & gas],
+                         [liquid_code, fuel_codes('liquefied_natural_gas')], NO_FUEL)
+    known = lambda code: (code >= 0) & (code < len(registry))
+    return np.select([is_diesel & known(liquid_code),
+                      is_df & known(gas_code) & registry.is_gas[np.maximum(gas_code, 0)]],
+                     [liquid_code, gas_code], NO_FUEL)
+
+def power_by_fuel(ship:np.ndarray, code:np.ndarray, power:np.ndarray,
+                  n_ship:int, n_fuel:int)->np.ndarray:
+    """total engine power of each ship on each fuel
+
+    Args:
+        ship (np.ndarray): ship of each engine, position in the fleet
+        code (np.ndarray): fuel code of each engine from engine_fuel_codes
+        power (np.ndarray): power of each engine in kW
+        n_ship (int): number of ships
+        n_fuel (int): number of fuel codes
+
+    Returns:
+        np.ndarray: power in kW of shape (n_ship, n_fuel)
+    """
+    counted = code != NO_FUEL
+    return np.bincount(np.asarray(ship)[counted] * n_fuel + code[counted],
+                       weights=np.asarray(power, dtype=float)[counted],
+                       minlength=n_ship * n_fuel).reshape(n_ship, n_fuel)
+
+def tank_volumes(params, n_ship:int, legacy:bool=False)->tuple:
+    """tank volume and filling rate of each ship for each fuel
+
+    Args:
+        params (pd.DataFrame or dict): ship parameters with the
+            TANK_PARAMETERS columns and optionally 'v_<fuel>' and 'k_<fuel>'
+            columns for other fuels of the registry
+        n_ship (int): number of ships
+        legacy (bool, optional): only the TANK_PARAMETERS volumes and the
+            registry filling rates, as fuel_ratio. Defaults to False.
+
+    Returns:
+        tuple: volume in m^3 and filling rate, both of shape (n_ship, fuels).
+            Volumes of fuels without a parameter are 0 and filling rates
+            missing or not above 0 are those of the registry
+    """
+    registry = fuel_registry()
+    volume = np.zeros((n_ship, len(registry)))
+    filling_rate = np.tile(registry.filling_rate, (n_ship, 1))
+    for code, name in enumerate(registry.names):
+        v, k = TANK_PARAMETERS.get(name, ('v_' + name, 'k_' + name))
+        if legacy and name not in TANK_PARAMETERS:
+            continue
+        if v in params:
+            volume[:, code] = np.asarray(params[v], dtype=float)
+        if not legacy and k in params:
+            rate = np.asarray(params[k], dtype=float)
+            filling_rate[:, code] = np.where(rate > 0, rate, filling_rate[:, code])
+    return volume, filling_rate
+
+def gas_fuel_ratios(power:np.ndarray, volume:np.ndarray,
+                    filling_rate:np.ndarray=None)->np.ndarray:
+    """fuel ratio of each gas fuel, f_DFgas, from the tank and power shares
+
+    f_DFgas of a gas fuel is the share of the energy stored on board in its
+    tanks divided by the share of the engine power running on it, as in
+    fuel_ratio for a single gas fuel.
+
+    Args:
+        power (np.ndarray): power_by_fuel of shape (n_ship, fuels)
+        volume (np.ndarray): tank volumes of shape (n_ship, fuels)
+        filling_rate (np.ndarray, optional): filling rates of shape
+            (n_ship, fuels). Defaults to those of the registry.
+
+    Returns:
+        np.ndarray: f_DFgas of shape (n_ship, fuels), 0 for fuels that are
+            not gas fuels or have no power or no tank
+    """
+    registry = fuel_registry()
+    filling_rate = registry.filling_rate if filling_rate is None else filling_rate
+    #in place, in the order of fuel_ratio so a single gas fuel matches it exactly
+    energy = volume * registry.density
+    energy *= registry.lcv
+    energy *= filling_rate
+    #fuels without a tank count as no energy, even without a density
+    energy[volume == 0] = 0.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        output = power.sum(axis=-1, keepdims=True) / power
+        output *= energy / energy.sum(axis=-1, keepdims=True)
+    return np.where(registry.is_gas & (power > 0) & (volume > 0), output, 0.)
@@ -0,0 +1,465 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from helper_functions import (FLOAT_LIST, STR_LIST, BOOL_LIST, EEDIResult,
+                              capacity_calc, p_ae_iterative_calc, p_pto_calc,
+                              shaft_motor_power, pto_pae_ratio, update_vref,
+                              calc_me_power, engine_arrays, calc_fd_gas,
+                              cat_b1_short, cat_c1, cat_c2, fj, fi, fc, fl, fm)
+
+# Dependency graph of the calculation in calc_eedi. Every node names the
+# inputs or nodes it is computed from, caches its value and is cleared only
+# when one of its upstream inputs changes, so editing one field re-runs only
+# the part of the calculation that depends on it.
+#
+#   model = EEDIModel(*record)
+#   model.result()
+#   model.set(p_pto_rated = 500)
+#   model['eedi_with_tech']    # re-runs the pto, pae split, v_ref and
+#                              # term nodes only
+
+NODES = {}
+#EEDIResult names of nodes named apart from the input they are computed from
+RESULT_NODES = {'v_ref': 'v_ref_calc'}
+
+def node(*deps):
+    """register a calculation node computed from deps
+
+    Args:
+        *deps (str): names of the inputs or nodes passed to the function,
+            in the order of its arguments
+
+    Returns:
+        callable: decorator adding the function to NODES under its name
+    """
+    def register(fn):
+        NODES[fn.__name__] = (fn, deps)
+        return fn
+    return register
+
+def _frame(**values)->pd.DataFrame:
+    #single row of ship parameters for the helper functions taking df_inpt
+    return pd.DataFrame({k: [v] for k, v in values.items()}, index=['value'])
+
+@node('df_me', 'propulsion_type', 'ship_type', 'mpp')
+def me_table(df_me, propulsion_type, ship_type, mpp):
+    return calc_me_power(df_me.copy(), _frame(propulsion_type = propulsion_type,
+                                              ship_type = ship_type, mpp = mpp))
+
+@node('me_table', 'cf_dict')
+def me_arrays(me_table, cf_dict):
+    return engine_arrays(me_table, cf_dict)
+
+@node('df_ae', 'cf_dict')
+def ae_arrays(df_ae, cf_dict):
+    return engine_arrays(df_ae, cf_dict, gas_fallback=True)
+
+@node('me_table')
+def mcr_me(me_table):
+    return me_table['mcr'].sum()
+
+@node('me_table')
+def p_me_eng(me_table):
+    return me_table['p_me'].to_numpy(dtype=float)
+
+@node('dwt', 'ship_type')
+def capacity(dwt, ship_type):
+    return capacity_calc(dwt = dwt, ship_type = ship_type)
+
+@node('disp_m3')
+def disp_t(disp_m3):
+    return disp_m3 * 1.025
+
+@node('me_table', 'me_arrays')
+def sfc_me_df(me_table, me_arrays):
+    return (np.nansum(me_table['sfc_pilot_fuel'].to_numpy(dtype=float)[me_arrays.is_df])
+            + np.nansum(me_arrays.sfc_gas_fuel[me_arrays.is_df]))
+
+@node('hload', 'gen_efficiency', 'ship_type', 'mcr_me', 'propulsion_type',
+      'p_sm_rated', 'mpp', 'p_pto_rated', 'cube', 'me_engine_stroke', 'sfc_me_df',
+      'electrical_eff', 'pti_eff', 'bor', 'cop_cooling', 'r_reliq', 'cop_comp',
+      'p_ae_eff_al')
+def p_ae(hload, gen_efficiency, ship_type, mcr_me, propulsion_type, p_sm_rated,
+         mpp, p_pto_rated, cube, me_engine_stroke, sfc_me_df, electrical_eff,
+         pti_eff, bor, cop_cooling, r_reliq, cop_comp, p_ae_eff_al):
+    if hload == 0:
+        return p_ae_iterative_calc(ship_type = ship_type,
+                                   mcr_me = mcr_me,
+                                   me_type = propulsion_type,
+                                   p_sm_rated = p_sm_rated,
+                                   mpp = mpp,
+                                   p_pto_rated = p_pto_rated,
+                                   cube = cube,
+                                   me_engine_stroke = me_engine_stroke,
+                                   sfc_me_gas_mode = sfc_me_df,
+                                   electrical_eff = electrical_eff,
+                                   gen_efficiency = gen_efficiency,
+                                   pti_eff = pti_eff,
+                                   bor = bor,
+                                   cop_cooling = cop_cooling,
+                                   r_reliq = r_reliq,
+                                   cop_comp = cop_comp,
+                                   add_load = p_ae_eff_al)
+    elif hload > 0:
+        return hload / gen_efficiency
+    raise ValueError('hload must be 0 or positive, got {}'.format(hload))
+
+@node('p_pto_rated', 'propulsion_type')
+def p_pto(p_pto_rated, propulsion_type):
+    return p_pto_calc(p_pto_rated = p_pto_rated, me_type = propulsion_type)
+
+@node('propulsion_type', 'me_table', 'df_ae', 'p_ae', 'p_pto')
+def pto_split(propulsion_type, me_table, df_ae, p_ae, p_pto):
+    return pto_pae_ratio(_frame(propulsion_type = propulsion_type),
+                         me_table, df_ae, p_ae, p_pto)
+
+@node('pto_split')
+def p_pto_remove_me(pto_split):
+    return pto_split[0]
+
+@node('pto_split')
+def p_ae_calc(pto_split):
+    return pto_split[1]
+
+@node('me_table', 'p_me_eng', 'p_pto_remove_me')
+def p_me_calc(me_table, p_me_eng, p_pto_remove_me):
+    #if using engine limitation, pto calculation option 2 is used
+    if sum(me_table['limited_power']) > 0:
+        return p_me_eng
+    return p_me_eng - p_pto_remove_me
+
+@node('me_table', 'p_me_calc', 'mpp', 'ship_type')
+def p_me(me_table, p_me_calc, mpp, ship_type):
+    if mpp == 0:
+        return p_me_calc.sum()
+    elif (mpp > 0) and (ship_type == 'cruise_ship'):
+        return 0
+    return me_table['p_me'].sum()
+
+@node('mpp', 'ship_type', 'p_sm_rated', 'propulsion_type', 'gen_efficiency', 'pti_eff')
+def pti(mpp, ship_type, p_sm_rated, propulsion_type, gen_efficiency, pti_eff):
+    if mpp == 0:
+        return shaft_motor_power(p_sm_rated = p_sm_rated,
+                                 me_type = propulsion_type,
+                                 mpp = mpp,
+                                 gen_efficiency = gen_efficiency,
+                                 pti_eff = pti_eff)
+    elif (mpp > 0) and (ship_type == 'cruise_ship'):
+        return shaft_motor_power(p_sm_rated = mpp,
+                                 me_type = propulsion_type,
+                                 mpp = mpp,
+                                 gen_efficiency = gen_efficiency,
+                                 pti_eff = pti_eff)
+    return 0, 0
+
+@node('pti')
+def p_pti(pti):
+    return pti[0]
+
+@node('pti')
+def p_pti_shaft(pti):
+    return pti[1]
+
+@node('p_me', 'p_pti_shaft', 'p_pto_remove_me')
+def p_me_deduct(p_me, p_pti_shaft, p_pto_remove_me):
+    return p_me + p_pti_shaft - p_pto_remove_me
+
+@node('p_sm_rated', 'p_pto_rated', 'v_ref_override', 'speed_power_equ',
+      'speed_power_a', 'speed_power_b', 'speed_power_c', 'v_ref', 'p_me_deduct')
+def v_ref_calc(p_sm_rated, p_pto_rated, v_ref_override, speed_power_equ,
+               speed_power_a, speed_power_b, speed_power_c, v_ref, p_me_deduct):
+    df_inpt = _frame(p_sm_rated = p_sm_rated, p_pto_rated = p_pto_rated,
+                     v_ref_override = v_ref_override, speed_power_equ = speed_power_equ,
+                     speed_power_a = speed_power_a, speed_power_b = speed_power_b,
+                     speed_power_c = speed_power_c, v_ref = v_ref)
+    return update_vref(df_inpt, p_me_deduct)
+
+@node('v_mdo', 'v_lfo', 'v_hfo', 'v_lng', 'me_arrays', 'ae_arrays', 'p_me_eng',
+      'p_ae_calc', 'df_ae')
+def fd_gas(v_mdo, v_lfo, v_hfo, v_lng, me_arrays, ae_arrays, p_me_eng, p_ae_calc, df_ae):
+    return calc_fd_gas(_frame(v_mdo = v_mdo, v_lfo = v_lfo, v_hfo = v_hfo, v_lng = v_lng),
+                       me_arrays, ae_arrays, p_me_eng,
+                       np.full(len(df_ae), float(p_ae_calc)))
+
+@node('me_arrays', 'fd_gas', 'p_me_calc', 'p_pto_remove_me')
+def me_terms(me_arrays, fd_gas, p_me_calc, p_pto_remove_me):
+    cf_sfc = me_arrays.cf_sfc(fd_gas)
+    me_term = (p_me_calc * cf_sfc).sum()
+    pto_term = (p_pto_remove_me * cf_sfc).sum()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cf_sfc_me = np.nan_to_num(me_term / p_me_calc.sum())
+    return me_term, pto_term, cf_sfc_me
+
+@node('me_terms')
+def me_term(me_terms):
+    return me_terms[0]
+
+@node('me_terms')
+def pto_term(me_terms):
+    return me_terms[1]
+
+@node('me_terms')
+def cf_sfc_me(me_terms):
+    return me_terms[2]
+
+@node('ae_arrays', 'fd_gas', 'p_ae_calc', 'cf_sfc_me', 'df_ae')
+def ae_terms(ae_arrays, fd_gas, p_ae_calc, cf_sfc_me, df_ae):
+    p_ae_calc_eng = np.full(len(df_ae), float(p_ae_calc))
+    ae_term = (p_ae_calc_eng * ae_arrays.cf_sfc(fd_gas)).sum()
+    if p_ae_calc_eng.sum() == 0:
+        return ae_term, cf_sfc_me
+    return ae_term, ae_term / p_ae_calc_eng.sum()
+
+@node('ae_terms')
+def ae_term(ae_terms):
+    return ae_terms[0]
+
+@node('ae_terms')
+def cf_sfc_ae(ae_terms):
+    return ae_terms[1]
+
+@node('w_e', 'eta_g', 'p_ae_eff_loss')
+def c_1_val(w_e, eta_g, p_ae_eff_loss):
+    return cat_c1(w_e = w_e, eta_g = eta_g, p_ae_eff_loss = p_ae_eff_loss)
+
+@node('f_temp', 'p_max', 'etad_gen', 'n')
+def c_2_val(f_temp, p_max, etad_gen, n):
+    return cat_c2(f_temp = f_temp, p_max = p_max, etad_gen = etad_gen, n = n,
+                  f_rad = 0.2, l_others = 10)
+
+@node('p_p_eff_al', 'p_ae_eff_al', 'p_me', 'p_pti_shaft', 'cf_sfc_me', 'cf_sfc_ae')
+def innovative(p_p_eff_al, p_ae_eff_al, p_me, p_pti_shaft, cf_sfc_me, cf_sfc_ae):
+    return cat_b1_short(p_p_eff_al = p_p_eff_al,
+                        p_ae_eff_al = p_ae_eff_al,
+                        p_me = p_me,
+                        p_pti_shaft = p_pti_shaft,
+                        cf_sfc_me = cf_sfc_me,
+                        cf_sfc_ae = cf_sfc_ae)
+
+@node('innovative')
+def p_eff(innovative):
+    return innovative[0]
+
+@node('innovative')
+def cf_sfc_me_pti(innovative):
+    return innovative[1]
+
+@node('p_eff', 'cf_sfc_me_pti')
+def b1_term(p_eff, cf_sfc_me_pti):
+    return p_eff * cf_sfc_me_pti
+
+@node('ship_type', 'ice_class', 'mcr_me', 'dwt', 'propulsion_redundancy', 'lpp', 'b',
+      'ds', 'disp_m3', 'v_ref_calc')
+def fj_term(ship_type, ice_class, mcr_me, dwt, propulsion_redundancy, lpp, b, ds,
+            disp_m3, v_ref_calc):
+    return fj(ship_type = ship_type, ice_class = ice_class, mcr = mcr_me, dwt = dwt,
+              propulsion_redundancy = propulsion_redundancy, l = lpp, b = b, d = ds,
+              disp_m3 = disp_m3, v_ref = v_ref_calc, g = 9.81)
+
+@node('ship_type', 'csr', 'ice_class', 'dwt', 'lpp', 'b', 'ds', 'disp_m3', 'disp_t',
+      'lwt_ref', 'lwt_enhance', 'lwt_csr', 'dwt_csr')
+def fi_term(ship_type, csr, ice_class, dwt, lpp, b, ds, disp_m3, disp_t, lwt_ref,
+            lwt_enhance, lwt_csr, dwt_csr):
+    return fi(ship_type = ship_type, csr = csr, ice_class = ice_class, dwt = dwt,
+              l = lpp, b = b, d = ds, disp_m3 = disp_m3, disp_t = disp_t,
+              lwt_ref = lwt_ref, lwt_enhance = lwt_enhance, lwt_csr = lwt_csr,
+              dwt_csr = dwt_csr)
+
+@node('ship_type', 'capacity', 'cube', 'diesel_direct_drive', 'marpol_annex', 'gt')
+def fc_term(ship_type, capacity, cube, diesel_direct_drive, marpol_annex, gt):
+    return fc(ship_type = ship_type, dwt = capacity, cube = cube,
+              diesel_direct_drive = diesel_direct_drive, marpol_annex = marpol_annex,
+              gt = gt)
+
+@node('ship_type', 'dwt', 'number_of_cranes', 'swl_crane', 'reach_crane',
+      'side_loader_weight', 'roro_weight')
+def fl_term(ship_type, dwt, number_of_cranes, swl_crane, reach_crane,
+            side_loader_weight, roro_weight):
+    return fl(ship_type = ship_type, dwt_ref = dwt, number_of_cranes = number_of_cranes,
+              swl_crane = swl_crane, reach_crane = reach_crane,
+              side_loader_weight = side_loader_weight, roro_weight = roro_weight)
+
+@node()
+def fw_term():
+    return 1
+
+@node('ice_class')
+def fm_term(ice_class):
+    return fm(ice_class = ice_class)
+
+@node('ae_term', 'fj_term', 'p_pti', 'c_1_val', 'c_2_val', 'cf_sfc_ae')
+def pti_terms(ae_term, fj_term, p_pti, c_1_val, c_2_val, cf_sfc_ae):
+    if ae_term == 0:
+        return 0, 0
+    return ((fj_term * p_pti) * cf_sfc_ae,
+            ((fj_term * p_pti) - (c_1_val + c_2_val)) * cf_sfc_ae)
+
+@node('pti_terms')
+def pti_term(pti_terms):
+    return pti_terms[0]
+
+@node('pti_terms')
+def pti_and_c_term(pti_terms):
+    return pti_terms[1]
+
+@node('fi_term', 'fc_term', 'fl_term', 'capacity', 'fw_term', 'v_ref_calc', 'fm_term')
+def denominator(fi_term, fc_term, fl_term, capacity, fw_term, v_ref_calc, fm_term):
+    return fi_term * fc_term * fl_term * capacity * fw_term * v_ref_calc * fm_term
+
+@node('fj_term', 'me_term', 'pto_term', 'ae_term', 'pti_term', 'denominator')
+def eedi_no_tech(fj_term, me_term, pto_term, ae_term, pti_term, denominator):
+    return (fj_term * me_term + pto_term + ae_term + pti_term) / denominator
+
+@node('fj_term', 'me_term', 'pto_term', 'ae_term', 'pti_and_c_term', 'b1_term',
+      'denominator')
+def eedi_with_tech(fj_term, me_term, pto_term, ae_term, pti_and_c_term, b1_term,
+                   denominator):
+    return ((fj_term * me_term + pto_term + ae_term + pti_and_c_term - b1_term)
+            / denominator)
+
+INPUTS = FLOAT_LIST + STR_LIST + BOOL_LIST + ['df_me', 'df_ae', 'cf_dict']
+
+def _dependents()->dict:
+    out = {name: set() for name in INPUTS + list(NODES)}
+    for name, (fn, deps) in NODES.items():
+        for dep in deps:
+            out[dep].add(name)
+    return out
+
+DEPENDENTS = _dependents()
+
+class EEDIModel:
+    """incremental EEDI calculation of a single ship
+
+    Inputs are the ship parameters of load_variables plus the engine tables
+    df_me and df_ae and cf_dict. Node values are computed on first access
+    and cached until one of their inputs is changed with set().
+
+    model[name] returns a node or an input. Names of EEDIResult return the
+    same value as calc_eedi, so model['v_ref'] is the reference speed used
+    in the EEDI (the v_ref_calc node, updated for PTO and PTI). The input
+    speed is model.inputs['v_ref'].
+
+    Attributes:
+        inputs (dict): current input values
+        cache (dict): node name to cached value
+        evaluations (Counter): number of times each node was computed
+    """
+    def __init__(self, df_inpt, cf_dict, df_me, df_ae):
+        """
+        Args:
+            df_inpt (pd.DataFrame): ship parameters from load_variables
+            cf_dict (dict): fuel lcv and cf from load_cf_dict
+            df_me (pd.DataFrame): main engine table from load_me_data
+            df_ae (pd.DataFrame): auxiliary engine table from load_ae_data
+        """
+        self.inputs = {x: df_inpt[x].iloc[0] for x in FLOAT_LIST + STR_LIST + BOOL_LIST}
+        self.inputs['df_me'] = df_me.drop(columns='p_me', errors='ignore')
+        self.inputs['df_ae'] = df_ae
+        self.inputs['cf_dict'] = cf_dict
+        self.cache = {}
+        self.evaluations = Counter()
+
+    def __getitem__(self, name:str):
+        return self._value(RESULT_NODES.get(name, name))
+
+    def _value(self, name:str):
+        #input or node value, nodes read the inputs under their own names
+        if name in self.inputs:
+            return self.inputs[name]
+        if name not in self.cache:
+            fn, deps = NODES[name]
+            self.cache[name] = fn(*[self._value(dep) for dep in deps])
+            self.evaluations[name] += 1
+        return self.cache[name]
+
+    def invalidate(self, name:str)->set:
+        """clear the cached values of every node downstream of name
+
+        Args:
+            name (str): input or node name
+
+        Returns:
+            set: names of the nodes that were cleared
+        """
+        cleared = set()
+        stack = list(DEPENDENTS[name])
+        while stack:
+            dep = stack.pop()
+            if dep in cleared:
+                continue
+            cleared.add(dep)
+            self.cache.pop(dep, None)
+            stack.extend(DEPENDENTS[dep])
+        return cleared
+
+    def set(self, **values)->set:
+        """change inputs and clear the nodes that depend on them
+
+        Args:
+            **values: input name to new value, e.g. p_pto_rated = 500 or
+                df_me = new_table
+
+        Raises:
+            KeyError: if a name is not an input
+
+        Returns:
+            set: names of the nodes that were cleared
+        """
+        cleared = set()
+        for name, value in values.items():
+            if name not in self.inputs:
+                raise KeyError('{} is not an input of the EEDI calculation'.format(name))
+            if name == 'df_me':
+                value = value.drop(columns='p_me', errors='ignore')
+            self.inputs[name] = value
+            cleared |= self.invalidate(name)
+        return cleared
+
+    def set_engine(self, kind:str, i:int, column:str, value)->set:
+        """change one value of an engine table
+
+        Args:
+            kind (str): 'me' or 'ae'
+            i (int): row position of the engine in its table
+            column (str): engine column such as 'mcr' or 'sfc_liquid_fuel'
+            value: new value
+
+        Returns:
+            set: names of the nodes that were cleared
+        """
+        name = 'df_' + kind
+        df = self.inputs[name].copy()
+        df.iloc[i, df.columns.get_loc(column)] = value
+        return self.set(**{name: df})
+
+    def upstream(self, name:str)->set:
+        """inputs and nodes that name depends on
+
+        Args:
+            name (str): node name
+
+        Returns:
+            set: names of every input and node upstream of name
+        """
+        out = set()
+        stack = list(NODES[name][1]) if name in NODES else []
+        while stack:
+            dep = stack.pop()
+            if dep not in out:
+                out.add(dep)
+                stack.extend(NODES[dep][1] if dep in NODES else [])
+        return out
+
+    def result(self)->EEDIResult:
+        """evaluate every node and return the result of calc_eedi
+
+        Returns:
+            EEDIResult: attained EEDI and all intermediate terms. df_me holds
+                the main engine table with p_me and df_ae the input table
+        """
+        terms = {f: self[f] for f in EEDIResult.__dataclass_fields__
+                 if f not in ('df_me', 'df_ae')}
+        return EEDIResult(**terms, df_me = self['me_table'], df_ae = self['df_ae'])
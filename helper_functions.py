@@ -1,1397 +1,26 @@
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
 import numpy as np
 import pandas as pd
 
-def capacity_calc(dwt:int, ship_type:str)->int:
-    """calculate the capcity for calculating EEDI
-
-    Args:
-        dwt (int): deadweight of the ship in tonnes
-        ship_type (str): type of ship
-
-    Returns:
-        int: deadweight used in EEDI calculation
-    """ 
-    if ship_type != 'container_ship':
-        output = dwt
-    else:
-        output = dwt * 0.7
-    return output
-
-def fuel_ratio(
-    v_mdo:float, v_lfo:float, v_hfo:float, v_lng:float,
-    power_mdo:int, power_lfo:int, power_hfo:int, power_lng:int,
-    rho_mdo:float=900, rho_lfo:float=980,
-    rho_hfo:float=991, rho_lng:float=450,
-    lcv_mdo:float=42700, lcv_lfo:float=41200,
-    lcv_hfo:float=40200, lcv_lng:float=48000,
-    k_mdo:float=0.98, k_lfo:float=0.98,
-    k_hfo:float=0.98, k_lng:float=0.95)->float:
-    """Function to calculate primary fuel
-
-    Args:
-        v_mdo (float): Total fuel capacity of MDO in cubic Metres
-        v_lfo (float): Total fuel capacity of LFO in cubic Metres
-        v_hfo (float): Total fuel capacity of HFO in cubic Metres
-        v_lng (float): Total fuel capacity of lng in cubic Metres
-        power_mdo (int): Total installed power of main and aux MDO
-            engines
-        power_lfo (int): Total installed power of main and aux LFO
-            engines
-        power_hfo (int): Total installed power of main and aux HFO
-            engines
-        power_lng (int): Total installed power of main and aux LNG
-            engines
-        rho_mdo (float, optional): Density of MDO in Kilograms per
-            cubic Metres. Defaults to 900.
-        rho_lfo (float, optional): Density of LFO in Kilograms per
-            cubic Metres. Defaults to 980.
-        rho_hfo (float, optional): Density of HFO in Kilograms per
-            cubic Metres. Defaults to 991.
-        rho_lng (float, optional): Density of lng in Kilograms per
-            cubic Metres. Defaults to 450.
-        lcv_mdo (float, optional): Lower calorific value of MDO in
-            Kilojoules per Kilogram. Defaults to 42700.
-        lcv_lfo (float, optional): Lower calorific value of LFO in
-            Kilojoules per Kilogram. Defaults to 41200.
-        lcv_hfo (float, optional): Lower calorific value of HFO in
-            Kilojoules per Kilogram. Defaults to 40200.
-        lcv_lng (float, optional): Lower calorific value of LNG in
-            Kilojoules per Kilogram. Defaults to 48000.
-        k_mdo (float, optional): Filling rate of MDO (max fill % of
-            the fuel tank). Defaults to 0.98.
-        k_lfo (float, optional): Filling rate of LFO (max fill % of
-            the fuel tank). Defaults to 0.98.
-        k_hfo (float, optional): Filling rate of HFO (max fill % of
-            the fuel tank). Defaults to 0.98.
-        k_lng (float, optional): Filling rate of lng (max fill % of
-            the fuel tank). Defaults to 0.95.
-
-    Returns:
-        float: gas fuel ratio, liquid fuel ratio
-    """
-    if (power_lng > 0) & (v_lng > 0):
-        power_ratio = (power_mdo + power_lfo 
-                       + power_hfo + power_lng) / power_lng
-        gas = v_lng * rho_lng * lcv_lng * k_lng
-        mdo = v_mdo * rho_mdo * lcv_mdo * k_mdo
-        lfo = v_lfo * rho_lfo * lcv_lfo * k_lfo
-        hfo = v_hfo * rho_hfo * lcv_hfo * k_hfo
-        
-        output = power_ratio * (gas / (mdo + lfo + hfo + gas))
-    else:
-        output = 0    
-    
-    return output
-
-def main_engine_power(mcr_me:int,
-                      me_type:str,
-                      pto_dediction:int=0,
-                      electrical_eff:float=0.913)->int:
-    """Function to calculate Pme
-
-    Args:
-        mcr_me (int): total ME installed power in kW
-        me_type (str): choose either 'diesel'
-            'dual_fuel'
-            'steam_turbine'
-            'diesel_electric'
-        pto_dediction (int): corrections applied for pto in kW
-        electrical_eff (float, optional): product of electrical efficiency of
-            generator, transformer, converter and motor for diesel electric
-            propulsion. Defaults to 0.913.
-
-    Returns:
-        int: Pme - main engine power for the EEDI calculation
-    """    
-    if (me_type == 'diesel') or (me_type == 'dual_fuel'):
-        me_75 = mcr_me * 0.75
-    elif me_type == 'steam_turbine':
-        me_75 = mcr_me * 0.83
-    elif me_type == 'diesel_electric':
-        me_75 = (mcr_me * 0.83) / electrical_eff
-        
-    output = me_75 - pto_dediction
-    
-    return output
-
-def shaft_gen_reduc_to_me(pae:float,
-                    p_pto:int,
-                    me_type:str)->float:
-    """Calculate shaft generator reduction to Pme
-
-    Args
-        pae (float): total auxiliary power load in kW
-        p_pto (int): sum of the rated electrical output of all PTOs in
-            Kilowatts.
-        me_type (str): choose either 'diesel'
-            'dual_fuel'
-            'steam_turbine'
-            'diesel_electric'
-    
-    It is assumed the calculation for DE propulsion is the same as traditional
-    propulsion
-    
-    Returns:
-        float: shaft generator reduction to be subtracted from Pme
-    """ 
-    reduction = min(pae / 0.75, p_pto * 0.75) #pto output at 75%
-    
-    standard_list = ['diesel', 'dual_fuel', 'diesel_electric']
-    if me_type in standard_list:
-        output = reduction * 0.75
-    elif me_type == 'steam_turbine':
-        output = reduction * 0.83
-    
-    return output
-
-def p_pto_calc(p_pto_rated:int,
-               me_type:str)->float:
-    """Calculate shaft generator power P_pto
-
-    Args
-        p_pto_rated (int): sum of the rated electrical output of all PTOs in
-            Kilowatts.
-        me_type (str): choose either 'diesel'
-            'dual_fuel'
-            'steam_turbine'
-            'diesel_electric'
-    
-    It is assumed the calculation for DE propulsion is the same as traditional
-    propulsion
-    
-    Returns:
-        float: shaft generator power P_pto
-    """
-    standard_list = ['diesel', 'dual_fuel', 'diesel_electric']
-    if me_type in standard_list:
-        output = p_pto_rated * 0.75
-    elif me_type == 'steam_turbine':
-        output = p_pto_rated * 0.83
-        
-    return output
-
-def shaft_motor_power(p_sm_rated:float,
-                      me_type:str,
-                      mpp:float,
-                      gen_efficiency:float=0.93,
-                      pti_eff:float=0.97)->float:
-    """Calculate shaft motor increase to Pme
-
-    Args:
-        p_sm_rated (float): sum of the rated power consumption of all all shaft
-             motors in Kilowatts
-        me_type (str): choose either 'diesel'
-            'dual_fuel'
-            'steam_turbine'
-            'diesel_electric'
-        mpp (float): rated output of the electrical propulsion motors in kW
-        gen_efficiency (float, optional): weighted efficiency of the generators
-            to provide power to the shaft motors. Defaults to 0.93.
-        pti_eff (float, optional): efficiency of the shaft motors.
-            Defaults to 0.97.
-
-    Returns:
-        float: shaft motor correction applied to be added to Pme
-    """
-    
-    standard_list = ['diesel', 'dual_fuel', 'diesel_electric']
-    if mpp == 0:
-        if me_type in standard_list:
-            p_pti = (p_sm_rated * 0.75) / gen_efficiency
-            p_pti_shaft = p_sm_rated * pti_eff * 0.75
-        elif me_type == 'steam_turbine':
-            p_pti = (p_sm_rated * 0.83) / gen_efficiency
-            p_pti_shaft = p_sm_rated * pti_eff * 0.75
-    elif mpp > 0:
-        if me_type in standard_list:
-            p_pti = (p_sm_rated * 0.75) / (gen_efficiency * pti_eff)
-            p_pti_shaft = (p_sm_rated * 0.75) / (gen_efficiency * pti_eff)
-        elif me_type == 'steam_turbine':
-            p_pti = (p_sm_rated * 0.83) / (gen_efficiency * pti_eff)
-            p_pti_shaft = (p_sm_rated * 0.83) / (gen_efficiency * pti_eff)
-    else:
-        p_pti = 0
-        p_pti_shaft = 0
-    # p_pti = (
-    #     ((me_type in standard_list)
-    #      * (0.75 * p_sm_rated) / gen_efficiency)
-    #     + ((me_type == 'steam_turbine')
-    #        * (0.83 * p_sm_rated) / gen_efficiency)
-    #     )        
-    # p_pti_shaft = (
-    #     (((me_type in standard_list)
-    #       * (0.75 * p_sm_rated * pti_eff))
-    #     + ((me_type == 'steam_turbine')
-    #        * (0.83 * p_sm_rated * pti_eff)))
-    # )
-    return p_pti, p_pti_shaft
-
-def reliqu_addition(cube:int,
-                    bor:float,
-                    cop_cooling:float=0.166,
-                    r_reliq:float=1)->float:
-    """calculate additional auxiliary load for reliquefaction system
-
-    Args:
-        cube (int): gas tank capacity in cubic Metres
-        bor (float): design rate of boil-off gas of entire ship per day in % per day
-        cop_cooling (float): coefficient of design performance of reliquefaction system
-        r_reliq (float): ratio of boil-off gas (BOG) to be reliquefied to entire BOG
-
-    Returns:
-        float: Additional auxiliary power load in kW from reliquefaction system
-    """    
-    cop_reliq = (
-        (425 * 511)
-        / (24 * 3600 * cop_cooling)) #see MEPC.364(79) 2.2.5.6.3 for more info
-    output = cube * bor / 100 * cop_reliq * r_reliq
-    return output
-
-def fuel_compressor(ship_type:str,
-                    me_engine_stroke:str,
-                    sfc_me_gas_mode:int,
-                    p_me:int,
-                    cop_comp:int=0.33)->float:
-    """calculate additional auxiliary load for fuel compressor
-
-    Args:
-        ship_type (str): type of ship from pre-defined list
-        me_engine_stroke (str): type of main engine. options are
-            'two_stroke' or 'four_stroke'
-        sfc_me_gas_mode (int): specific fuel consumption of main engine in gas mode in g/kWhr
-        p_me (int): main engine power for the EEDI calculation in kW            
-        cop_comp (int, optional): design power performance of compressors in kWhr/kg. Defaults to 0.33.
-
-    Returns:
-        float: Additional auxiliary power load in kW from high pressure fuel compressors
-    """
-    if ship_type == 'lng_carrier':
-        if me_engine_stroke == 'two_stroke':
-            output = (p_me / 1000) * cop_comp * sfc_me_gas_mode
-        elif me_engine_stroke == 'four_stroke':
-            output = p_me * 0.02
-    else:
-        output = 0
-        
-    return output
-
-def calc_pae(mcr_me:float,
-             p_pti:float=0)->float:
-    """calculate auxiliary power load in kW
-
-    Args:
-        mcr_me (float): sum of maximum continuous rating of all main engines in kW
-        p_pti (float, optional): power of shaft motors (if used) in kW. Defaults to 0.
-
-    Returns:
-        float: auxlilary power load in kW. This does not include additions to the auxlilary power such as reliquefaction systems
-    """    
-    limit = mcr_me + (p_pti / 0.75)
-    if limit >= 10000:
-        output = (limit * 0.025) + 250
-    elif limit < 10000:
-        output = limit * 0.05
-    # output  = (
-    #     ((limit >= 10000)
-    #      * ((0.025 * limit)+250))
-    #     + ((limit < 10000)
-    #      * (0.05 * limit))
-    # )
-    return output
-
-def p_ae_iterative_calc(ship_type:str,
-                        mcr_me:int,
-                        me_type:str,
-                        p_sm_rated:float,
-                        mpp:float,
-                        p_pto_rated:int,
-                        cube:int,
-                        me_engine_stroke:str,
-                        sfc_me_gas_mode:int,
-                        electrical_eff:float=0.913,
-                        gen_efficiency:float=0.93,
-                        pti_eff:float=0.97,
-                        bor:float=0,
-                        cop_cooling:float=0.166,
-                        r_reliq:float=1,
-                        cop_comp:float=0.33,
-                        add_load:float=0)->float:
-    """calculate ae power
-
-    Args:
-        ship_type (str): ship type
-        mcr_me (int): total ME installed power in kW
-        me_type (str): choose either 'diesel', 'dual_fuel',
-            'steam_turbine' or 'diesel_electric'
-        p_sm_rated (float): sum of the rated power consumption of all
-        mpp (float): rated output of the electrical propulsion motors in kW
-        p_pto_rated (int): p_pto_rated (float): sum of the rated electrical
-        cube (int): gas tank capacity in cubic Metres
-        me_engine_stroke (str): type of main engine. options are
-            'two_stroke' or 'four_stroke'
-        sfc_me_gas_mode (int): weighted sfc of me in gas mode in g/kWh
-        electrical_eff (float, optional): product of electrical efficiency of
-            generator, transformer, converter and motor for diesel electric
-            propulsion. Defaults to 0.913.
-        gen_efficiency (float, optional): weighted efficiency of the generators
-            to provide power to the shaft motors. Defaults to 0.93.
-        pti_eff (float, optional): efficiency of the shaft motors. Defaults to 0.97.
-        bor (float): design rate of boil-off gas of entire ship. Defaults to 0.
-        cop_cooling (float, optional): coefficient of design performance of
-            reliquefaction system. Defaults to 0.166.
-        r_reliq (float, optional): ratio of boil-off gas (BOG) to be
-            reliquefied to entire BOG. Defaults to 1.
-        cop_comp (float, optional): design power performance of compressors in kWhr/kg.
-            Defaults to 0.33.
-        add_load (float, optional): additional auxiliary load in kW. Defaults to 0.
-
-    Returns:
-        float: ae power with additional ae loads such as reliq system
-    """
-    # This is an interative loop when an lng carrier with compressors for high
-    # or low pressure gas fuel. If not applicable, the loop still runs but no
-    # change between iterations occur
-    
-    # Initiate loop
-    if (me_type == 'diesel_electric') and (mpp > 0):
-        mcr = mpp.copy()
-    else:
-        mcr = mcr_me.copy()
-        
-    pme = main_engine_power(mcr_me = mcr,
-                            me_type = me_type,
-                            pto_dediction = 0,
-                            electrical_eff = electrical_eff)
-    
-    for i in range(5):
-        #calculate reliquefaction plant power
-        reliq = reliqu_addition(cube = cube,
-                                bor = bor,
-                                cop_cooling = cop_cooling,
-                                r_reliq = r_reliq)
-        #calculate compressor power for high or low pressure gas fuel supply
-        compressors = fuel_compressor(ship_type = ship_type,
-                                      me_engine_stroke = me_engine_stroke,
-                                      sfc_me_gas_mode = sfc_me_gas_mode,
-                                      p_me = pme,
-                                      cop_comp = cop_comp)
-        #calculate shaft motor power (can be equal to 0)
-        p_sm = shaft_motor_power(p_sm_rated = p_sm_rated,
-                                 me_type = me_type,
-                                 mpp = mpp,
-                                 gen_efficiency = gen_efficiency,
-                                 pti_eff = pti_eff)[0]
-        #calculate pae
-        pae = calc_pae(mcr_me = mcr,
-                       p_pti = p_sm) + compressors + reliq + add_load
-        #calculate reduction to pme from shaft generator
-        shaft_gen_reduct_to_me_kw = shaft_gen_reduc_to_me(pae=pae,
-                                                          p_pto=p_pto_rated,
-                                                          me_type=me_type)
-        #calculate pme
-        pme = main_engine_power(mcr_me = mcr,
-                                me_type = me_type,
-                                pto_dediction = shaft_gen_reduct_to_me_kw,
-                                electrical_eff = electrical_eff)
-    return pae        
-
-
-def ice_class_correction(ship_type:str,
-                         ice_class:str,
-                         mcr:float,
-                         dwt:float)->float:
-    """calculate ice-class correction
-
-    Args:
-        ship_type (str): ship type. Should be one of:
-            tanker
-            bulk_carrier
-            general_cargo
-            refrigerated_cargo
-        ice_class (str): ice class. Should be one of:
-            'none'
-            'ia_super'
-            'ia'
-            'ib'
-            'ic'
-        mcr (float): sum of maximum continuous rating
-            of main engines in kW
-        dwt (float): deadweight tonnes of ship in tonnes
-
-    Returns:
-        float: ice class power correction factore, fj 
-    """
-    #initiate variables if statements are false
-    fj_0 = 1
-    fj_min = 1
-    
-    if ship_type == 'tanker':
-        fj_0 = (17.444 * dwt ** 0.5766) / mcr
-        if ice_class == 'ia_super':
-            fj_min = 0.2488 * dwt ** 0.0903
-        elif ice_class == 'ia':
-            fj_min = 0.4541 * dwt ** 0.0524
-        elif ice_class == 'ib':
-            fj_min = 0.7783 * dwt ** 0.0145
-        elif ice_class == 'ic':
-            fj_min = 0.8741 * dwt ** 0.0079
-        else:
-            fj_min = 1
-            
-    elif ship_type == 'bulk_carrier':
-        fj_0 = (17.207 * dwt ** 0.5705) / mcr
-        if ice_class == 'ia_super':
-            fj_min = 0.2515 * dwt ** 0.0851
-        elif ice_class == 'ia':
-            fj_min = 0.3918 * dwt ** 0.0556
-        elif ice_class == 'ib':
-            fj_min = 0.8075 * dwt ** 0.0071
-        elif ice_class == 'ic':
-            fj_min = 0.8573 * dwt ** 0.0087
-        else:
-            fj_min = 1
-            
-    elif ship_type == 'general_cargo':
-        fj_0 = (1.974 * dwt ** 0.7987) / mcr
-        if ice_class == 'ia_super':
-            fj_min = 0.1381 * dwt ** 0.1435
-        elif ice_class == 'ia':
-            fj_min = 0.1574 * dwt ** 0.1440
-        elif ice_class == 'ib':
-            fj_min = 0.3256 * dwt ** 0.0922
-        elif ice_class == 'ic':
-            fj_min = 0.4966 * dwt ** 0.0583
-        else:
-            fj_min = 1
-            
-    elif ship_type == 'refrigerated_cargo':
-        fj_0 = (5.598 * dwt ** 0.696) / mcr
-        if ice_class == 'ia_super':
-            fj_min = 0.5254 * dwt ** 0.0357
-        elif ice_class == 'ia':
-            fj_min = 0.6325 * dwt ** 0.0278
-        elif ice_class == 'ib':
-            fj_min = 0.7670 * dwt ** 0.0159
-        elif ice_class == 'ic':
-            fj_min = 0.8918 * dwt ** 0.0079
-        else:
-            fj_min = 1
-    
-    else:
-        fj_0 = 1
-       
-    # fj_0 = (
-    #     ((ship_type == 'tanker')
-    #     * (17.444 * dwt ** 0.5766) / mcr
-    #     )
-    #     + ((ship_type == 'bulk_carrier')
-    #     * (17.207 * dwt ** 0.5705) / mcr
-    #     )
-    #     + ((ship_type == 'general_cargo')
-    #     * (1.974 * dwt ** 0.7987) / mcr
-    #     )
-    #     + ((ship_type == 'refrigerated_cargo')
-    #     * (5.598 * dwt ** 0.696) / mcr
-    #     )
-    # )
-    
-    # fj_min = (
-    #     # tanker
-    #     ((ship_type == 'tanker')
-    #      * (
-    #          ((ice_class == 'ia_super')
-    #           * (0.2488 * dwt ** 0.0903))
-    #          +((ice_class == 'ia')
-    #            * (0.4541 * dwt ** 0.0524))
-    #          +((ice_class == 'ib')
-    #            * (0.7783 * dwt ** 0.0145))
-    #          +((ice_class == 'ic')
-    #            * (0.8741 * dwt ** 0.0079))
-    #          ))
-    #     # bulk carrier
-    #     + ((ship_type == 'bulk_carrier')
-    #      * (
-    #          ((ice_class == 'ia_super')
-    #           * (0.2515 * dwt ** 0.0851))
-    #          +((ice_class == 'ia')
-    #            * (0.3918 * dwt ** 0.0556))
-    #          +((ice_class == 'ib')
-    #            * (0.8075 * dwt ** 0.0071))
-    #          +((ice_class == 'ic')
-    #            * (0.8573 * dwt ** 0.0087))
-    #          ))
-    #     # general cargo
-    #     + ((ship_type == 'general_cargo')
-    #      * (
-    #          ((ice_class == 'ia_super')
-    #           * (0.1381 * dwt ** 0.1435))
-    #          +((ice_class == 'ia')
-    #            * (0.1574 * dwt ** 0.1440))
-    #          +((ice_class == 'ib')
-    #            * (0.3256 * dwt ** 0.0922))
-    #          +((ice_class == 'ic')
-    #            * (0.4966 * dwt ** 0.0583))
-    #          ))
-    #     # refrigerated_cargo
-    #     + ((ship_type == 'refrigerated_cargo')
-    #      * (
-    #          ((ice_class == 'ia_super')
-    #           * (0.5254 * dwt ** 0.0357))
-    #          +((ice_class == 'ia')
-    #            * (0.6325 * dwt ** 0.0278))
-    #          +((ice_class == 'ib')
-    #            * (0.7670 * dwt ** 0.0159))
-    #          +((ice_class == 'ic')
-    #            * (0.8918 * dwt ** 0.0079))
-    #          ))
-    # )
-    
-    output = min(max(fj_0, fj_min),1)
-    return output
-
-def shuttle_correction(ship_type:str,
-                       dwt:float,
-                       propulsion_redundancy:bool)->float:
-    """calculate shuttle tanker correction
-
-    Args:
-        ship_type (str): ship type
-        dwt (float): deadweight tonnes of ship
-        in tonnes
-        propulsion_redundancy (bool): does the
-            ship have propulsion redundancy?
-            True == yes
-            False == no
-
-    Returns:
-        float: shuttle tanker power correction factore, fj 
-    """
-    criteria = ((ship_type == 'shuttle_tanker')
-                and (propulsion_redundancy == True)
-                and (dwt >= 80000)
-                and (dwt <= 160000))
-    if criteria == True:
-        output = 0.77
-    else:
-        output = 1.
-    
-    return output
-
-def roro_correction(ship_type:str,
-                    l:float,
-                    b:float,
-                    d:float,
-                    disp_m3:float,
-                    v_ref:float,
-                    g:float=9.81)->float:
-    """calculate roro correction
-
-    Args:
-        ship_type (str): ship type
-        l (float): length between perpendiculars in m
-        b (float): beam in m
-        d (float): draught in m
-        disp_m3 (float): displacement in m^3
-        v_ref (float): reference velocity in knots
-        g (float, optional): acceleration due to gravity.
-            Defaults to 9.81.
-
-    Returns:
-        float: roro cargo and roro passenger power
-            correction factor, fj
-    """      
-    
-    #initiate constants
-    #_c denotes roro Cargo ship
-    alpha_c = 2.
-    beta_c = 0.5
-    gamma_c = 0.75
-    delta_c = 1.
-    
-    #_p denotes roro Passenger ship
-    alpha_p = 2.5
-    beta_p = 0.75
-    gamma_p = 0.75
-    delta_p = 1.
-    
-    fn = (0.5144 * v_ref) / ((l * g)**0.5)
-    
-    if ship_type == 'roro_cargo':
-        fj_calc = (1
-                   / ((fn ** alpha_c)
-                      * ((l / b) ** beta_c)
-                      * ((b / d) ** gamma_c)
-                      * ((l / disp_m3 ** (1 / 3)) ** delta_c)))
-    elif ship_type == 'roro_passenger':
-        fj_calc = (1
-                   / ((fn ** alpha_p)
-                      * ((l / b) ** beta_p)
-                      * ((b / d) ** gamma_p)
-                      * ((l / disp_m3 ** (1 / 3)) ** delta_p)))
-    else:
-        fj_calc = 1.
-        
-    # fj_calc = (((ship_type == 'roro_cargo')
-    #       * (1
-    #          / (
-    #              (fn ** alpha_c)
-    #              * ((l / b) ** beta_c)
-    #              * ((b / d) ** gamma_c)
-    #              * ((l / disp_m3 ** (1 / 3)) ** delta_c))))
-    #       + ((ship_type == 'roro_passenger')
-    #       * (1
-    #          / (
-    #              (fn ** alpha_p)
-    #              * ((l / b) ** beta_p)
-    #              * ((b / d) ** gamma_p)
-    #              * ((l / disp_m3 ** (1 / 3)) ** delta_p))))
-    # )
-    output = min(fj_calc, 1)
-    return output
-
-def general_cargo_correction(ship_type:str,
-                             l:float,
-                             b:float,
-                             d:float,
-                             disp_m3:float,
-                             v_ref:float,
-                             g:float=9.81)->float:
-    """calcualte general cargo ship correction 
-
-    Args:
-        ship_type (str): ship type
-        l (float): length between perpendiculars in m
-        b (float): beam in m
-        d (float): draught in m
-        disp_m3 (float): displacement in m^3
-        v_ref (float): reference velocity in knots
-        g (float, optional): acceleration due to gravity.
-            Defaults to 9.81.
-
-    Returns:
-        float: general cargo ship power
-            correction factor, fj
-    """
-    if ship_type == 'general_cargo':
-        #calculate constants
-        fn_disp_calc = ((0.5144 * v_ref)
-                        / (g * disp_m3 ** (1 / 3)) ** 0.5 )    
-        fn_disp = min(fn_disp_calc, 0.6)        
-        cb = disp_m3 / (l * b * d)
-        #calculate fj
-        fj_calc = 0.174 / (fn_disp ** 2.3 * cb ** 0.3)
-    else:
-        fj_calc = 1.
-    
-    # fj_calc = ((ship_type == 'general_cargo') 
-    #        * (0.174 / (fn_disp ** 2.3 * cb ** 0.3)))
-    
-    output = min(fj_calc, 1)
-    
-    return output
-
-def fj(ship_type:str,
-       ice_class:str='none',
-       mcr:float=0,
-       dwt:float=0,
-       propulsion_redundancy:bool=False,
-       l:float=0,
-       b:float=0,
-       d:float=0,
-       disp_m3:float=0,
-       v_ref:float=0,
-       g:float=9.81)->float:
-    """calculate fj
-
-    Args:
-        ship_type (str): ship type
-        ice_class (str, optional): ice class. Should be one of:
-            'none'
-            'ia_super'
-            'ia'
-            'ib'
-            'ic'. Defaults to 'none'.
-        mcr (float, optional): sum of maximum continuous rating
-            of main engines in kW. Defaults to 0.
-        dwt (float, optional): deadweight tonnes of ship in 
-            tonnes. Defaults to 0.
-        propulsion_redundancy (bool, optional): does the
-            ship have propulsion redundancy?
-            True == yes
-            Flase == no. Defaults to False.
-        l (float, optional): length between perpendiculars in m.
-            Defaults to 0.
-        b (float, optional): beam in m. Defaults to 0.
-        d (float, optional): draught in m. Defaults to 0.
-        disp_m3 (float, optional): displacement in m^3. Defaults to 0.
-        v_ref (float, optional): reference velocity in knots.
-            Defaults to 0.
-        g (float, optional): acceleration due to gravity.
-            Defaults to 9.81.
-
-    Returns:
-        float: value for fj - ship-specific design elements
-    """
-    ice_test = (ship_type in ['tanker','bulk_carrier','general_cargo','refrigerated_cargo']
-                and ice_class in ['ia_super', 'ia', 'ib', 'ic']
-                and all([v > 0 for v in [mcr, dwt]]))
-    shut_redun_test = ((ship_type == 'shuttle_tanker') 
-                       and (propulsion_redundancy == True)
-                       and 80000 <= dwt <= 160000)
-    test_vars = [l, b, d, disp_m3, v_ref]
-    roro_test = (ship_type in ['roro_cargo', 'roro_passenger']
-                 and all([v > 0 for v in test_vars]))
-    genal_cargo_test = (ship_type == 'general_cargo'
-                        and all([v > 0 for v in test_vars]))
-            
-    if ice_test == True:
-        output = ice_class_correction(
-            ship_type = ship_type,
-            ice_class = ice_class,
-            mcr = mcr,
-            dwt = dwt)
-        
-    elif shut_redun_test == True:
-        output = shuttle_correction(
-            ship_type = ship_type,
-            dwt = dwt,
-            propulsion_redundancy = propulsion_redundancy)
-        
-    elif roro_test == True:
-        output = roro_correction(
-            ship_type = ship_type,
-            l = l,
-            b = b,
-            d = d,
-            disp_m3 = disp_m3,
-            v_ref = v_ref,
-            g = g)
-        
-    elif genal_cargo_test == True:
-        output = general_cargo_correction(
-            ship_type = ship_type,
-            l = l,
-            b = b,
-            d = d,
-            disp_m3 = disp_m3,
-            v_ref = v_ref,
-            g = g)
-    
-    else:
-        output = 1
-               
-    return output
-
-def ice_capacity_correction(ship_type:str,
-                            ice_class:str,
-                            dwt:float,
-                            l:float,
-                            b:float,
-                            d:float,
-                            disp_m3:float)->float:
-    """calcualte capacity correction for ice-classed ships
-
-    Args:
-        ship_type (str): ship type
-        ice_class (str): ship ice class
-        dwt (float): deadweight capcity in tonnes
-        l (float): length between perpendiculars in m
-        b (float): beam in m
-        d (float): draught in m
-        disp_m3 (float): displacement in m^3
-
-    Returns:
-        float: capacity correction factor, fi
-    """
-    if ice_class == 'ia_super':
-        fi_ice_class = 1.0151 +  228.7 / dwt
-    elif ice_class == 'ia':
-        fi_ice_class = 1.0099 +  95.1 / dwt
-    elif ice_class == 'ib':
-        fi_ice_class = 1.0067 +  62.7 / dwt
-    elif ice_class == 'ic':
-        fi_ice_class = 1.0041 +  58.5 / dwt
-    else:
-        fi_ice_class = 1.
-        
-    # fi_ice_class = (
-    #     ((ice_class == 'ic')
-    #      * 1.0041 +  58.5 / dwt)
-    #     + ((ice_class == 'ib')
-    #        * 1.0067 +  62.7 / dwt)
-    #     + ((ice_class == 'ia')
-    #        * 1.0099 +  95.1 / dwt)
-    #     + ((ice_class == 'ia_super')
-    #        * 1.0151 +  228.7 / dwt))
-    
-    if ship_type == 'bulker':
-        if dwt < 10000:
-            cb_ref = 0.78
-        elif (dwt >= 10000) and (dwt < 25000):
-            cb_ref = 0.8
-        elif (dwt >= 25000) and (dwt < 55000):
-            cb_ref = 0.82
-        elif dwt >= 55000:
-            cb_ref = 0.86
-    
-    elif ship_type == 'tanker':
-        if dwt < 25000:
-            cb_ref = 0.78
-        elif (dwt >= 25000) and (dwt < 55000):
-            cb_ref = 0.82
-        elif dwt >= 55000:
-            cb_ref = 0.83
-    
-    elif ship_type == 'general_cargo':
-        cb_ref = 0.8
-    
-    else:
-        cb_ref = 1
-    
-    
-    if ship_type in {'bulk_carrier', 'tanker', 'general_cargo'}:
-        fi_cb = cb_ref / (disp_m3 / (l * b * d))
-    else:
-        fi_cb = 1.
-    # cb_ref = (
-    #     ((ship_type == 'bulk_carrier')
-    #      * (((dwt < 10000) * 0.78)
-    #         + ((dwt >= 10000) * (dwt < 25000) * 0.8)
-    #         + ((dwt >= 25000) * (dwt < 55000) * 0.82)
-    #         + ((dwt >= 55000) * 0.86)))
-
-        # + ((ship_type == 'tanker')
-        #    * (((dwt < 25000) * 0.78)
-        #       + ((dwt >= 25000) * (dwt < 55000) * 0.82)
-        #       + ((dwt >= 55000) * 0.83)))
-        
-    #     + ((ship_type == 'general_cargo') * 0.8)
-    # )
-    
-    # fi_cb = ((ship_type in {'bulk_carrier', 'tanker', 'general_cargo'})
-    #          * cb_ref / (disp_m3 / (l * b * d))
-    #          + ((ship_type not in {'bulk_carrier', 'tanker', 'general_cargo'})
-    #             * 1))
-    
-    output = fi_ice_class * fi_cb
-    return output
-
-def struct_enhance_corr(disp_t:float,
-                        lwt_ref:float,
-                        lwt_enhance:float)->float:
-    """calculate structural enhancement correction
-
-    Args:
-        disp_t (float): displacement in tonnes
-        lwt_ref (float): lightweight before enhancements
-            in tonnes
-        lwt_enhance (float): lightweight after enhancements
-            in tonnes
-
-    Returns:
-        float: correction for voluntary structural
-            enhancements, fi_vse
-    """    
-    dwt_ref = disp_t - lwt_ref
-    dwt_enhance = disp_t - lwt_enhance
-    
-    fi_vse = dwt_ref / dwt_enhance
-    
-    return fi_vse
-
-def csr_corr(lwt:float,
-             dwt:float)->float:
-    """calculate common structural rules (csr) correction
-
-    Args:
-        lwt (float): ship lightweight in tonnes
-        dwt (float): ship deadweight in tonnes
-
-    Returns:
-        float: correction for ships under csr,
-            fi_csr
-    """   
-    output = 1 + (0.08 * lwt / dwt)
-    
-    return output 
-
-def fi(ship_type:str,
-       csr:bool,
-       calc_pref:str='none',
-       ice_class:str='none',
-       dwt:float=0,
-       l:float=0,
-       b:float=0,
-       d:float=0,
-       disp_m3:float=0,
-       disp_t:float=0,
-       lwt_ref:float=0,
-       lwt_enhance:float=0,
-       lwt_csr:float=0,
-       dwt_csr:float=0)->float:
-    """calcuate fi
-
-    Args:
-        ship_type (str): ship type
-        csr (bool): is the ship under common structural rules (csr)?
-        calc_pre (str, optional): calculation preference for ice classed ships
-            options are to use functions:
-            none = 'none'
-            ice_capacity_correction = 'ice'
-            struct_enhance_corr = 'struct'. Defaults to 'none'.
-        ice_class (str, optional): ice class. Should be one of:
-            'none'
-            'ia_super'
-            'ia'
-            'ib'
-            'ic'. Defaults to 'none'.
-        dwt (float, optional): deadweight tonnes of ship in 
-            tonnes. Defaults to 0.
-        l (float, optional): length between perpendiculars in m.
-            Defaults to 0.
-        b (float, optional): beam in m. Defaults to 0.
-        d (float, optional): draught in m. Defaults to 0.
-        disp_m3 (float, optional): displacement in m^3. Defaults to 0.
-        disp_t (float, optional): displacement in tonnes. Defaults to 0.
-        lwt_ref (float, optional): lightweight before enhancements
-            in tonnes. Defaults to 0.
-        lwt_enhance (float, optional): lightweight after enhancements
-            in tonnes. Defaults to 0.
-        lwt_csr (float, optional): ship lightweight in tonnes. Defaults to 0.
-        dwt_csr (float, optional): ship deadweight in tonnes. Defaults to 0.
-
-    Returns:
-        float: calculate fi - capacity factor for technical/regulatory limitation on capacity
-    """
-    ice_test = (ship_type in ['tanker','bulk_carrier','general_cargo']
-                and csr == False
-                and calc_pref == 'ice'
-                and ice_class in ['ia_super', 'ia', 'ib', 'ic']
-                and all([v > 0 for v in [l, b, d, disp_m3]]))
-    struct_test = (calc_pref == 'struct'
-                   and csr == False
-                   and all([v > 0 for v in [
-                       disp_t, lwt_ref, lwt_enhance
-                   ]]))
-    csr_test = (ship_type in ['bulk_carrier', 'tanker']
-                and csr == True
-                and all([v > 0 for v in [lwt_csr, dwt_csr]]))
-    
-    output = 1
-    
-    if ice_test == True:
-        output = ice_capacity_correction(
-            ship_type = ship_type,
-            ice_class = ice_class,
-            dwt = dwt,
-            l = l,
-            b = b,
-            d = d,
-            disp_m3 = disp_m3)
-        
-    elif struct_test == True:
-        output = struct_enhance_corr(
-            disp_t = disp_t,
-            lwt_ref = lwt_ref,
-            lwt_enhance = lwt_enhance)
-        
-    elif csr_test == True:
-        output = csr_corr(
-            lwt = lwt_csr,
-            dwt = dwt_csr)
-        
-    return output
-
-def chemical_tanker_corr(ship_type:str,
-                         dwt:float,
-                         cube:float)->float:
-    """calculate correction for chemical tanker capacity
-
-    Args:
-        ship_type (str): ship type
-        dwt (float): ship deadweight in tonnes
-        cube (float): ship cargo capacity in m^3
-
-    Returns:
-        float: correction for chemical tanker capacity, fc
-    """    
-    
-    r = dwt / cube
-    
-    if (ship_type == 'chemical_tanker') and (r < 0.98):
-        output = r ** (-0.7) - 0.014
-    else:
-        output = 1
-    # fc = (((ship_type == 'chemical_tanker')
-    #       * ((r < 0.98) * (r ** (-0.7) - 0.014)
-    #          + (r >= 0.98) * 1))
-    #       + ((ship_type != 'chemical_tanker')
-    #          * 1))
-    
-    return output
-
-def gas_carrier_corr(ship_type:str,
-                     diesel_direct_drive:bool,
-                     marpol_annex:str,
-                     dwt:float,
-                     cube:float)->float:
-    """calcualte correction for gas carrier capacity
-
-    Args:
-        ship_type (str): ship type
-        diesel_direct_drive (bool): gas carrier with direct diesel
-            driven propulsion system
-        marpol_annex (str): MARPOL ANNEX VI definition
-        dwt (float): ship deadweight in tonnes
-        cube (float): ship cargo capacity in m^3
-
-    Returns:
-        float: correction for gas carriers, fc_lng
-    """    
-    r = dwt / cube
-    fc_test = ((ship_type == 'gas_carrier') 
-               and (diesel_direct_drive == True)
-               and (marpol_annex == '2.2.14'))
-    
-    if fc_test == True:
-        output = r ** -0.56
-    else:
-        output = 1.
-    # fc_lng = (((ship_type == 'gas_carrier') 
-    #            * (diesel_direct_drive == True)
-    #            * (marpol_annex == '2.2.14'))
-    #           * r ** (-0.56))
-    
-    # output = fc_lng + ((fc_lng == 0) * 1)
-    
-    return output
-
-def roro_pass_corr(ship_type:str,
-                   dwt:float,
-                   gt:float)->float:
-    """calculate correction for roro passenger ships
-
-    Args:
-        ship_type (str): ship type
-        dwt (float): deadweight in tonnes
-        gt (float): _gross tonnage in tonnes as defined by
-            International Convention of Tonnage Measurements
-                of Ships 1969, annex I, regulation 3
-
-    Returns:
-        float: correction for roro passenger ships, fc_ropax
-    """    
-    
-    ratio = dwt / gt
-    
-    if (ship_type == 'roro_passenger') and (ratio < 0.25):
-        output = (ratio / 0.25) ** -0.8
-    else:
-        output = 1.
-    
-    # fc_ropax = (((ship_type == 'roro_passenger') 
-    #              * (ratio < 0.25)
-    #              * (ratio / 0.25) ** (-0.8))
-                
-    #             + ((ratio >= 0.25) 
-    #                * 1))
-    
-    # output = fc_ropax + ((fc_ropax == 0) * 1)
-    
-    return output
-
-def light_bulk_corr(ship_type:str,
-                    dwt:float,
-                    cube:float)->float:
-    """calculate correction for light bulk carriers
-
-    Args:
-        ship_type (str): ship type
-        dwt (float): ship deadweight in tonnes
-        cube (float): ship cargo capacity in m^3
-
-    Returns:
-        float: correction for bulk carriers designed for
-            light cargoes, fc_bclc
-    """    
-    
-    r = dwt / cube
-    
-    if (ship_type == 'bulk_carrier') and (r < 0.55):
-        output = r ** -0.15
-    else:
-        output = 1.
-    
-    # fc_bclc = (((ship_type == 'bulk_carrier') 
-    #             * (r < 0.55)
-    #             * r ** (-0.15))
-               
-    #            + ((r >= 0.55) 
-    #             * 1))
-    
-    # output = fc_bclc + ((fc_bclc == 0) * 1)
-    
-    return output
-
-def fc(ship_type:str,
-       dwt:float=0,
-       cube:float=0,
-       diesel_direct_drive:bool=False,
-       marpol_annex:str='none',
-       gt:float=0)->float:
-    """calculate fc
-
-    Args:
-        ship_type (str): ship type
-        dwt (float, optional): ship deadweight in tonnes. Defaults to 0.
-        cube (float, optional): ship cargo capacity in m^3. Defaults to 0.
-        diesel_direct_drive (bool, optional): gas carrier with direct diesel
-            driven propulsion system. Defaults to False.
-        marpol_annex (str, optional): MARPOL ANNEX VI definition.
-            '2.2.14' will apply a correction
-            '2.2.16' will not apply a correction Defaults to 'none'.
-        gt (float, optional): gross tonnage in tonnes as defined by
-            International Convention of Tonnage Measurements
-                of Ships 1969, annex I, regulation 3. Defaults to 0.
-
-    Returns:
-        float: calculate fc - cubic capacity correction factor
-    """
-    
-    chemical_test = (ship_type == 'chemical_tanker'
-                     and all([v > 0 for v in [dwt, cube]]))
-    gas_test = (ship_type in ['gas_carrier', 'lng_carrier']
-                and diesel_direct_drive == True
-                and marpol_annex == '2.2.14')
-    roro_test = (ship_type == 'roro_passenger'
-                 and all([v > 0 for v in [dwt, gt]]))
-    bulk_test = (ship_type == 'bulk_carrier')
-    
-    output = 1
-    
-    if chemical_test == True:
-        output = chemical_tanker_corr(
-            ship_type = ship_type,
-            dwt = dwt,
-            cube = cube)
-        
-    elif gas_test == True:
-        output = gas_carrier_corr(
-            ship_type = ship_type,
-            diesel_direct_drive = diesel_direct_drive,
-            marpol_annex = marpol_annex,
-            dwt = dwt,
-            cube = cube)
-        
-    elif roro_test == True:
-        output = roro_pass_corr(
-            ship_type = ship_type,
-            dwt = dwt,
-            gt = gt)
-        
-    elif bulk_test == True:
-        output = light_bulk_corr(
-            ship_type = ship_type,
-            dwt = dwt,
-            cube = cube)
-        
-    return output
-
-def fl(ship_type:str,
-                    dwt_ref:float,                    
-                    number_of_cranes:int=0,
-                    swl_crane:float=0,
-                    reach_crane:float=0,                    
-                    side_loader_weight:float=0,
-                    roro_weight:float=0)->float:
-    """calculate correction for cargo-related gear
-
-    Args:
-        ship_type (str): ship type
-        dwt_ref (float): dead wight without cargo gears in tonnes        
-        number_of_cranes (int, optional): number of cranes.
-            Defaults to 0.
-        swl_crane (float, optional): safe working load of crane in
-            tonnes. Defaults to 0.
-        reach_crane (float, optional): reach of crane in m.
-            Defaults to 0.
-        side_loader_weight (float, optional): weight of side loader.
-            Defaults to 0.
-        roro_weight (float, optional): weight of roro ramp in tonnes.
-            Defaults to 0.
-
-    Returns:
-        float: correction for cargo-related gear, fi
-    """    
-    
-    crane_terms = [number_of_cranes, swl_crane, reach_crane]
-    
-    if all(i > 0 for i in crane_terms): #all crane terms are more than 0
-        f_cranes = 1 + (number_of_cranes * (0.0519 * swl_crane * reach_crane + 32.11)) / dwt_ref
-    else:
-        f_cranes = 1
-    
-    #calculation below is based on "Ship-specific voluntary structural enhancement"
-    if side_loader_weight > 0:
-        f_sideloader = dwt_ref / (dwt_ref + side_loader_weight)
-    else:
-        f_sideloader = 1
-    
-    if roro_weight > 0:
-        f_roro = dwt_ref / (dwt_ref + roro_weight)
-    else:
-        f_roro = 1
-    
-    if ship_type == 'general_cargo':
-        fl = f_cranes * f_sideloader * f_roro
-    else:
-        fl = 1
-    
-    return fl
-
-def fm(ice_class:str)->int:
-    """correction for ia super and ia classed ships
-
-    Args:
-        ice_class (str): ice class notation. Valid inputs
-            are 'ia_super' and 'ia'
-
-    Returns:
-        int: calculate fm for ice-classed ships
-    """
-    if (ice_class == 'ia_super') or (ice_class == 'ia'):
-        output = 1.05
-    else:
-        output = 1
-    # fm = (
-    #     ((ice_class == 'ia_super') * 0.05)
-    #     + ((ice_class == 'ia') * 0.05)
-    #       ) + 1
-    
-    return output
-
-def cat_b1(p_p_eff_al:float, p_ae_eff_al:float,
-           p_me:float, p_pti_shaft:float,
-           sfc_ae:float, cf_ae:float,
-           sfc_me:float, cf_me:float)->float:
-    """calculate effective power reduction of category b1 technology
-
-    Args:
-        p_p_eff_al (float): reduction in propulsion power at vref
-            due to technology in kW
-        p_ae_eff_al (float): increase in auxiliary power at vref
-            due to technology in kW
-        p_me (float): p_me for eedi calc in kW
-        p_pti_shaft (float): pti power addition to shaft in kW
-        sfc_ae (float): average specific fuel consumption of
-            auxiliary engine
-        cf_ae (float): average conversion factor for auxiliary
-            engine (t-co2/t-fuel)
-        sfc_me (float): average specific fuel consumption
-            of main engine.
-        cf_me (float): average conversion factor for main
-            engine (t-co2/t-fuel).
-
-    Assumed MEPC.1/Circ.896 has a typo in equation 1. *P_pti(i) is assumed
-        to be P_pto
-    Returns:
-        float: calculate effective power reduction of category b1 technology
-    """    
-    cf_sfc_weighted = (((p_me * cf_me * sfc_me) + (p_pti_shaft * cf_ae * sfc_ae))
-                       / (p_me + p_pti_shaft))
-    
-    p_eff = p_p_eff_al - p_ae_eff_al * ((cf_ae * sfc_ae) / cf_sfc_weighted)
-             
-    
-    return p_eff, cf_sfc_weighted
-
-def cat_b1_short(p_p_eff_al:float, p_ae_eff_al:float,
-           p_me:float, p_pti_shaft:float,
-           cf_sfc_me:float, cf_sfc_ae:float)->float:
-    """calculate effective power reduction of category b1 technology
-
-    Args:
-        p_p_eff_al (float): reduction in propulsion power at vref
-            due to technology in kW
-        p_ae_eff_al (float): increase in auxiliary power at vref
-            due to technology in kW
-        p_me (float): p_me for eedi calc in kW
-        p_pti_shaft (float): pti power addition to shaft in kW
-        cf_sfc_me (float): cf_me x sfc_me weighted by the individual
-            powers of the main engines 
-        cf_sfc_ae (float): cf_me x sfc_ae weighted by the individual
-            powers of the aux engines
-
-    Assumed MEPC.1/Circ.896 has a typo in equation 1. *P_pti(i) is assumed
-        to be P_pto
-    Returns:
-        float: calculate effective power reduction of category b1 technology
-    """
-     
-    cf_sfc_weighted = (((p_me * cf_sfc_me) + (p_pti_shaft * cf_sfc_ae))
-                       / (p_me + p_pti_shaft))
-    
-    p_eff = p_p_eff_al - p_ae_eff_al * ((cf_sfc_ae) / cf_sfc_weighted)
-             
-    
-    return p_eff, cf_sfc_weighted
-
-def cat_c1(w_e:float,
-           eta_g:float,
-           p_ae_eff_loss:float)->float:
-    """calculate effective power reduction of category c1 technology 
-
-    Args:
-        w_e (float): calculated production of electricity by
-            the waste heat recover system in kW
-        eta_g (float): weighted average generator efficiency
-        p_ae_eff_loss (float): pump power to drive the waste
-            heat recovery system in kW
-
-    Returns:
-        float: calculate effective power reduction of category c1 technology
-    """
-    
-    if (w_e > 0) & (eta_g > 0):
-        p_ae_eff_dash = w_e / eta_g
-    else:
-        p_ae_eff_dash = 0
-    p_ae_eff = p_ae_eff_dash - p_ae_eff_loss
-    
-    return p_ae_eff
-
-def cat_c2(f_temp:float,
-           p_max:float,
-           etad_gen:float,
-           n:int,
-           f_rad:float=0.2,           
-           l_others:float=10)->float:
-    """calculate effective power reduction of category c2 technology
-
-    Args:
-        f_temp (float): tmperature coefficient specified by panel
-            manufacturer in %/K
-        p_max (float): nominal maximum generated PV power generation in kW
-        etad_gen (float): weighted average efficiency of generators
-        n (int): number of modules in the system
-        f_rad (float, optional): ratio of average solar irradiance on main route
-            to solar irradiance specified by the manufacturer. Defaults to 0.2.
-        l_others (float, optional): summation of other losses including
-            power conditioner, electrical resistance etc in %. Defaults to 10.
-
-    Returns:
-        float: calculate effective power reduction of category c2 technology
-    """
-    l_temp = f_temp * (40 - 25)
-    f_eff = f_rad * (1 + l_temp / 100)
-    if (n > 0) & (etad_gen > 0):
-        p_ae_eff = p_max * (1 - l_others / 100) * n / etad_gen
-    else:
-        p_ae_eff = 0
-    
-    output = f_eff * p_ae_eff
-    
-    return output
+from core_functions import (FLOAT_LIST, STR_LIST, BOOL_LIST, INT_VALS_ENG,
+                            STR_VALS_ENG, FLOAT_VALS_ENG, GAS_FUELS, SHIP_TYPES,
+                            ICE_CLASSES, PROPULSION_TYPES, ENGINE_STROKES,
+                            SPEED_POWER_EQUS, CALC_PREFS, SHIP_ENUMS,
+                            FACTOR_CACHE_SIZE, memoize, factor_cache_info,
+                            clear_factor_caches, capacity_calc, fuel_ratio,
+                            main_engine_power, shaft_gen_reduc_to_me, p_pto_calc,
+                            shaft_motor_power, reliqu_addition, fuel_compressor,
+                            calc_pae, p_ae_iterative_calc, ice_class_correction,
+                            shuttle_correction, roro_correction,
+                            general_cargo_correction, fj, ice_capacity_correction,
+                            struct_enhance_corr, csr_corr, fi, chemical_tanker_corr,
+                            gas_carrier_corr, roro_pass_corr, light_bulk_corr, fc,
+                            fl, fm, cat_b1, cat_b1_short, cat_c1, cat_c2)
+from fuel_functions import (TANK_PARAMETERS, fuel_codes, fuel_registry,
+                            engine_fuel_codes, power_by_fuel, tank_volumes,
+                            gas_fuel_ratios)
 
 def empty_series(x):
     if x.empty:
@@ -1411,27 +40,10 @@ def load_variables(inpt):
     #create wide dataframe to set dtypes for each parameter
     df_inpt = df_inpt.set_index('ship parameters').T
  
-    float_list = ['v_ref', 'dwt', 'mpp', 'electrical_eff', 'cube',
-                  'bor', 'cop_cooling', 'r_reliq', 'cop_comp', 'lpp',
-                  'b', 'ds', 'disp_m3', 'p_pto_rated', 'p_sm_rated',
-                  'hload', 'gen_efficiency', 'pti_eff',
-                  'v_ref_override', 'speed_power_a', 'speed_power_b',
-                  'speed_power_c', 'v_lng', 'v_hfo', 'v_mdo', 'v_lfo',
-                  'k_lng', 'k_hfo', 'k_mdo', 'k_lfo', 'lwt_ref',
-                  'lwt_enhance', 'lwt_csr', 'dwt_csr', 'gt',
-                  'number_of_cranes', 'swl_crane', 'reach_crane',
-                  'side_loader_weight', 'roro_weight', 'p_p_eff_al',
-                  'p_ae_eff_al', 'w_e', 'eta_g', 'p_ae_eff_loss',
-                  'f_temp', 'p_max', 'etad_gen', 'n', 'f_rad',
-                  'l_others']
-    str_list = ['ship_type', 'propulsion_type', 'me_engine_stroke',
-                'speed_power_equ', 'ice_class', 'marpol_annex']
-    bool_list = ['propulsion_redundancy', 'csr', 'diesel_direct_drive']
-
     #set column dtypes
-    df_inpt[float_list] = df_inpt[float_list].astype(float)
-    df_inpt[str_list] = df_inpt[str_list].astype(object)
-    df_inpt[bool_list] = df_inpt[bool_list].astype(bool)
+    df_inpt[FLOAT_LIST] = df_inpt[FLOAT_LIST].astype(float)
+    df_inpt[STR_LIST] = df_inpt[STR_LIST].astype(object)
+    df_inpt[BOOL_LIST] = df_inpt[BOOL_LIST].astype(bool)
     
     return df_inpt
 
@@ -1447,11 +59,6 @@ def load_cf_dict(inpt):
     return cf_dict
 
 def load_me_data(inpt, df_inpt):
-    #initialise column dtypes
-    int_vals_eng = ['engine_number']
-    str_vals_eng = ['engine_type','liquid_fuel_type', 'pilot_fuel_type', 'gas_fuel_type']
-    float_vals_eng = ['mcr', 'sfc_liquid_fuel', 'sfc_pilot_fuel', 'sfc_gas_fuel_kj']
-
     #create df_me df, rename columns and reset index
     df_me = inpt.iloc[89:99].copy()
     df_me.columns = df_me.iloc[0]
@@ -1462,39 +69,55 @@ def load_me_data(inpt, df_inpt):
     df_me.columns = df_me.iloc[0]
     df_me = df_me[1:11].reset_index(drop=True)
     #set column dtypes
-    df_me[int_vals_eng] = df_me[int_vals_eng].astype(int)
-    df_me[str_vals_eng] = df_me[str_vals_eng].astype(object)
-    df_me[float_vals_eng] = df_me[float_vals_eng].astype(float)
+    df_me[INT_VALS_ENG] = df_me[INT_VALS_ENG].astype(int)
+    df_me[STR_VALS_ENG] = df_me[STR_VALS_ENG].astype(object)
+    df_me[FLOAT_VALS_ENG] = df_me[FLOAT_VALS_ENG].astype(float)
 
     df_me.dropna(subset='mcr', inplace=True)
 
-    df_me['p_me'] = np.nan
+    df_me = calc_me_power(df_me, df_inpt)
+    
+    return df_me
+
+def calc_me_power(df_me, df_inpt):
+    """add the main engine power for the EEDI calculation, p_me, to df_me
+
+    Args:
+        df_me (pd.DataFrame): main engine table with mcr and limited_power
+        df_inpt (pd.DataFrame): ship parameters from load_variables
+
+    Returns:
+        pd.DataFrame: df_me with the column p_me
+    """
+    me_type = df_inpt['propulsion_type'].item()
+    p_me = np.full(len(df_me), np.nan)
 
     try: #calc when engine limitation is in place
-        for i in df_me.loc[df_me['limited_power']>0].index:
-            df_me.loc[i,'p_me'] = main_engine_power(mcr_me = df_me.loc[i,'limited_power'],
-                                                    me_type = df_inpt['propulsion_type'].item())
+        limited_power = df_me['limited_power'].to_numpy(dtype=float)
+        limited = limited_power > 0
+        if limited.any():
+            p_me[limited] = main_engine_power(mcr_me = limited_power[limited],
+                                              me_type = me_type)
     except:
         pass
     try: #calc when engine limitation is not in place
-        for i in df_me.loc[df_me['limited_power']==0].index:
-            df_me.loc[i,'p_me'] = main_engine_power(mcr_me = df_me.loc[i,'mcr'],
-                                                    me_type = df_inpt['propulsion_type'].item())
+        unlimited = df_me['limited_power'].to_numpy(dtype=float) == 0
+        if unlimited.any():
+            p_me[unlimited] = main_engine_power(
+                mcr_me = df_me['mcr'].to_numpy(dtype=float)[unlimited],
+                me_type = me_type)
         # if the ship is a gas carrier with propulsion motors
         if (df_inpt['ship_type'].item() == 'lng_carrier') and (df_inpt['mpp'].item() > 0):
-            df_me.loc[:,'p_me'] = main_engine_power(mcr_me = df_inpt['mpp'].item(),
-                                                    me_type = df_inpt['propulsion_type'].item()) / len(df_me)
+            p_me[:] = main_engine_power(mcr_me = df_inpt['mpp'].item(),
+                                        me_type = me_type) / len(df_me)
     except:
         pass
-    
+
+    df_me['p_me'] = p_me
+
     return df_me
 
 def load_ae_data(inpt):
-    #initialise column dtypes
-    int_vals_eng = ['engine_number']
-    str_vals_eng = ['engine_type','liquid_fuel_type', 'pilot_fuel_type', 'gas_fuel_type']
-    float_vals_eng = ['mcr', 'sfc_liquid_fuel', 'sfc_pilot_fuel', 'sfc_gas_fuel_kj']
-    
     #create df_ae df, rename columns and reset index from df_inpt
     df_ae = inpt.iloc[101:110].copy()
     df_ae.columns = df_ae.iloc[0]
@@ -1505,23 +128,407 @@ def load_ae_data(inpt):
     df_ae.columns = df_ae.iloc[0]
     df_ae = df_ae[1:11].reset_index(drop=True)
     #set dtypes
-    df_ae[int_vals_eng] = df_ae[int_vals_eng].astype(int)
-    df_ae[str_vals_eng] = df_ae[str_vals_eng].astype(object)
-    df_ae[float_vals_eng] = df_ae[float_vals_eng].astype(float)
+    df_ae[INT_VALS_ENG] = df_ae[INT_VALS_ENG].astype(int)
+    df_ae[STR_VALS_ENG] = df_ae[STR_VALS_ENG].astype(object)
+    df_ae[FLOAT_VALS_ENG] = df_ae[FLOAT_VALS_ENG].astype(float)
 
     df_ae.dropna(subset='mcr', inplace=True)
     
     return df_ae
 
+def _name(value):
+    #labels of the input sheet, missing values become None
+    return None if value is None or value != value else value
+
+@dataclass(slots=True)
+class EngineSpec:
+    """one row of a main or auxiliary engine table
+
+    Fuel types that are not given are None.
+    """
+    engine_number: int
+    engine_type: str
+    mcr: float
+    liquid_fuel_type: str
+    pilot_fuel_type: str
+    gas_fuel_type: str
+    sfc_liquid_fuel: float
+    sfc_pilot_fuel: float
+    sfc_gas_fuel_kj: float
+    limited_power: float = 0.
+    p_me: float = np.nan
+
+    @classmethod
+    def from_row(cls, row:dict)->'EngineSpec':
+        """engine from a row of load_me_data or load_ae_data
+
+        Args:
+            row (dict): column name to value
+
+        Returns:
+            EngineSpec: engine with typed values
+        """
+        return cls(engine_number = int(row['engine_number']),
+                   engine_type = _name(row['engine_type']),
+                   mcr = float(row['mcr']),
+                   liquid_fuel_type = _name(row['liquid_fuel_type']),
+                   pilot_fuel_type = _name(row['pilot_fuel_type']),
+                   gas_fuel_type = _name(row['gas_fuel_type']),
+                   sfc_liquid_fuel = float(row['sfc_liquid_fuel']),
+                   sfc_pilot_fuel = float(row['sfc_pilot_fuel']),
+                   sfc_gas_fuel_kj = float(row['sfc_gas_fuel_kj']),
+                   limited_power = float(row.get('limited_power', 0.)),
+                   p_me = float(row.get('p_me', np.nan)))
+
+def engine_columns(engines:tuple)->dict:
+    """column arrays of EngineSpec records, as accepted by engine_arrays
+
+    Args:
+        engines (tuple): EngineSpec records
+
+    Returns:
+        dict: field name to np.ndarray with one value per engine
+    """
+    return {x: np.array([getattr(e, x) for e in engines],
+                        dtype=object if x in STR_VALS_ENG else float)
+            for x in EngineSpec.__slots__}
+
+@dataclass(slots=True)
+class ShipInput:
+    """ship parameters, engines and cf table of a single ship
+
+    The fields are those of load_variables with their dtypes in FLOAT_LIST,
+    STR_LIST and BOOL_LIST, the engines of load_me_data and load_ae_data and
+    the cf table of load_cf_dict. Numbers are kept as np.float64. The labels
+    in SHIP_ENUMS and the fuels of the engines are checked once when the
+    record is created.
+
+    Raises:
+        ValueError: for labels outside SHIP_ENUMS and for liquid, pilot or
+            main engine gas fuels missing from the cf table. Auxiliary
+            engine gas fuels missing from the cf table are allowed, their gas
+            terms are 0 as in the notebook.
+    """
+    v_ref: float
+    dwt: float
+    mpp: float
+    electrical_eff: float
+    cube: float
+    bor: float
+    cop_cooling: float
+    r_reliq: float
+    cop_comp: float
+    lpp: float
+    b: float
+    ds: float
+    disp_m3: float
+    p_pto_rated: float
+    p_sm_rated: float
+    hload: float
+    gen_efficiency: float
+    pti_eff: float
+    v_ref_override: float
+    speed_power_a: float
+    speed_power_b: float
+    speed_power_c: float
+    v_lng: float
+    v_hfo: float
+    v_mdo: float
+    v_lfo: float
+    k_lng: float
+    k_hfo: float
+    k_mdo: float
+    k_lfo: float
+    lwt_ref: float
+    lwt_enhance: float
+    lwt_csr: float
+    dwt_csr: float
+    gt: float
+    number_of_cranes: float
+    swl_crane: float
+    reach_crane: float
+    side_loader_weight: float
+    roro_weight: float
+    p_p_eff_al: float
+    p_ae_eff_al: float
+    w_e: float
+    eta_g: float
+    p_ae_eff_loss: float
+    f_temp: float
+    p_max: float
+    etad_gen: float
+    n: float
+    f_rad: float
+    l_others: float
+    ship_type: str
+    propulsion_type: str
+    me_engine_stroke: str
+    speed_power_equ: str
+    ice_class: str
+    marpol_annex: str
+    propulsion_redundancy: bool
+    csr: bool
+    diesel_direct_drive: bool
+    me: tuple = ()
+    ae: tuple = ()
+    cf_dict: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        #numpy floats so that divisions by zero give inf as in the notebook
+        for x in FLOAT_LIST:
+            setattr(self, x, np.float64(getattr(self, x)))
+        for x, allowed in SHIP_ENUMS.items():
+            if getattr(self, x) not in allowed:
+                raise ValueError('invalid {} {!r}, expected one of {}'.format(
+                    x, getattr(self, x), ', '.join(allowed)))
+        for kind, engines in (('me', self.me), ('ae', self.ae)):
+            for e in engines:
+                fuels = [e.liquid_fuel_type]
+                if e.engine_type == 'dual_fuel':
+                    fuels.append(e.pilot_fuel_type)
+                    if kind == 'me':
+                        fuels.append(e.gas_fuel_type)
+                for fuel in fuels:
+                    if fuel not in self.cf_dict:
+                        raise ValueError('fuel {!r} of {} engine {} is not in the cf '
+                                         'table'.format(fuel, kind, e.engine_number))
+
+    @classmethod
+    def from_tables(cls, df_inpt, cf_dict, df_me, df_ae)->'ShipInput':
+        """ship from the tables of the load_* functions
+
+        Args:
+            df_inpt (pd.DataFrame): ship parameters from load_variables
+            cf_dict (dict): fuel lcv and cf from load_cf_dict
+            df_me (pd.DataFrame): main engine table from load_me_data
+            df_ae (pd.DataFrame): auxiliary engine table from load_ae_data
+
+        Returns:
+            ShipInput: validated ship record
+        """
+        row = df_inpt.iloc[0].to_dict()
+        values = {x: row[x] for x in FLOAT_LIST}
+        values.update((x, row[x]) for x in STR_LIST)
+        values.update((x, bool(row[x])) for x in BOOL_LIST)
+        return cls(me = tuple(map(EngineSpec.from_row, df_me.to_dict('records'))),
+                   ae = tuple(map(EngineSpec.from_row, df_ae.to_dict('records'))),
+                   cf_dict = dict(cf_dict), **values)
+
+    @classmethod
+    def from_record(cls, record)->'ShipInput':
+        """ship from a ShipRecord (or (df_inpt, cf_dict, df_me, df_ae))"""
+        return cls.from_tables(*record)
+
+def load_ship(inpt)->ShipInput:
+    """load a raw input sheet into a validated ShipInput
+
+    Args:
+        inpt (pd.DataFrame): input sheet read with pd.read_excel from a file
+            following the layout of inputs.xlsx
+
+    Returns:
+        ShipInput: ship parameters, engines and cf table
+    """
+    df_inpt = load_variables(inpt)
+    return ShipInput.from_tables(df_inpt, load_cf_dict(inpt),
+                                 load_me_data(inpt, df_inpt), load_ae_data(inpt))
+
+def _param(df_inpt, x:str):
+    #ship parameter of a ShipInput or of a one row df_inpt, as a python
+    #scalar like .item()
+    if isinstance(df_inpt, ShipInput):
+        value = getattr(df_inpt, x)
+        return value.item() if isinstance(value, np.generic) else value
+    return df_inpt[x].item()
+
+def _fuel_values(fuels:np.ndarray, cf_dict:dict, column:int)->np.ndarray:
+    #lower calorific value (column 0) or cf (column 1) of each fuel, raises
+    #KeyError for fuels missing from the cf table
+    return fuel_registry().lookup(fuels, cf_dict, column)
+
+def _nan_product(a:np.ndarray, b:np.ndarray)->np.ndarray:
+    # pandas product(axis=1) skips missing values, keep the same behaviour
+    return np.where(np.isnan(a), 1., a) * np.where(np.isnan(b), 1., b)
+
+def gas_fuel_sfc(df:pd.DataFrame, cf_dict:dict)->tuple:
+    """lcv and sfc in g/kWh of the gas fuel of dual fuel engines
+
+    Args:
+        df (pd.DataFrame or dict): engine table with engine_type,
+            gas_fuel_type and sfc_gas_fuel_kj
+        cf_dict (dict): fuel lcv and cf from load_cf_dict
+
+    Returns:
+        tuple: lcv_gas_fuel, sfc_gas_fuel (np.ndarray), NaN for engines that
+            are not dual fuel
+    """
+    is_df = np.asarray(df['engine_type']) == 'dual_fuel'
+    lcv_gas_fuel = np.full(len(is_df), np.nan)
+    sfc_gas_fuel = np.full(len(is_df), np.nan)
+    lcv_gas_fuel[is_df] = _fuel_values(np.asarray(df['gas_fuel_type'])[is_df], cf_dict, 0)
+    sfc_gas_fuel[is_df] = (np.asarray(df['sfc_gas_fuel_kj'], dtype=float)[is_df]
+                           / lcv_gas_fuel[is_df]) * 1000
+    return lcv_gas_fuel, sfc_gas_fuel
+
+def fuel_cf(df:pd.DataFrame, cf_dict:dict, gas_fallback:bool=False)->tuple:
+    """cf of the liquid, pilot and gas fuels of each engine
+
+    Args:
+        df (pd.DataFrame or dict): engine table with engine_type and the
+            fuel type columns
+        cf_dict (dict): fuel lcv and cf from load_cf_dict
+        gas_fallback (bool, optional): set the pilot and gas fuel cf to 0
+            when a gas fuel is missing from cf_dict instead of raising.
+            Defaults to False.
+
+    Returns:
+        tuple: cf_liquid_fuel, cf_pilot_fuel, cf_gas_fuel (np.ndarray). Pilot
+            and gas fuel cf are NaN for engines that are not dual fuel
+    """
+    is_df = np.asarray(df['engine_type']) == 'dual_fuel'
+    cf_liquid_fuel = _fuel_values(np.asarray(df['liquid_fuel_type']), cf_dict, 1)
+    cf_pilot_fuel = np.full(len(is_df), np.nan)
+    cf_gas_fuel = np.full(len(is_df), np.nan)
+    cf_pilot_fuel[is_df] = _fuel_values(np.asarray(df['pilot_fuel_type'])[is_df], cf_dict, 1)
+    try:
+        cf_gas_fuel[is_df] = _fuel_values(np.asarray(df['gas_fuel_type'])[is_df], cf_dict, 1)
+    except KeyError:
+        if not gas_fallback:
+            raise
+        cf_pilot_fuel = np.where(is_df, cf_pilot_fuel, 0.)
+        cf_gas_fuel = np.zeros(len(is_df))
+    return cf_liquid_fuel, cf_pilot_fuel, cf_gas_fuel
+
+def engine_fd_gas(fd_gas:float)->float:
+    """fuel ratio of gas applied to the dual fuel engines
+
+    Args:
+        fd_gas (float): fuel ratio of gas from fuel_ratio
+
+    Returns:
+        float: 1 when fd_gas is 0.5 or more, otherwise fd_gas (0 if NaN)
+    """
+    fd_gas = np.nan_to_num(fd_gas)
+    return 1. if fd_gas >= 0.5 else fd_gas
+
+class EngineArrays(NamedTuple):
+    """fixed-width arrays of an engine table with the fuel terms resolved
+
+    Every field holds one value per engine in the row order of the table.
+    Fuel codes are those of fuel_registry, NO_FUEL for missing fuels.
+    """
+    is_df: np.ndarray
+    is_diesel: np.ndarray
+    liquid_fuel_type: np.ndarray
+    gas_fuel_type: np.ndarray
+    liquid_fuel_code: np.ndarray
+    gas_fuel_code: np.ndarray
+    lcv_gas_fuel: np.ndarray
+    sfc_gas_fuel: np.ndarray
+    cf_liquid_fuel: np.ndarray
+    cf_pilot_fuel: np.ndarray
+    cf_gas_fuel: np.ndarray
+    cf_sfc_liquid: np.ndarray
+    cf_sfc_gas: np.ndarray
+
+    def cf_sfc(self, fd_gas:float)->np.ndarray:
+        """cf x sfc of each engine weighted by the gas fuel ratio
+
+        Args:
+            fd_gas (float): fuel ratio of gas from calc_fd_gas
+
+        Returns:
+            np.ndarray: cf x sfc, dual fuel engines use fd_gas and all other
+                engines liquid fuel only
+        """
+        fd = np.where(self.is_df, engine_fd_gas(fd_gas), 0.)
+        return fd * self.cf_sfc_gas + (1 - fd) * self.cf_sfc_liquid
+
+def engine_arrays(df:pd.DataFrame, cf_dict:dict, gas_fallback:bool=False)->EngineArrays:
+    """resolve the fuel lcv, sfc and cf of an engine table in one pass
+
+    Args:
+        df (pd.DataFrame or dict): engine table from load_me_data or
+            load_ae_data, or engine_columns of EngineSpec records
+        cf_dict (dict): fuel lcv and cf from load_cf_dict
+        gas_fallback (bool, optional): set the gas fuel terms to 0 when a gas
+            fuel is missing from cf_dict instead of raising, as done for the
+            auxiliary engines. Defaults to False.
+
+    Returns:
+        EngineArrays: arrays of the engine table
+    """
+    engine_type = np.asarray(df['engine_type'])
+    is_df = engine_type == 'dual_fuel'
+    cf_liquid_fuel, cf_pilot_fuel, cf_gas_fuel = fuel_cf(df, cf_dict, gas_fallback)
+    try:
+        lcv_gas_fuel, sfc_gas_fuel = gas_fuel_sfc(df, cf_dict)
+    except KeyError:
+        if not gas_fallback:
+            raise
+        lcv_gas_fuel = sfc_gas_fuel = np.zeros(len(is_df))
+
+    cf_sfc_liquid = _nan_product(cf_liquid_fuel, np.asarray(df['sfc_liquid_fuel'], dtype=float))
+    cf_sfc_gas = np.where(is_df,
+                          _nan_product(cf_pilot_fuel, np.asarray(df['sfc_pilot_fuel'], dtype=float))
+                          + _nan_product(cf_gas_fuel, sfc_gas_fuel),
+                          0.)
+
+    return EngineArrays(is_df = is_df,
+                        is_diesel = engine_type == 'diesel',
+                        liquid_fuel_type = np.asarray(df['liquid_fuel_type']),
+                        gas_fuel_type = np.asarray(df['gas_fuel_type']),
+                        liquid_fuel_code = fuel_codes(df['liquid_fuel_type']),
+                        gas_fuel_code = fuel_codes(df['gas_fuel_type']),
+                        lcv_gas_fuel = lcv_gas_fuel,
+                        sfc_gas_fuel = sfc_gas_fuel,
+                        cf_liquid_fuel = cf_liquid_fuel,
+                        cf_pilot_fuel = cf_pilot_fuel,
+                        cf_gas_fuel = cf_gas_fuel,
+                        cf_sfc_liquid = cf_sfc_liquid,
+                        cf_sfc_gas = cf_sfc_gas)
+
+def calc_fd_gas(df_inpt, me:EngineArrays, ae:EngineArrays,
+                p_me:np.ndarray, p_ae_calc:np.ndarray)->float:
+    """fuel ratio of gas from the power of the engines on each fuel
+
+    Args:
+        df_inpt (pd.DataFrame or ShipInput): ship parameters from
+            load_variables
+        me (EngineArrays): main engine arrays
+        ae (EngineArrays): auxiliary engine arrays
+        p_me (np.ndarray): p_me of each main engine in kW
+        p_ae_calc (np.ndarray): p_ae_calc of each auxiliary engine in kW
+
+    Returns:
+        float: fd_gas, 0 when no engine runs on gas
+    """
+    join = lambda x: np.concatenate([getattr(me, x), getattr(ae, x)])
+    return _pooled_fd_gas(df_inpt, is_diesel = join('is_diesel'), is_df = join('is_df'),
+                          liquid_code = join('liquid_fuel_code'),
+                          gas_code = join('gas_fuel_code'),
+                          power = np.concatenate([p_me, np.broadcast_to(p_ae_calc, ae.is_df.shape)]))
+
+def _pooled_fd_gas(df_inpt, is_diesel:np.ndarray, is_df:np.ndarray,
+                   liquid_code:np.ndarray, gas_code:np.ndarray, power:np.ndarray):
+    #fd_gas of one ship with every gas fuel counted as LNG, as fuel_ratio
+    code = engine_fuel_codes(is_diesel, is_df, liquid_code, gas_code, legacy = True)
+    power = power_by_fuel(np.zeros(len(code), dtype=np.int64), code, power,
+                          1, len(fuel_registry()))
+    lng = fuel_codes('liquefied_natural_gas')
+    if power[0, lng] == 0:
+        return 0
+    volume, filling_rate = tank_volumes({v: [_param(df_inpt, v)] for v, k in TANK_PARAMETERS.values()},
+                                        1, legacy = True)
+    return gas_fuel_ratios(power, volume)[0, lng].item()
+
 def calculate_sfc(df_me, df_ae, cf_dict):
     #calculate sfc of gas fuel in g/kWh for me
-    df_me.loc[df_me['engine_type']=='dual_fuel','lcv_gas_fuel'] = [cf_dict[i][0] for i in df_me.loc[df_me['engine_type']=='dual_fuel','gas_fuel_type']]
-    df_me.loc[df_me['engine_type']=='dual_fuel','sfc_gas_fuel'] = (df_me.loc[df_me['engine_type']=='dual_fuel','sfc_gas_fuel_kj'] / df_me.loc[df_me['engine_type']=='dual_fuel','lcv_gas_fuel']) * 1000
+    df_me['lcv_gas_fuel'], df_me['sfc_gas_fuel'] = gas_fuel_sfc(df_me, cf_dict)
 
     #calculate sfc of gas fuel in g/kWh for ae
     try:
-        df_ae.loc[df_ae['engine_type']=='dual_fuel','lcv_gas_fuel'] = [cf_dict[i][0] for i in df_ae.loc[df_ae['engine_type']=='dual_fuel','gas_fuel_type']]
-        df_ae.loc[df_ae['engine_type']=='dual_fuel','sfc_gas_fuel'] = (df_ae.loc[df_ae['engine_type']=='dual_fuel','sfc_gas_fuel_kj'] / df_ae.loc[df_ae['engine_type']=='dual_fuel','lcv_gas_fuel']) * 1000
+        df_ae['lcv_gas_fuel'], df_ae['sfc_gas_fuel'] = gas_fuel_sfc(df_ae, cf_dict)
     except:
         df_ae[['lcv_gas_fuel', 'sfc_gas_fuel', 'cf_pilot_fuel', 'cf_gas_fuel']] = 0
     
@@ -1529,14 +536,11 @@ def calculate_sfc(df_me, df_ae, cf_dict):
 
 def calculate_cf(df_me, df_ae, cf_dict):
     #input cf
-    df_me['cf_liquid_fuel'] = [cf_dict[i][1] for i in df_me['liquid_fuel_type']]
-    df_me.loc[df_me['engine_type']=='dual_fuel','cf_pilot_fuel'] = [cf_dict[i][1] for i in df_me.loc[df_me['engine_type']=='dual_fuel','pilot_fuel_type']]
-    df_me.loc[df_me['engine_type']=='dual_fuel','cf_gas_fuel'] = [cf_dict[i][1] for i in df_me.loc[df_me['engine_type']=='dual_fuel','gas_fuel_type']]
+    df_me['cf_liquid_fuel'], df_me['cf_pilot_fuel'], df_me['cf_gas_fuel'] = fuel_cf(df_me, cf_dict)
 
     try:
-        df_ae['cf_liquid_fuel'] = [cf_dict[i][1] for i in df_ae['liquid_fuel_type']]
-        df_ae.loc[df_ae['engine_type']=='dual_fuel','cf_pilot_fuel'] = [cf_dict[i][1] for i in df_ae.loc[df_ae['engine_type']=='dual_fuel','pilot_fuel_type']]
-        df_ae.loc[df_ae['engine_type']=='dual_fuel','cf_gas_fuel'] = [cf_dict[i][1] for i in df_ae.loc[df_ae['engine_type']=='dual_fuel','gas_fuel_type']]
+        (df_ae['cf_liquid_fuel'], df_ae['cf_pilot_fuel'],
+         df_ae['cf_gas_fuel']) = fuel_cf(df_ae, cf_dict, gas_fallback=True)
     except:
         pass
     
@@ -1545,8 +549,8 @@ def calculate_cf(df_me, df_ae, cf_dict):
 def pto_pae_ratio(df_inpt, df_me, df_ae, p_ae, p_pto):
     #initiate ratio for steam turbine case
     standard_propulsion = ['diesel', 'dual_fuel', 'diesel_electric']
-    pto_ratio = (((df_inpt['propulsion_type'].item() == 'steam_turbine') * 0.85)
-                + ((df_inpt['propulsion_type'].item() in standard_propulsion) * 0.75))
+    pto_ratio = (((_param(df_inpt, 'propulsion_type') == 'steam_turbine') * 0.85)
+                + ((_param(df_inpt, 'propulsion_type') in standard_propulsion) * 0.75))
 
     #calculate pto power and p_ae power for calculation
     if (pto_ratio * p_pto) < p_ae: #p_ae is taken as a ratio of p_ae - p_pto
@@ -1568,138 +572,99 @@ def pto_pae_ratio(df_inpt, df_me, df_ae, p_ae, p_pto):
     return p_pto_remove_me, p_ae_calc
 
 def update_vref(df_inpt, p_me_deduct):
-    if (df_inpt['p_sm_rated'].item() > 0) or (df_inpt['p_pto_rated'].item() > 0):
-        if df_inpt['v_ref_override'].item() > 0:
-            v_ref = df_inpt['v_ref_override'].item()
+    if (_param(df_inpt, 'p_sm_rated') > 0) or (_param(df_inpt, 'p_pto_rated') > 0):
+        if _param(df_inpt, 'v_ref_override') > 0:
+            v_ref = _param(df_inpt, 'v_ref_override')
             
-        elif df_inpt['speed_power_equ'].item() == 'p=a*v^b':
-            v_ref = ((p_me_deduct / df_inpt['speed_power_a'].item()) 
-                    ** (1 / df_inpt['speed_power_b'].item()))
+        elif _param(df_inpt, 'speed_power_equ') == 'p=a*v^b':
+            v_ref = ((p_me_deduct / _param(df_inpt, 'speed_power_a')) 
+                    ** (1 / _param(df_inpt, 'speed_power_b')))
             
-        elif df_inpt['speed_power_equ'].item() == 'p=a*v^3+b':
-            v_ref = ((p_me_deduct - df_inpt['speed_power_a'].item()) ** (1 / 3)
-                    / df_inpt['speed_power_b'].item() ** (1 / 3))
+        elif _param(df_inpt, 'speed_power_equ') == 'p=a*v^3+b':
+            v_ref = ((p_me_deduct - _param(df_inpt, 'speed_power_a')) ** (1 / 3)
+                    / _param(df_inpt, 'speed_power_b') ** (1 / 3))
             
-        elif df_inpt['speed_power_equ'].item() == 'p=a*v^b+c':
-            v_ref = ((p_me_deduct - df_inpt['speed_power_a'].item()) 
-                    ** (1 / df_inpt['speed_power_b'].item())
-                    / df_inpt['speed_power_c'].item() 
-                    ** (1 / df_inpt['speed_power_b'].item()))
+        elif _param(df_inpt, 'speed_power_equ') == 'p=a*v^b+c':
+            v_ref = ((p_me_deduct - _param(df_inpt, 'speed_power_a')) 
+                    ** (1 / _param(df_inpt, 'speed_power_b'))
+                    / _param(df_inpt, 'speed_power_c') 
+                    ** (1 / _param(df_inpt, 'speed_power_b')))
         
     else:
-        v_ref = df_inpt['v_ref'].item()
+        v_ref = _param(df_inpt, 'v_ref')
     
     return v_ref
 
 def fuel_ratio_calc(df_inpt, df_me, df_ae):
-    me_mdo = empty_series(df_me['p_me'][(df_me['liquid_fuel_type']=='marine_diesel_oil')&(df_me['engine_type']=='diesel')])
-    ae_mdo = empty_series(df_ae['p_ae_calc'][(df_ae['liquid_fuel_type']=='marine_diesel_oil')&(df_ae['engine_type']=='diesel')])
+    engines = pd.concat([df_me[['engine_type', 'liquid_fuel_type', 'gas_fuel_type']],
+                         df_ae[['engine_type', 'liquid_fuel_type', 'gas_fuel_type']]])
+    fd_gas = _pooled_fd_gas(df_inpt,
+                            is_diesel = (engines['engine_type'] == 'diesel').to_numpy(),
+                            is_df = (engines['engine_type'] == 'dual_fuel').to_numpy(),
+                            liquid_code = fuel_codes(engines['liquid_fuel_type'].to_numpy()),
+                            gas_code = fuel_codes(engines['gas_fuel_type'].to_numpy()),
+                            power = np.concatenate([df_me['p_me'].to_numpy(dtype=float),
+                                                    df_ae['p_ae_calc'].to_numpy(dtype=float)]))
+
+    fd = engine_fd_gas(fd_gas)
+    df_me['fd_gas'] = np.where(df_me['engine_type']=='dual_fuel', fd, 0.)
+    df_ae['fd_gas'] = np.where(df_ae['engine_type']=='dual_fuel', fd, 0.)
 
-    me_lfo = empty_series(df_me['p_me'][(df_me['liquid_fuel_type']=='light_fuel_oil')&(df_me['engine_type']=='diesel')])
-    ae_lfo = empty_series(df_ae['p_ae_calc'][(df_ae['liquid_fuel_type']=='light_fuel_oil')&(df_ae['engine_type']=='diesel')])
-
-    me_hfo = empty_series(df_me['p_me'][(df_me['liquid_fuel_type']=='heavy_fuel_oil')&(df_me['engine_type']=='diesel')])
-    ae_hfo = empty_series(df_ae['p_ae_calc'][(df_ae['liquid_fuel_type']=='heavy_fuel_oil')&(df_ae['engine_type']=='diesel')])
+    return fd_gas, df_me, df_ae
 
-    gas_fuel = ['liquefied_petroleum_gas_propane', 'liquefied_petroleum_gas_butane',
-                'ethane', 'liquefied_natural_gas', 'methanol', 'ethanol']
+def cf_sfc_calc(df)->tuple:
+    """cf x sfc of the liquid and gas fuels of each engine
 
-    me_gas = empty_series(df_me['p_me'][(df_me['gas_fuel_type'].isin(gas_fuel))&(df_me['engine_type']=='dual_fuel')])
-    ae_gas = empty_series(df_ae['p_ae_calc'][(df_ae['gas_fuel_type'].isin(gas_fuel))&(df_ae['engine_type']=='dual_fuel')]) 
+    Args:
+        df (pd.DataFrame): engine table with the sfc and cf columns added by
+            calculate_sfc and calculate_cf
 
-    if me_gas + ae_gas == 0:
-        fd_gas = 0
-    else:
-        fd_gas = fuel_ratio(
-            v_mdo=df_inpt['v_mdo'].item(), v_lfo=df_inpt['v_lfo'].item(),
-            v_hfo=df_inpt['v_hfo'].item(), v_lng=df_inpt['v_lng'].item(),
-            power_mdo=me_mdo + ae_mdo,
-            power_lfo=me_lfo + ae_lfo,
-            power_hfo=me_hfo + ae_hfo,
-            power_lng=me_gas + ae_gas)
-
-    df_me['fd_gas'] = np.nan
-    df_ae['fd_gas'] = np.nan
-
-    df_me.loc[df_me['engine_type']=='dual_fuel','fd_gas'] = fd_gas
-    df_ae.loc[df_ae['engine_type']=='dual_fuel','fd_gas'] = fd_gas
-
-    df_me['fd_gas'].fillna(0, inplace=True)
-    df_ae['fd_gas'].fillna(0, inplace=True)
-
-    if fd_gas >= 0.5:
-        df_me.loc[
-        df_me['engine_type']=='dual_fuel',
-        'fd_gas'] = 1
-        df_ae.loc[
-        df_ae['engine_type']=='dual_fuel',
-        'fd_gas'] = 1
-    if fd_gas == np.nan:
-        fd_gas = 0
-    return fd_gas, df_me, df_ae
+    Returns:
+        tuple: cf_sfc_liquid, cf_sfc_gas (np.ndarray). cf_sfc_gas is 0 for
+            engines that are not dual fuel
+    """
+    col = lambda x: df[x].to_numpy(dtype=float)
+    cf_sfc_liquid = _nan_product(col('cf_liquid_fuel'), col('sfc_liquid_fuel'))
+    cf_sfc_gas = np.where(df['engine_type']=='dual_fuel',
+                          _nan_product(col('cf_pilot_fuel'), col('sfc_pilot_fuel'))
+                          + _nan_product(col('cf_gas_fuel'), col('sfc_gas_fuel')),
+                          0.)
+    return cf_sfc_liquid, cf_sfc_gas
 
 def me_term_calc(df_me):
-    df_me['cf_sfc_liquid'] = np.nan
-    df_me['cf_sfc_gas'] = np.nan
-
-    #calculate cf x sfc for diesel powered engines
-    df_me['cf_sfc_liquid'] = df_me.loc[:,['cf_liquid_fuel','sfc_liquid_fuel']].product(axis=1)
-    #calculate cf x sfc for dual fuel powered engines 
-    df_me.loc[
-        df_me['engine_type']=='dual_fuel',
-        'cf_sfc_gas'] = (df_me.loc[
-            df_me['engine_type']=='dual_fuel',
-            ['cf_pilot_fuel','sfc_pilot_fuel']].product(axis=1)
-    + df_me.loc[
-        df_me['engine_type']=='dual_fuel',
-        ['cf_gas_fuel','sfc_gas_fuel']].product(axis=1))
-
-    df_me['cf_sfc_gas'].fillna(0, inplace=True)
+    #calculate cf x sfc for diesel and dual fuel powered engines
+    cf_sfc_liquid, cf_sfc_gas = cf_sfc_calc(df_me)
+    fd_gas = df_me['fd_gas'].to_numpy(dtype=float)
+    cf_sfc = (fd_gas * cf_sfc_gas) + ((1 - fd_gas) * cf_sfc_liquid)
     #calculate me term (pme x cf_me x sfc_me) including df engines
-    df_me['me_term'] = (df_me['p_me_calc']
-                        * ((df_me['fd_gas'] * df_me['cf_sfc_gas'])
-                        + ((1 - df_me['fd_gas']) * df_me['cf_sfc_liquid'])))
-
-    df_me['pto_term'] = (df_me['pto_remove']
-                        * ((df_me['fd_gas'] * df_me['cf_sfc_gas'])
-                        + ((1 - df_me['fd_gas']) * df_me['cf_sfc_liquid'])))
+    me_terms = df_me['p_me_calc'].to_numpy(dtype=float) * cf_sfc
+    pto_terms = df_me['pto_remove'].to_numpy(dtype=float) * cf_sfc
+    df_me = df_me.assign(cf_sfc_liquid = cf_sfc_liquid, cf_sfc_gas = cf_sfc_gas,
+                         me_term = me_terms, pto_term = pto_terms)
     #weighted sum cf_me x sfc_me
-    cf_sfc_me = (df_me['me_term'].sum()) / df_me['p_me_calc'].sum()
-    #final me term
-    me_term = df_me['me_term'].sum()
-    pto_term = df_me['pto_term'].sum()
-    
+    me_term = me_terms.sum()
+    pto_term = pto_terms.sum()
+    cf_sfc_me = me_term / df_me['p_me_calc'].sum()
+
     return cf_sfc_me, me_term, pto_term, df_me
 
 def ae_term_calc(df_ae, cf_sfc_me):
-    df_ae['cf_sfc_liquid'] = np.nan
-    df_ae['cf_sfc_gas'] = np.nan
-
-    #calculate cf x sfc for diesel powered engines
-    df_ae['cf_sfc_liquid'] = df_ae.loc[:,['cf_liquid_fuel','sfc_liquid_fuel']].product(axis=1)
-    #calculate cf x sfc for dual fuel powered engines 
-    df_ae.loc[
-        df_ae['engine_type']=='dual_fuel',
-        'cf_sfc_gas'] = (df_ae.loc[
-            df_ae['engine_type']=='dual_fuel',
-            ['cf_pilot_fuel','sfc_pilot_fuel']].product(axis=1)
-    + df_ae.loc[
-        df_ae['engine_type']=='dual_fuel',
-        ['cf_gas_fuel','sfc_gas_fuel']].product(axis=1))
-
-    df_ae['cf_sfc_gas'].fillna(0, inplace=True)
+    #calculate cf x sfc for diesel and dual fuel powered engines
+    cf_sfc_liquid, cf_sfc_gas = cf_sfc_calc(df_ae)
+    fd_gas = df_ae['fd_gas'].to_numpy(dtype=float)
     #calculate ae term (pae x cf_ae x sfc_ae) including df engines
-    df_ae['ae_term'] = (df_ae['p_ae_calc']
-                        * ((df_ae['fd_gas'] * df_ae['cf_sfc_gas'])
-                        + ((1 - df_ae['fd_gas']) * df_ae['cf_sfc_liquid'])))
+    ae_terms = (df_ae['p_ae_calc'].to_numpy(dtype=float)
+                * ((fd_gas * cf_sfc_gas) + ((1 - fd_gas) * cf_sfc_liquid)))
+    df_ae = df_ae.assign(cf_sfc_liquid = cf_sfc_liquid, cf_sfc_gas = cf_sfc_gas,
+                         ae_term = ae_terms)
     #weighted sum cf_ae x sfc_ae
     if df_ae['p_ae_calc'].sum() == 0:
         cf_sfc_ae = cf_sfc_me
     else:
-        cf_sfc_ae = (df_ae['ae_term'].sum()) / df_ae['p_ae_calc'].sum()
+        cf_sfc_ae = ae_terms.sum() / df_ae['p_ae_calc'].sum()
     #final ae term
-    ae_term = df_ae['ae_term'].sum()
-    
+    ae_term = ae_terms.sum()
+
     return cf_sfc_ae, ae_term, df_ae
 
 def roro_plot_calc(ref_eq_df, dwt, gt):
@@ -1737,5 +702,335 @@ def phase_frac_calc(dwt, dwt_lim):
         phase_1_frac = 0
         phase_2_frac = 0
         phase_3_frac = 0
-        
-    return phase_1_frac, phase_2_frac, phase_3_frac
\ No newline at end of file
+
+    return phase_1_frac, phase_2_frac, phase_3_frac
+
+@dataclass
+class EEDIResult:
+    """EEDI of a single ship together with every intermediate term
+
+    Attributes follow the variable names used in eedipy.ipynb. df_me and
+    df_ae hold the engine tables with all derived columns added during
+    the calculation.
+    """
+    eedi_no_tech: float
+    eedi_with_tech: float
+    capacity: float
+    disp_t: float
+    mcr_me: float
+    p_me: float
+    p_ae: float
+    p_pto: float
+    p_pto_remove_me: float
+    p_ae_calc: float
+    p_pti: float
+    p_pti_shaft: float
+    p_me_deduct: float
+    v_ref: float
+    fd_gas: float
+    cf_sfc_me: float
+    cf_sfc_ae: float
+    me_term: float
+    pto_term: float
+    ae_term: float
+    pti_term: float
+    pti_and_c_term: float
+    c_1_val: float
+    c_2_val: float
+    p_eff: float
+    cf_sfc_me_pti: float
+    b1_term: float
+    fj_term: float
+    fi_term: float
+    fc_term: float
+    fl_term: float
+    fw_term: float
+    fm_term: float
+    df_me: pd.DataFrame = field(default=None, repr=False)
+    df_ae: pd.DataFrame = field(default=None, repr=False)
+
+    def to_dict(self)->dict:
+        """return the scalar terms of the result as a dictionary
+
+        Returns:
+            dict: term name to value, excluding the engine tables
+        """
+        return {k: float(v) for k, v in self.__dict__.items()
+                if k not in ('df_me', 'df_ae')}
+
+_result_cache = None
+
+def result_cache():
+    """result cache set with set_result_cache, None if there is none"""
+    return _result_cache
+
+def set_result_cache(cache):
+    """route every calc_eedi call through a result cache
+
+    Args:
+        cache: object with a lookup(record, calculate) method returning the
+            stored result of the record or calculate(*record), such as
+            cache_functions.ResultCache. None calculates every call.
+    """
+    global _result_cache
+    _result_cache = cache
+
+def calc_eedi(df_inpt, cf_dict, df_me, df_ae)->EEDIResult:
+    """calculate the EEDI of a ship from its loaded input tables
+
+    This runs the same steps as the "Calculation" and "Final EEDI" sections
+    of eedipy.ipynb without a notebook kernel. The input tables are not
+    modified so the same inputs can be passed to repeated calculations.
+    When a result cache is set with set_result_cache, stored results are
+    returned for inputs calculated before.
+
+    Args:
+        df_inpt (pd.DataFrame): ship parameters from load_variables
+        cf_dict (dict): fuel lcv and cf from load_cf_dict
+        df_me (pd.DataFrame): main engine table from load_me_data
+        df_ae (pd.DataFrame): auxiliary engine table from load_ae_data
+
+    Returns:
+        EEDIResult: attained EEDI with and without energy saving technology
+            and all intermediate terms
+    """
+    if _result_cache is not None:
+        return _result_cache.lookup((df_inpt, cf_dict, df_me, df_ae), _calc_eedi)
+    return _calc_eedi(df_inpt, cf_dict, df_me, df_ae)
+
+def _calc_eedi(df_inpt, cf_dict, df_me, df_ae)->EEDIResult:
+    #calculation of calc_eedi without the result cache
+    ship = ShipInput.from_tables(df_inpt, cf_dict, df_me, df_ae)
+    return _calc_ship(ship, df_me, df_ae)
+
+def calc_ship(ship:ShipInput)->EEDIResult:
+    """calculate the EEDI of a ship from a ShipInput
+
+    The same calculation as calc_eedi reading plain attributes, without
+    building the engine tables of the result.
+
+    Args:
+        ship (ShipInput): ship parameters, engines and cf table, e.g. from
+            load_ship
+
+    Returns:
+        EEDIResult: attained EEDI and all intermediate terms, df_me and df_ae
+            are None
+    """
+    return _calc_ship(ship)
+
+def _calc_ship(ship:ShipInput, df_me=None, df_ae=None)->EEDIResult:
+    #the engine tables, when given, are returned with the derived columns
+    me_cols = engine_columns(ship.me)
+    ae_cols = engine_columns(ship.ae)
+    mcr_me = me_cols['mcr'].sum()
+    p_me_eng = me_cols['p_me']
+    p_me = np.nansum(p_me_eng)
+    n_me = len(ship.me)
+    n_ae = len(ship.ae)
+
+    #derived inputs
+    me = engine_arrays(me_cols, ship.cf_dict)
+    ae = engine_arrays(ae_cols, ship.cf_dict, gas_fallback=True)
+    capacity = capacity_calc(dwt = ship.dwt, ship_type = ship.ship_type)
+    disp_t = ship.disp_m3 * 1.025
+
+    #pae
+    sfc_me_df = (np.nansum(me_cols['sfc_pilot_fuel'][me.is_df])
+                 + np.nansum(me.sfc_gas_fuel[me.is_df]))
+    if ship.hload == 0:
+        p_ae = p_ae_iterative_calc(ship_type = ship.ship_type,
+                                   mcr_me = mcr_me,
+                                   me_type = ship.propulsion_type,
+                                   p_sm_rated = ship.p_sm_rated,
+                                   mpp = ship.mpp,
+                                   p_pto_rated = ship.p_pto_rated,
+                                   cube = ship.cube,
+                                   me_engine_stroke = ship.me_engine_stroke,
+                                   sfc_me_gas_mode = sfc_me_df,
+                                   electrical_eff = ship.electrical_eff,
+                                   gen_efficiency = ship.gen_efficiency,
+                                   pti_eff = ship.pti_eff,
+                                   bor = ship.bor,
+                                   cop_cooling = ship.cop_cooling,
+                                   r_reliq = ship.r_reliq,
+                                   cop_comp = ship.cop_comp,
+                                   add_load = ship.p_ae_eff_al)
+    elif ship.hload > 0:
+        p_ae = ship.hload / ship.gen_efficiency
+
+    #pto
+    p_pto = p_pto_calc(p_pto_rated = ship.p_pto_rated,
+                       me_type = ship.propulsion_type)
+    p_pto_remove_me, p_ae_calc = pto_pae_ratio(ship, ship.me, ship.ae, p_ae, p_pto)
+    pto_remove = np.full(n_me, float(p_pto_remove_me))
+    p_ae_calc_eng = np.full(n_ae, float(p_ae_calc))
+
+    #if using engine limitation, pto calculation option 2 is used
+    if sum(me_cols['limited_power']) > 0:
+        p_me_calc = p_me_eng
+    else:
+        p_me_calc = p_me_eng - pto_remove
+
+    if ship.mpp == 0:
+        p_me = p_me_calc.sum()
+    elif (ship.mpp > 0) and (ship.ship_type == 'cruise_ship'):
+        p_me = 0
+
+    #pti
+    if ship.mpp == 0:
+        p_pti, p_pti_shaft = shaft_motor_power(p_sm_rated = ship.p_sm_rated,
+                                               me_type = ship.propulsion_type,
+                                               mpp = ship.mpp,
+                                               gen_efficiency = ship.gen_efficiency,
+                                               pti_eff = ship.pti_eff)
+    elif (ship.mpp > 0) and (ship.ship_type == 'cruise_ship'):
+        p_pti, p_pti_shaft = shaft_motor_power(p_sm_rated = ship.mpp,
+                                               me_type = ship.propulsion_type,
+                                               mpp = ship.mpp,
+                                               gen_efficiency = ship.gen_efficiency,
+                                               pti_eff = ship.pti_eff)
+    else:
+        p_pti = 0
+        p_pti_shaft = 0
+
+    p_me_deduct = p_me + p_pti_shaft - p_pto_remove_me
+    v_ref = update_vref(ship, p_me_deduct)
+
+    #fuel ratio
+    fd_gas = calc_fd_gas(ship, me, ae, p_me_eng, p_ae_calc_eng)
+    fd_gas_eng = engine_fd_gas(fd_gas)
+    cf_sfc_me_eng = me.cf_sfc(fd_gas)
+    cf_sfc_ae_eng = ae.cf_sfc(fd_gas)
+
+    #gather terms
+    me_terms = p_me_calc * cf_sfc_me_eng
+    pto_terms = pto_remove * cf_sfc_me_eng
+    ae_terms = p_ae_calc_eng * cf_sfc_ae_eng
+    me_term = me_terms.sum()
+    pto_term = pto_terms.sum()
+    ae_term = ae_terms.sum()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cf_sfc_me = np.nan_to_num(me_term / p_me_calc.sum())
+    if p_ae_calc_eng.sum() == 0:
+        cf_sfc_ae = cf_sfc_me
+    else:
+        cf_sfc_ae = ae_term / p_ae_calc_eng.sum()
+
+    #innovative
+    c_1_val = cat_c1(w_e = ship.w_e,
+                     eta_g = ship.eta_g,
+                     p_ae_eff_loss = ship.p_ae_eff_loss)
+    c_2_val = cat_c2(f_temp = ship.f_temp,
+                     p_max = ship.p_max,
+                     etad_gen = ship.etad_gen,
+                     n = ship.n,
+                     f_rad = 0.2,
+                     l_others = 10)
+    p_eff, cf_sfc_me_pti = cat_b1_short(p_p_eff_al = ship.p_p_eff_al,
+                                        p_ae_eff_al = ship.p_ae_eff_al,
+                                        p_me = p_me,
+                                        p_pti_shaft = p_pti_shaft,
+                                        cf_sfc_me = cf_sfc_me,
+                                        cf_sfc_ae = cf_sfc_ae)
+    b1_term = p_eff * cf_sfc_me_pti
+
+    #correction factors
+    fj_term = fj(ship_type = ship.ship_type,
+                 ice_class = ship.ice_class,
+                 mcr = mcr_me,
+                 dwt = ship.dwt,
+                 propulsion_redundancy = ship.propulsion_redundancy,
+                 l = ship.lpp,
+                 b = ship.b,
+                 d = ship.ds,
+                 disp_m3 = ship.disp_m3,
+                 v_ref = v_ref,
+                 g = 9.81)
+    fi_term = fi(ship_type = ship.ship_type,
+                 csr = ship.csr,
+                 ice_class = ship.ice_class,
+                 dwt = ship.dwt,
+                 l = ship.lpp,
+                 b = ship.b,
+                 d = ship.ds,
+                 disp_m3 = ship.disp_m3,
+                 disp_t = disp_t,
+                 lwt_ref = ship.lwt_ref,
+                 lwt_enhance = ship.lwt_enhance,
+                 lwt_csr = ship.lwt_csr,
+                 dwt_csr = ship.dwt_csr)
+    fc_term = fc(ship_type = ship.ship_type,
+                 dwt = capacity,
+                 cube = ship.cube,
+                 diesel_direct_drive = ship.diesel_direct_drive,
+                 marpol_annex = ship.marpol_annex,
+                 gt = ship.gt)
+    fl_term = fl(ship_type = ship.ship_type,
+                 dwt_ref = ship.dwt,
+                 number_of_cranes = ship.number_of_cranes,
+                 swl_crane = ship.swl_crane,
+                 reach_crane = ship.reach_crane,
+                 side_loader_weight = ship.side_loader_weight,
+                 roro_weight = ship.roro_weight)
+    fw_term = 1
+    fm_term = fm(ice_class = ship.ice_class)
+
+    #pti term
+    if ae_term == 0:
+        pti_term = 0
+        pti_and_c_term = 0
+    else:
+        pti_term = (fj_term * p_pti) * cf_sfc_ae
+        pti_and_c_term = ((fj_term * p_pti) - (c_1_val + c_2_val)) * cf_sfc_ae
+
+    #final eedi
+    denominator = (fi_term * fc_term * fl_term * capacity
+                   * fw_term * v_ref * fm_term)
+    eedi_no_tech = (fj_term * me_term + pto_term + ae_term + pti_term) / denominator
+    eedi_with_tech = ((fj_term * me_term + pto_term + ae_term
+                       + pti_and_c_term - b1_term) / denominator)
+
+    return EEDIResult(
+        eedi_no_tech = eedi_no_tech, eedi_with_tech = eedi_with_tech,
+        capacity = capacity, disp_t = disp_t, mcr_me = mcr_me, p_me = p_me,
+        p_ae = p_ae, p_pto = p_pto, p_pto_remove_me = p_pto_remove_me,
+        p_ae_calc = p_ae_calc, p_pti = p_pti, p_pti_shaft = p_pti_shaft,
+        p_me_deduct = p_me_deduct, v_ref = v_ref, fd_gas = fd_gas,
+        cf_sfc_me = cf_sfc_me, cf_sfc_ae = cf_sfc_ae, me_term = me_term,
+        pto_term = pto_term, ae_term = ae_term, pti_term = pti_term,
+        pti_and_c_term = pti_and_c_term, c_1_val = c_1_val, c_2_val = c_2_val,
+        p_eff = p_eff, cf_sfc_me_pti = cf_sfc_me_pti, b1_term = b1_term,
+        fj_term = fj_term, fi_term = fi_term, fc_term = fc_term,
+        fl_term = fl_term, fw_term = fw_term, fm_term = fm_term,
+        df_me = None if df_me is None else df_me.assign(
+            lcv_gas_fuel = me.lcv_gas_fuel, sfc_gas_fuel = me.sfc_gas_fuel,
+            cf_liquid_fuel = me.cf_liquid_fuel, cf_pilot_fuel = me.cf_pilot_fuel,
+            cf_gas_fuel = me.cf_gas_fuel, pto_remove = pto_remove,
+            p_me_calc = p_me_calc, fd_gas = np.where(me.is_df, fd_gas_eng, 0.),
+            cf_sfc_liquid = me.cf_sfc_liquid, cf_sfc_gas = me.cf_sfc_gas,
+            me_term = me_terms, pto_term = pto_terms),
+        df_ae = None if df_ae is None else df_ae.assign(
+            lcv_gas_fuel = ae.lcv_gas_fuel, sfc_gas_fuel = ae.sfc_gas_fuel,
+            cf_liquid_fuel = ae.cf_liquid_fuel, cf_pilot_fuel = ae.cf_pilot_fuel,
+            cf_gas_fuel = ae.cf_gas_fuel, p_ae_calc = p_ae_calc_eng,
+            fd_gas = np.where(ae.is_df, fd_gas_eng, 0.),
+            cf_sfc_liquid = ae.cf_sfc_liquid, cf_sfc_gas = ae.cf_sfc_gas,
+            ae_term = ae_terms))
+
+def compute_eedi(inpt)->EEDIResult:
+    """calculate the EEDI of a ship from a raw input sheet
+
+    Args:
+        inpt (pd.DataFrame): input sheet read with pd.read_excel from a file
+            following the layout of inputs.xlsx
+
+    Returns:
+        EEDIResult: attained EEDI and all intermediate terms
+    """
+    df_inpt = load_variables(inpt)
+    cf_dict = load_cf_dict(inpt)
+    df_me = load_me_data(inpt, df_inpt)
+    df_ae = load_ae_data(inpt)
+
+    return calc_eedi(df_inpt, cf_dict, df_me, df_ae)
@@ -0,0 +1,286 @@
+import argparse
+from multiprocessing import Pool
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+import batch_functions as bf
+from batch_functions import fleet_tables
+from reference_functions import meets, phase_met, required_eedi
+from sweep_functions import sweep, sweep_size
+from writer_functions import pareto_mask
+
+# Search of energy saving technology combinations. Every combination of the
+# options given for waste heat recovery, solar panels, air lubrication and
+# shaft generator / motor ratings is a candidate, priced by a cost model, and
+# the candidates on the Pareto front of attained EEDI and capex are returned.
+#
+#   front = optimize(record, {'w_e': [0, 200, 400], 'p_max': [0, 0.4],
+#                             'n': [0, 500, 1000], 'p_pto_rated': [0, 500]},
+#                    CostModel(per_unit = {'w_e': 3000, 'pv_power': 1500},
+#                              fixed = {'p_pto_rated': 250000}))
+#
+# Only the shaft generator and motor ratings and the air lubrication
+# auxiliary power change the power, speed and fuel terms of the ship. The
+# full calculation is run once for each combination of those, and the cat_b1,
+# cat_c1, cat_c2 and PTI terms of every candidate are recomputed from its
+# stored terms in chunks of candidates.
+
+VARIABLES = ('w_e', 'p_max', 'n', 'p_p_eff_al', 'p_ae_eff_al', 'p_pto_rated',
+             'p_sm_rated')
+# variables entering p_ae, p_me or v_ref, evaluated by the full calculation
+POWER_VARIABLES = ('p_pto_rated', 'p_sm_rated', 'p_ae_eff_al')
+FIXED_TERMS = ['eedi_no_tech', 'me_term', 'pto_term', 'ae_term', 'p_pti',
+               'p_pti_shaft', 'p_me', 'cf_sfc_me', 'cf_sfc_ae', 'fj_term',
+               'fi_term', 'fc_term', 'fl_term', 'fw_term', 'fm_term',
+               'capacity', 'v_ref']
+# ship parameters of cat_c1 and cat_c2 that are not searched
+TECH_CONSTANTS = ['eta_g', 'p_ae_eff_loss', 'f_temp', 'etad_gen']
+
+class CostModel(NamedTuple):
+    """capex of a candidate, linear in its values
+
+    Keys are columns of the candidates: the searched variables and
+    pv_power, the total solar panel power p_max * n.
+
+    Attributes:
+        per_unit (dict): column to cost per unit of its value
+        fixed (dict): column to cost added when its value is above 0
+    """
+    per_unit: dict
+    fixed: dict = None
+
+    def __call__(self, candidates:dict)->np.ndarray:
+        capex = np.zeros(len(candidates['pv_power']))
+        for x, cost in self.per_unit.items():
+            capex += cost * np.asarray(candidates[x], dtype=float)
+        for x, cost in (self.fixed or {}).items():
+            capex += np.where(np.asarray(candidates[x], dtype=float) > 0, cost, 0.)
+        return capex
+
+class Context(NamedTuple):
+    """everything needed to evaluate a chunk of candidates
+
+    Attributes:
+        axes (list): (variable, values) of every searched variable
+        power_axes (list): positions in axes of the POWER_VARIABLES
+        terms (dict): FIXED_TERMS of each combination of the power variables,
+            in the order of their Cartesian product
+        base (dict): value of every variable and TECH_CONSTANTS of the ship
+        required (float): required EEDI of the target phase, NaN for none
+        required_phases (np.ndarray): required EEDI of phases 0 to 3
+        eedi_base (float): attained EEDI of the ship as given
+        cost (callable): capex of a dict of candidate columns
+    """
+    axes: list
+    power_axes: list
+    terms: dict
+    base: dict
+    required: float
+    required_phases: np.ndarray
+    eedi_base: float
+    cost: object
+
+def _axes(options:dict)->list:
+    axes = []
+    for name, values in options.items():
+        if name not in VARIABLES:
+            raise ValueError('options must be in {}, got {}'.format(', '.join(VARIABLES), name))
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        if values.ndim != 1 or len(values) == 0:
+            raise ValueError('options for {} must be a non-empty 1d sequence'.format(name))
+        axes.append((name, values))
+    return axes
+
+def build_context(base, options:dict, cost, phase:int=None)->Context:
+    """run the full calculation for every combination of the power variables
+
+    Args:
+        base (tuple): ShipRecord (or (df_inpt, cf_dict, df_me, df_ae)) of the
+            ship
+        options (dict): variable of VARIABLES to sequence of values
+        cost (callable): capex of a dict of candidate columns, such as
+            CostModel
+        phase (int, optional): phase the candidates must meet, None to keep
+            every candidate. Defaults to None.
+
+    Returns:
+        Context: stored terms of the ship
+    """
+    axes = _axes(options)
+    ships, engines = fleet_tables([base])
+    row = {x: float(ships[x].iloc[0]) for x in list(VARIABLES) + TECH_CONSTANTS}
+
+    power_axes = [i for i, (name, values) in enumerate(axes) if name in POWER_VARIABLES]
+    grid = {axes[i][0]: axes[i][1] for i in power_axes}
+    if not grid:
+        grid = {'p_pto_rated': [row['p_pto_rated']]}
+    fixed = sweep(base, grid, columns=FIXED_TERMS + ['eedi_with_tech'])
+    terms = {x: fixed[x + '_calc' if x in grid else x].to_numpy() for x in FIXED_TERMS}
+
+    given = bf.compute_eedi_batch(ships, engines)
+    ship_type = ships['ship_type'].iloc[0]
+    required_phases = required_eedi(ship_type, given['capacity'].iloc[0],
+                                    float(ships['gt'].iloc[0]))
+    required = np.nan if phase is None else float(required_phases[phase])
+    return Context(axes, power_axes, terms, row, required, required_phases,
+                   float(given['eedi_with_tech'].iloc[0]), cost)
+
+def evaluate_candidates(context:Context, start:int, stop:int)->pd.DataFrame:
+    """attained EEDI and capex of a range of candidates
+
+    Args:
+        context (Context): stored terms of the ship
+        start (int): first candidate, position in the Cartesian product of
+            the options
+        stop (int): candidate after the last
+
+    Returns:
+        pd.DataFrame: searched variables, pv_power, capex, v_ref,
+            eedi_no_tech, eedi_with_tech, reduction (from the ship as given)
+            and phase_met of each candidate, indexed by its position. Only
+            the candidates meeting the target phase when one was given.
+    """
+    shape = tuple(len(values) for name, values in context.axes)
+    n = stop - start
+    positions = np.unravel_index(np.arange(start, stop), shape) if shape else ()
+    c = {x: np.full(n, v) for x, v in context.base.items()}
+    for (name, values), pos in zip(context.axes, positions):
+        c[name] = values[pos]
+    if context.power_axes:
+        config = np.ravel_multi_index([positions[i] for i in context.power_axes],
+                                      [shape[i] for i in context.power_axes])
+    else:
+        config = np.zeros(n, dtype=np.int64)
+    t = {x: v[config] for x, v in context.terms.items()}
+
+    #innovative
+    c_1_val = bf.cat_c1(c['w_e'], c['eta_g'], c['p_ae_eff_loss'])
+    c_2_val = bf.cat_c2(c['f_temp'], c['p_max'], c['etad_gen'], c['n'],
+                        f_rad = 0.2, l_others = 10)
+    p_eff, cf_sfc_me_pti = bf.cat_b1_short(c['p_p_eff_al'], c['p_ae_eff_al'],
+                                           t['p_me'], t['p_pti_shaft'],
+                                           t['cf_sfc_me'], t['cf_sfc_ae'])
+    b1_term = p_eff * cf_sfc_me_pti
+
+    #pti term
+    pti_and_c_term = np.where(t['ae_term'] == 0, 0.,
+                              ((t['fj_term'] * t['p_pti']) - (c_1_val + c_2_val))
+                              * t['cf_sfc_ae'])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denominator = (t['fi_term'] * t['fc_term'] * t['fl_term'] * t['capacity']
+                       * t['fw_term'] * t['v_ref'] * t['fm_term'])
+        eedi_with_tech = ((t['fj_term'] * t['me_term'] + t['pto_term'] + t['ae_term']
+                           + pti_and_c_term - b1_term) / denominator)
+
+    out = {name: c[name] for name, values in context.axes}
+    out['pv_power'] = c['p_max'] * c['n']
+    out['capex'] = context.cost(dict(c, pv_power = out['pv_power']))
+    out['v_ref'] = t['v_ref']
+    out['eedi_no_tech'] = t['eedi_no_tech']
+    out['eedi_with_tech'] = eedi_with_tech
+    out['reduction'] = context.eedi_base - eedi_with_tech
+    out['phase_met'] = phase_met(eedi_with_tech, context.required_phases)
+    df = pd.DataFrame(out, index=pd.RangeIndex(start, stop))
+    if not np.isnan(context.required):
+        df = df[meets(eedi_with_tech, t['v_ref'], context.required)]
+    return df
+
+def _evaluate(args:tuple)->pd.DataFrame:
+    return evaluate_candidates(*args)
+
+def iter_candidates(base, options:dict, cost, phase:int=None,
+                    chunk_size:int=100000, workers:int=1):
+    """evaluate every combination of the options in chunks
+
+    Args:
+        base (tuple): ShipRecord (or (df_inpt, cf_dict, df_me, df_ae)) of the
+            ship
+        options (dict): variable of VARIABLES to sequence of values.
+            Variables not given keep the value of the ship.
+        cost (callable): capex of a dict of candidate columns, such as
+            CostModel. Must be picklable when workers > 1.
+        phase (int, optional): phase the candidates must meet, None to keep
+            every candidate. Defaults to None.
+        chunk_size (int, optional): number of candidates evaluated at once.
+            Defaults to 100000.
+        workers (int, optional): number of processes evaluating chunks,
+            None for the number of cpus. Defaults to 1.
+
+    Yields:
+        pd.DataFrame: chunks of evaluate_candidates, in order
+    """
+    context = build_context(base, options, cost, phase)
+    n = sweep_size(options) if options else 1
+    jobs = [(context, start, min(start + chunk_size, n))
+            for start in range(0, n, chunk_size)]
+    if workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield _evaluate(job)
+    else:
+        with Pool(workers) as pool:
+            yield from pool.imap(_evaluate, jobs)
+
+def optimize(base, options:dict, cost, phase:int=None, chunk_size:int=100000,
+             workers:int=1)->pd.DataFrame:
+    """Pareto front of attained EEDI and capex over technology combinations
+
+    Args:
+        base (tuple): ShipRecord of the ship
+        options (dict): variable of VARIABLES to sequence of values
+        cost (callable): capex of a dict of candidate columns, such as
+            CostModel
+        phase (int, optional): phase the candidates must meet, None to keep
+            every candidate. Defaults to None.
+        chunk_size (int, optional): number of candidates evaluated at once.
+            Defaults to 100000.
+        workers (int, optional): number of processes evaluating chunks.
+            Defaults to 1.
+
+    Returns:
+        pd.DataFrame: candidates no other candidate beats on both
+            eedi_with_tech and capex, one per pair of values, sorted by capex.
+            Candidates without a finite EEDI and v_ref are never on the
+            front.
+    """
+    front = None
+    for chunk in iter_candidates(base, options, cost, phase=phase,
+                                 chunk_size=chunk_size, workers=workers):
+        #candidates that cannot be calculated, e.g. a PTI without a
+        #speed-power relation, are left out: any finite EEDI meets np.inf
+        chunk = chunk[meets(chunk['eedi_with_tech'], chunk['v_ref'], np.inf)]
+        #only the current front is kept
+        front = chunk if front is None else pd.concat([front, chunk])
+        front = front[pareto_mask(front[['eedi_with_tech', 'capex']].to_numpy())]
+    #of candidates with the same EEDI and capex the first is kept
+    return (front.drop_duplicates(['eedi_with_tech', 'capex'])
+            .sort_values(['capex', 'eedi_with_tech']))
+
+if __name__ == '__main__':
+    from reader_functions import read_input
+
+    parser = argparse.ArgumentParser(
+        description='Pareto front of EEDI and capex over energy saving technology options')
+    parser.add_argument('input', help='xlsx file with the layout of inputs.xlsx')
+    parser.add_argument('--option', nargs='+', action='append', default=[],
+                        metavar=('VARIABLE', 'VALUE'),
+                        help='values of a variable, one of {}'.format(', '.join(VARIABLES)))
+    parser.add_argument('--cost', nargs='+', action='append', default=[],
+                        metavar=('COLUMN', 'PER_UNIT'),
+                        help='cost per unit of a variable or pv_power, and optionally '
+                             'a fixed cost when it is fitted')
+    parser.add_argument('--phase', type=int, default=None,
+                        help='keep only candidates meeting this phase')
+    parser.add_argument('-j', '--workers', type=int, default=1)
+    parser.add_argument('-o', '--output', default=None, help='csv file for the front')
+    args = parser.parse_args()
+
+    options = {x[0]: [float(v) for v in x[1:]] for x in args.option}
+    cost = CostModel(per_unit = {x[0]: float(x[1]) for x in args.cost},
+                     fixed = {x[0]: float(x[2]) for x in args.cost if len(x) > 2})
+    front = optimize(read_input(args.input), options, cost, phase=args.phase,
+                     workers=args.workers)
+    if args.output:
+        front.to_csv(args.output)
+    print(front.to_string())
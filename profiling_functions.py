@@ -0,0 +1,187 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+import helper_functions
+import reader_functions
+import batch_functions
+
+# Opt-in timing of the stages of the EEDI calculation. Profiling replaces
+# the stage functions in their modules with timed wrappers for the duration
+# of a `with profile():` block and restores the originals afterwards, so
+# there is no overhead at all when profiling is not active.
+#
+#   with profile() as prof:
+#       compute_eedi(inpt)
+#   print(prof.summary())
+#   prof.write_chrome_trace('trace.json')
+
+HELPER_STAGES = ['load_variables', 'load_cf_dict', 'load_me_data', 'load_ae_data',
+                 'calc_me_power', 'calculate_sfc', 'calculate_cf', 'engine_arrays',
+                 'p_ae_iterative_calc', 'pto_pae_ratio', 'update_vref',
+                 'fuel_ratio_calc', 'calc_fd_gas', 'me_term_calc', 'ae_term_calc',
+                 'fj', 'fi', 'fc', 'fl', 'fm', 'calc_eedi']
+READER_STAGES = ['read_rows', 'record_from_rows', 'calc_me_power']
+BATCH_STAGES = ['fleet_tables', 'p_ae_iterative_calc', 'update_vref', 'fj', 'fi',
+                'fc', 'fl', 'fm', 'gas_fuel_ratios', 'compute_eedi_batch']
+
+STAGES = {helper_functions: HELPER_STAGES,
+          reader_functions: READER_STAGES,
+          batch_functions: BATCH_STAGES}
+
+class Profiler:
+    """records the wall time, calls and allocations of each stage
+
+    Attributes:
+        events (list): one (stage, start_ns, duration_ns, allocated_bytes,
+            thread id, depth) tuple per call, in the order the calls finished
+    """
+    def __init__(self, stages:dict=None, namespaces:list=None, memory:bool=False):
+        """
+        Args:
+            stages (dict, optional): module to list of function names to time.
+                Defaults to STAGES.
+            namespaces (list, optional): extra dictionaries holding the same
+                functions, such as the globals() of a notebook that ran
+                `from helper_functions import *`. Defaults to None.
+            memory (bool, optional): record the memory allocated by each
+                stage with tracemalloc, which slows the calculation down.
+                Defaults to False.
+        """
+        self.stages = STAGES if stages is None else stages
+        self.namespaces = [] if namespaces is None else list(namespaces)
+        self.memory = memory
+        self.events = []
+        self._patched = []
+        self._local = threading.local()
+        self._origin = None
+        self._stop_tracemalloc = False
+
+    def _wrap(self, name:str, fn):
+        events = self.events
+        local = self._local
+        memory = self.memory
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            depth = getattr(local, 'depth', 0)
+            local.depth = depth + 1
+            mem = tracemalloc.get_traced_memory()[0] if memory else 0
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                duration = time.perf_counter_ns() - start
+                allocated = tracemalloc.get_traced_memory()[0] - mem if memory else 0
+                local.depth = depth
+                events.append((name, start, duration, allocated,
+                               threading.get_ident(), depth))
+        timed.__wrapped_stage__ = fn
+        return timed
+
+    def _patch(self, namespace:dict, label:str, names:list):
+        for name in names:
+            fn = namespace.get(name)
+            if fn is None or hasattr(fn, '__wrapped_stage__'):
+                continue
+            self._patched.append((namespace, name, fn))
+            namespace[name] = self._wrap('{}.{}'.format(label, name), fn)
+
+    def start(self):
+        """replace the stage functions with timed wrappers"""
+        if self._patched:
+            return
+        self._origin = time.perf_counter_ns()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._stop_tracemalloc = True
+        else:
+            self._stop_tracemalloc = False
+        for module, names in self.stages.items():
+            self._patch(vars(module), module.__name__.split('_')[0], names)
+        for namespace in self.namespaces:
+            names = [n for names in self.stages.values() for n in names]
+            self._patch(namespace, 'notebook', names)
+
+    def stop(self):
+        """restore the original stage functions"""
+        for namespace, name, fn in reversed(self._patched):
+            namespace[name] = fn
+        self._patched = []
+        if self._stop_tracemalloc:
+            tracemalloc.stop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset(self):
+        """discard the recorded calls"""
+        del self.events[:]
+
+    def summary(self)->pd.DataFrame:
+        """summarise the recorded calls per stage
+
+        Returns:
+            pd.DataFrame: one row per stage with the number of calls, total,
+                mean and max wall time in ms and the allocated kB, sorted by
+                total time
+        """
+        df = pd.DataFrame(self.events, columns=['stage', 'start', 'duration',
+                                                'allocated', 'thread', 'depth'])
+        out = df.groupby('stage').agg(calls = ('duration', 'size'),
+                                      total_ms = ('duration', 'sum'),
+                                      mean_ms = ('duration', 'mean'),
+                                      max_ms = ('duration', 'max'),
+                                      allocated_kb = ('allocated', 'sum'))
+        out[['total_ms', 'mean_ms', 'max_ms']] /= 1e6
+        out['allocated_kb'] /= 1024
+        return out.sort_values('total_ms', ascending=False)
+
+    def chrome_trace(self)->dict:
+        """return the recorded calls in the Chrome trace event format
+
+        Returns:
+            dict: trace that can be opened in chrome://tracing or Perfetto
+        """
+        pid = os.getpid()
+        origin = self._origin or 0
+        events = [{'name': name, 'cat': name.split('.')[0], 'ph': 'X',
+                   'ts': (start - origin) / 1e3, 'dur': duration / 1e3,
+                   'pid': pid, 'tid': thread,
+                   'args': {'allocated_bytes': allocated}}
+                  for name, start, duration, allocated, thread, depth in self.events]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path:str):
+        """write the recorded calls to a Chrome trace JSON file
+
+        Args:
+            path (str): output file path
+        """
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+def profile(stages:dict=None, namespaces:list=None, memory:bool=False)->Profiler:
+    """create a profiler to use as a context manager
+
+    Args:
+        stages (dict, optional): module to list of function names to time.
+            Defaults to STAGES.
+        namespaces (list, optional): extra dictionaries holding the same
+            functions, such as a notebook's globals(). Defaults to None.
+        memory (bool, optional): record allocations with tracemalloc.
+            Defaults to False.
+
+    Returns:
+        Profiler: profiler that patches the stages while it is active
+    """
+    return Profiler(stages=stages, namespaces=namespaces, memory=memory)
@@ -0,0 +1,334 @@
+import glob
+import os
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from helper_functions import (FLOAT_LIST, BOOL_LIST, INT_VALS_ENG,
+                              STR_VALS_ENG, FLOAT_VALS_ENG, ShipInput, calc_me_power)
+
+# Reader for input sheets following the layout of inputs.xlsx. The sheet is
+# parsed once into plain rows, the row layout is compiled into a schema that
+# is cached for every sheet sharing the same labels, and the ship record is
+# built directly from the rows instead of slicing and transposing a raw
+# pd.read_excel frame.
+
+ME_MARKER = '#main engine'
+AE_MARKER = '#auxiliary engine'
+CF_MARKER = '#cf table'
+N_ENGINES = 10
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'inputs.xlsx')
+
+class ShipRecord(NamedTuple):
+    """loaded inputs of a single ship
+
+    The fields match the outputs of load_variables, load_cf_dict,
+    load_me_data and load_ae_data so a record can be passed straight to
+    calc_eedi(*record).
+    """
+    df_inpt: pd.DataFrame
+    cf_dict: dict
+    df_me: pd.DataFrame
+    df_ae: pd.DataFrame
+
+class TemplateSchema(NamedTuple):
+    """row layout of an input sheet
+
+    Rows are counted from the first data row below the header, as in the
+    raw frame returned by pd.read_excel.
+    """
+    params: tuple
+    dtypes: dict
+    me_rows: tuple
+    ae_rows: tuple
+    cf_header: int
+
+def _engine_rows(labels:tuple, start:int)->tuple:
+    rows = []
+    for i in range(start + 1, len(labels)):
+        if not isinstance(labels[i], str) or labels[i].startswith('#'):
+            break
+        rows.append((i, labels[i]))
+    return tuple(rows)
+
+@lru_cache(maxsize=32)
+def compile_schema(labels:tuple)->TemplateSchema:
+    """compile the row layout of an input sheet from its label column
+
+    Args:
+        labels (tuple): values of the 'ship parameters' column below the
+            header row
+
+    Raises:
+        ValueError: if the engine or cf table markers are missing
+
+    Returns:
+        TemplateSchema: row positions of the ship parameters, engine tables
+            and cf table
+    """
+    try:
+        me_start = labels.index(ME_MARKER)
+        ae_start = labels.index(AE_MARKER)
+        cf_start = labels.index(CF_MARKER)
+    except ValueError:
+        raise ValueError('input sheet does not follow the inputs.xlsx layout, '
+                         'missing one of {}, {} or {}'.format(
+                             ME_MARKER, AE_MARKER, CF_MARKER))
+
+    params = tuple((i, label) for i, label in enumerate(labels[:me_start])
+                   if isinstance(label, str) and '#' not in label)
+
+    dtypes = {}
+    for i, label in params:
+        if label in FLOAT_LIST:
+            dtypes[label] = float
+        elif label in BOOL_LIST:
+            dtypes[label] = bool
+        else:
+            dtypes[label] = object
+
+    return TemplateSchema(params = params,
+                          dtypes = dtypes,
+                          me_rows = _engine_rows(labels, me_start),
+                          ae_rows = _engine_rows(labels, ae_start),
+                          cf_header = cf_start + 1)
+
+def _value(v):
+    return np.nan if v is None else v
+
+def _engine_dtype(label:str):
+    if label in INT_VALS_ENG:
+        return int
+    if label in STR_VALS_ENG:
+        return object
+    if label in FLOAT_VALS_ENG or label == 'limited_power':
+        return float
+    return object
+
+def _engine_table(rows:list, layout:tuple)->pd.DataFrame:
+    width = N_ENGINES + 1
+    table = {label: (tuple(rows[i]) + (None,) * width)[1:width]
+             for i, label in layout}
+    #keep engines with an mcr, as dropna(subset='mcr') in load_me_data
+    keep = [j for j, v in enumerate(table['mcr'])
+            if isinstance(v, (int, float)) and v == v]
+    df = pd.DataFrame(
+        {label: np.array([_value(values[j]) for j in keep], dtype=_engine_dtype(label))
+         for label, values in table.items()},
+        index=keep)
+    return df
+
+def record_from_rows(rows:list)->ShipRecord:
+    """build a ship record from the rows of an input sheet
+
+    Args:
+        rows (list): row tuples of the sheet, starting with the header row
+
+    Returns:
+        ShipRecord: loaded inputs of the ship
+    """
+    rows = rows[1:]
+    schema = compile_schema(tuple(r[0] if r else None for r in rows))
+
+    df_inpt = pd.DataFrame(
+        {label: np.array([_value(rows[i][1])], dtype=schema.dtypes[label])
+         for i, label in schema.params},
+        index=['value'])
+    df_inpt.columns.name = 'ship parameters'
+
+    cf_dict = {}
+    header = rows[schema.cf_header]
+    lcv_col = header.index('lower_calorific_value')
+    cf_col = header.index('cf')
+    for r in rows[schema.cf_header + 1:]:
+        if r and r[0] is not None:
+            cf_dict[r[0]] = [r[lcv_col], r[cf_col]]
+
+    df_me = calc_me_power(_engine_table(rows, schema.me_rows), df_inpt)
+    df_ae = _engine_table(rows, schema.ae_rows)
+
+    return ShipRecord(df_inpt, cf_dict, df_me, df_ae)
+
+def record_from_frame(inpt:pd.DataFrame)->ShipRecord:
+    """build a ship record from a raw frame read with pd.read_excel
+
+    Args:
+        inpt (pd.DataFrame): raw input sheet
+
+    Returns:
+        ShipRecord: loaded inputs of the ship
+    """
+    values = inpt.astype(object).where(inpt.notna(), None).values.tolist()
+    return record_from_rows([tuple(inpt.columns)] + [tuple(r) for r in values])
+
+@lru_cache(maxsize=1)
+def template_record()->ShipRecord:
+    """ship record of the blank inputs.xlsx template
+
+    Returns:
+        ShipRecord: default ship parameters and cf table of the template
+    """
+    return read_input(TEMPLATE)
+
+def _engine_records(engines:list, columns:list)->pd.DataFrame:
+    for e in engines:
+        unknown = set(e) - set(columns)
+        if unknown:
+            raise ValueError('unknown engine columns {}'.format(', '.join(sorted(unknown))))
+    #keep engines with an mcr, as dropna(subset='mcr') in load_me_data
+    keep = [j for j, e in enumerate(engines)
+            if isinstance(e.get('mcr'), (int, float)) and e['mcr'] == e['mcr']]
+    defaults = {'engine_number': lambda j: j + 1, 'limited_power': lambda j: 0.}
+    return pd.DataFrame(
+        {label: np.array([_value(engines[j].get(label, defaults[label](j)
+                                                if label in defaults else None))
+                          for j in keep], dtype=_engine_dtype(label))
+         for label in columns},
+        index=keep)
+
+def record_from_dict(data:dict)->ShipRecord:
+    """build a ship record from plain values, e.g. parsed JSON
+
+    Ship parameters and cf values that are not given take the values of the
+    inputs.xlsx template.
+
+    Args:
+        data (dict): {'ship': {parameter: value}, 'me': [{column: value}],
+            'ae': [{column: value}], 'cf': {fuel: [lcv, cf]}}. Engines are
+            lists of rows with the columns of the engine tables.
+
+    Raises:
+        ValueError: if a parameter or engine column is unknown or a value
+            has the wrong type
+
+    Returns:
+        ShipRecord: loaded inputs of the ship
+    """
+    template = template_record()
+    unknown = set(data) - {'ship', 'me', 'ae', 'cf'}
+    if unknown:
+        raise ValueError('unknown sections {}'.format(', '.join(sorted(unknown))))
+
+    df_inpt = template.df_inpt.copy()
+    for label, v in data.get('ship', {}).items():
+        if label not in df_inpt:
+            raise ValueError('unknown ship parameter {}'.format(label))
+        try:
+            df_inpt[label] = np.array([_value(v)], dtype=df_inpt[label].dtype)
+        except (TypeError, ValueError):
+            raise ValueError('invalid value {!r} for {}'.format(v, label))
+
+    cf_dict = {k: list(v) for k, v in template.cf_dict.items()}
+    cf_dict.update({k: list(v) for k, v in data.get('cf', {}).items()})
+
+    me_columns = [x for x in template.df_me.columns if x != 'p_me']
+    df_me = calc_me_power(_engine_records(data.get('me', []), me_columns), df_inpt)
+    df_ae = _engine_records(data.get('ae', []), list(template.df_ae.columns))
+
+    return ShipRecord(df_inpt, cf_dict, df_me, df_ae)
+
+def _plain(v):
+    #python scalar for a numpy value, None for missing values
+    v = v.item() if isinstance(v, np.generic) else v
+    return None if isinstance(v, float) and v != v else v
+
+def record_to_dict(record:ShipRecord)->dict:
+    """convert a ship record to plain values accepted by record_from_dict
+
+    Args:
+        record (ShipRecord): loaded inputs of the ship
+
+    Returns:
+        dict: ship parameters, engine rows and cf table. Missing values
+            are None
+    """
+    df_inpt, cf_dict, df_me, df_ae = record
+    engines = lambda df: [{k: _plain(v) for k, v in row.items()}
+                          for row in df.drop(columns='p_me', errors='ignore')
+                                       .to_dict('records')]
+    return {'ship': {k: _plain(df_inpt[k].iloc[0]) for k in df_inpt.columns},
+            'me': engines(df_me),
+            'ae': engines(df_ae),
+            'cf': {k: [_plain(x) for x in v] for k, v in cf_dict.items()}}
+
+def read_rows(path:str, read_only:bool=True)->list:
+    """read the first worksheet of an xlsx file as a list of row tuples
+
+    Args:
+        path (str or file): path to the xlsx file or a binary file object
+        read_only (bool, optional): stream the sheet with openpyxl's
+            read-only parser instead of loading the whole workbook.
+            Defaults to True.
+
+    Returns:
+        list: row tuples of cell values
+    """
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=read_only, data_only=True)
+    try:
+        rows = list(wb.worksheets[0].iter_rows(values_only=True))
+    finally:
+        if read_only:
+            wb.close()
+    return rows
+
+def read_input(path:str, read_only:bool=True)->ShipRecord:
+    """read an input sheet into a ship record
+
+    Args:
+        path (str or file): path to an xlsx file with the layout of
+            inputs.xlsx or a binary file object
+        read_only (bool, optional): stream the sheet with openpyxl's
+            read-only parser. Defaults to True.
+
+    Returns:
+        ShipRecord: loaded inputs of the ship
+    """
+    return record_from_rows(read_rows(path, read_only=read_only))
+
+def read_ship(path:str, read_only:bool=True)->ShipInput:
+    """read an input sheet into a validated ShipInput for calc_ship
+
+    Args:
+        path (str or file): path to an xlsx file with the layout of
+            inputs.xlsx or a binary file object
+        read_only (bool, optional): stream the sheet with openpyxl's
+            read-only parser. Defaults to True.
+
+    Returns:
+        ShipInput: ship parameters, engines and cf table
+    """
+    return ShipInput.from_record(read_input(path, read_only=read_only))
+
+def input_paths(source)->list:
+    """expand a directory, glob pattern or list of paths to xlsx files
+
+    Args:
+        source (str or list): directory, glob pattern, file path or list
+            of file paths
+
+    Returns:
+        list: sorted list of file paths
+    """
+    if not isinstance(source, str):
+        return list(source)
+    if os.path.isdir(source):
+        source = os.path.join(source, '*.xlsx')
+    return sorted(glob.glob(source))
+
+def read_inputs(source, read_only:bool=True):
+    """read every input sheet in a directory or glob pattern
+
+    Args:
+        source (str or list): directory, glob pattern or list of paths
+        read_only (bool, optional): stream the sheets with openpyxl's
+            read-only parser. Defaults to True.
+
+    Yields:
+        tuple: path, ShipRecord
+    """
+    for path in input_paths(source):
+        yield path, read_input(path, read_only=read_only)
@@ -0,0 +1,234 @@
+import csv
+import os
+from functools import lru_cache
+
+import numpy as np
+
+# Reference lines of the required EEDI. resources/plotting_curves.csv and
+# resources/reduction_table.csv are read once into read-only arrays indexed
+# by ship type, so the required EEDI of a whole fleet for phases 0 to 3 is a
+# single array operation.
+
+RESOURCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources')
+PHASES = (0, 1, 2, 3)
+#ship types of the csv files named differently in core_functions.SHIP_TYPES
+CSV_SHIP_TYPES = {'general_cargo_ship': 'general_cargo',
+                  'refrigerated_cargo_ship': 'refrigerated_cargo'}
+
+def _float(v:str)->float:
+    return float(v) if v not in ('', None) else np.nan
+
+def _read_csv(path:str)->list:
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+class ReferenceIndex:
+    """required EEDI reference lines for every ship type
+
+    Attributes:
+        ship_types (tuple): ship types of core_functions.SHIP_TYPES with a
+            reference line, sorted. The csv names of CSV_SHIP_TYPES are
+            accepted as well.
+        a (np.ndarray): reference line constant a of each ship type, NaN for
+            roro_cargo_vehicle where it depends on dwt / gt
+        c (np.ndarray): reference line exponent c of each ship type
+        dwt_upper (np.ndarray): dwt above which the full reduction applies
+        dwt_lower (np.ndarray): dwt above which the reduction is interpolated,
+            NaN for ship types with a single limit
+        frac_upper (np.ndarray): reduction in % above dwt_upper, one column
+            per phase
+        frac_lower (np.ndarray): reduction in % at dwt_lower and dwt_upper of
+            the interpolated band, shape (ship types, phases, 2)
+    """
+    __slots__ = ('ship_types', '_types', 'a', 'c', 'dwt_upper', 'dwt_lower',
+                 'frac_upper', 'frac_lower')
+
+    def __init__(self, curves:list, reduction:list):
+        name = lambda r: CSV_SHIP_TYPES.get(r['ship_type'], r['ship_type'])
+        curves = {name(r): r for r in curves}
+        ship_types = tuple(sorted(curves))
+        n = len(ship_types)
+        a = np.array([_float(curves[x]['a']) for x in ship_types])
+        c = np.array([_float(curves[x]['c']) for x in ship_types])
+        dwt_upper = np.full(n, np.inf)
+        dwt_lower = np.full(n, np.nan)
+        frac_upper = np.zeros((n, len(PHASES)))
+        frac_lower = np.zeros((n, len(PHASES), 2))
+
+        for i, x in enumerate(ship_types):
+            #breakpoints sorted from the highest dwt limit, as in the csv
+            rows = sorted([r for r in reduction if name(r) == x],
+                          key=lambda r: -_float(r['dwt_lim']))
+            if not rows:
+                continue
+            dwt_upper[i] = _float(rows[0]['dwt_lim'])
+            frac_upper[i] = [_float(rows[0]['phase_0'])] + [
+                _float(rows[0]['phase_{}_upper'.format(p)]) for p in PHASES[1:]]
+            if len(rows) > 1:
+                dwt_lower[i] = _float(rows[1]['dwt_lim'])
+                frac_lower[i, 0] = _float(rows[1]['phase_0'])
+                for p in PHASES[1:]:
+                    frac_lower[i, p] = [_float(rows[1]['phase_{}_lower'.format(p)]),
+                                        _float(rows[1]['phase_{}_upper'.format(p)])]
+
+        self.ship_types = ship_types
+        self._types = np.array(ship_types)
+        self.a, self.c = a, c
+        self.dwt_upper, self.dwt_lower = dwt_upper, dwt_lower
+        self.frac_upper, self.frac_lower = frac_upper, frac_lower
+        for arr in (self._types, a, c, dwt_upper, dwt_lower, frac_upper, frac_lower):
+            arr.flags.writeable = False
+
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError('ReferenceIndex is read-only')
+        object.__setattr__(self, name, value)
+
+    def codes(self, ship_type)->np.ndarray:
+        """position of each ship type in ship_types
+
+        Args:
+            ship_type (str or np.ndarray): ship types
+
+        Returns:
+            np.ndarray: positions, -1 for ship types without a reference line
+        """
+        ship_type = np.asarray(ship_type).astype(str)
+        for csv_name, x in CSV_SHIP_TYPES.items():
+            ship_type = np.where(ship_type == csv_name, x, ship_type)
+        pos = np.searchsorted(self._types, ship_type)
+        pos = np.minimum(pos, len(self._types) - 1)
+        return np.where(self._types[pos] == ship_type, pos, -1)
+
+    def phase_fracs(self, ship_type, dwt)->np.ndarray:
+        """reduction factors in % for phases 0 to 3
+
+        Args:
+            ship_type (str or np.ndarray): ship types
+            dwt (float or np.ndarray): capacity as returned by capacity_calc
+
+        Returns:
+            np.ndarray: reductions with a last axis of length 4, NaN for ship
+                types without a reference line
+        """
+        code = self.codes(ship_type)
+        dwt = np.asarray(dwt, dtype=float)
+        code, dwt = np.broadcast_arrays(code, dwt)
+        known = code >= 0
+        i = np.where(known, code, 0)
+
+        hi = self.dwt_upper[i]
+        lo = self.dwt_lower[i]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            t = ((dwt - lo) / (hi - lo))[..., None]
+        band = self.frac_lower[i]
+        interp = band[..., 0] + t * (band[..., 1] - band[..., 0])
+
+        upper = (dwt >= hi)[..., None]
+        between = ((dwt > lo) & (dwt < hi))[..., None]
+        fracs = np.where(upper, self.frac_upper[i], np.where(between, interp, 0.))
+        return np.where(known[..., None], fracs, np.nan)
+
+    def phase_0(self, ship_type, dwt, gt=np.nan)->np.ndarray:
+        """phase 0 reference line value a * dwt ^ -c
+
+        Args:
+            ship_type (str or np.ndarray): ship types
+            dwt (float or np.ndarray): capacity as returned by capacity_calc
+            gt (float or np.ndarray, optional): gross tonnage, only used for
+                roro_cargo_vehicle ships. Defaults to NaN.
+
+        Returns:
+            np.ndarray: reference line values, NaN for ship types without a
+                reference line
+        """
+        code = self.codes(ship_type)
+        dwt = np.asarray(dwt, dtype=float)
+        code, dwt, gt = np.broadcast_arrays(code, dwt, np.asarray(gt, dtype=float))
+        known = code >= 0
+        i = np.where(known, code, 0)
+
+        #roro_plot_calc
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = dwt / gt
+            roro_a = np.where(ratio < 0.3, ratio ** -0.7 * 780.36, 1812.63)
+            a = np.where(self._types[i] == 'roro_cargo_vehicle', roro_a, self.a[i])
+            return np.where(known, a * dwt ** (-1 * self.c[i]), np.nan)
+
+    def required(self, ship_type, dwt, gt=np.nan)->np.ndarray:
+        """required EEDI for phases 0 to 3
+
+        Args:
+            ship_type (str or np.ndarray): ship types
+            dwt (float or np.ndarray): capacity as returned by capacity_calc
+            gt (float or np.ndarray, optional): gross tonnage, only used for
+                roro_cargo_vehicle ships. Defaults to NaN.
+
+        Returns:
+            np.ndarray: required EEDI with a last axis of length 4, NaN for
+                ship types without a reference line
+        """
+        phase_0 = self.phase_0(ship_type, dwt, gt)
+        return (1 - self.phase_fracs(ship_type, dwt) / 100) * phase_0[..., None]
+
+@lru_cache(maxsize=8)
+def reference_index(resources:str=RESOURCES)->ReferenceIndex:
+    """load the reference line index, reading the csv files only once
+
+    Args:
+        resources (str, optional): directory holding plotting_curves.csv and
+            reduction_table.csv. Defaults to the resources folder of the repo.
+
+    Returns:
+        ReferenceIndex: shared read-only index
+    """
+    return ReferenceIndex(_read_csv(os.path.join(resources, 'plotting_curves.csv')),
+                          _read_csv(os.path.join(resources, 'reduction_table.csv')))
+
+def required_eedi(ship_type, dwt, gt=np.nan)->np.ndarray:
+    """required EEDI for phases 0 to 3 from the default reference index
+
+    Args:
+        ship_type (str or np.ndarray): ship types
+        dwt (float or np.ndarray): capacity as returned by capacity_calc
+        gt (float or np.ndarray, optional): gross tonnage, only used for
+            roro_cargo_vehicle ships. Defaults to NaN.
+
+    Returns:
+        np.ndarray: required EEDI with a last axis of length 4
+    """
+    return reference_index().required(ship_type, dwt, gt)
+
+def phase_met(attained, required)->np.ndarray:
+    """highest phase whose reference line is met
+
+    Args:
+        attained (float or np.ndarray): attained EEDI
+        required (np.ndarray): required EEDI with a last axis of length 4
+
+    Returns:
+        np.ndarray: highest phase with attained <= required, -1 if none is met
+    """
+    met = np.asarray(attained, dtype=float)[..., None] <= np.asarray(required)
+    return np.where(met.any(axis=-1),
+                    len(PHASES) - 1 - np.argmax(met[..., ::-1], axis=-1), -1)
+
+def meets(attained, v_ref, required)->np.ndarray:
+    """whether the attained EEDI meets the required EEDI
+
+    A ship whose reference speed comes from a speed-power relation it does
+    not have gets an infinite v_ref and an attained EEDI of 0, which is not
+    a calculation and never meets.
+
+    Args:
+        attained (float or np.ndarray): attained EEDI
+        v_ref (float or np.ndarray): reference speed of the attained EEDI
+        required (float or np.ndarray): required EEDI, broadcast against
+            attained
+
+    Returns:
+        np.ndarray: attained <= required where attained and v_ref are finite
+    """
+    attained = np.asarray(attained, dtype=float)
+    v_ref = np.asarray(v_ref, dtype=float)
+    return np.isfinite(attained) & np.isfinite(v_ref) & (attained <= required)
@@ -0,0 +1,184 @@
+import argparse
+import csv
+import os
+from dataclasses import fields
+from multiprocessing import Pool
+
+import numpy as np
+
+from cache_functions import install
+from helper_functions import EEDIResult, calc_eedi, result_cache, set_result_cache
+from reader_functions import input_paths, read_input
+from reference_functions import phase_met, required_eedi
+
+# Batch runner for directories of input sheets. Every sheet is read and
+# calculated in a worker process and one row per sheet is appended to a csv
+# file as soon as it is ready, so an interrupted run can be resumed by
+# skipping the sheets already calculated without error.
+
+TERM_FIELDS = [f.name for f in fields(EEDIResult) if f.name not in ('df_me', 'df_ae')]
+REQUIRED_FIELDS = ['required_phase_0', 'required_phase_1', 'required_phase_2',
+                   'required_phase_3']
+RESULT_FIELDS = (['source', 'ship_type', 'error', 'attained_eedi']
+                 + REQUIRED_FIELDS + ['phase_met'] + TERM_FIELDS)
+
+def result_row(record, source:str='')->dict:
+    """calculate a ship record into a result row
+
+    Args:
+        record (tuple): ShipRecord (or (df_inpt, cf_dict, df_me, df_ae))
+        source (str, optional): label of the input. Defaults to ''.
+
+    Returns:
+        dict: one result row with the keys of RESULT_FIELDS
+    """
+    row = dict.fromkeys(RESULT_FIELDS, np.nan)
+    row['source'] = source
+    row['error'] = ''
+    result = calc_eedi(*record)
+    ship_type = record[0]['ship_type'].iloc[0]
+    required = required_eedi(ship_type = ship_type,
+                             dwt = result.capacity,
+                             gt = record[0]['gt'].iloc[0]).tolist()
+
+    row['ship_type'] = ship_type
+    row['attained_eedi'] = result.eedi_with_tech
+    row.update(zip(REQUIRED_FIELDS, required))
+    row['phase_met'] = int(phase_met(result.eedi_with_tech, required))
+    row.update(result.to_dict())
+    return row
+
+def process_input(path:str)->dict:
+    """read and calculate a single input sheet
+
+    Errors are recorded in the 'error' field instead of being raised so a
+    single bad sheet does not stop a batch.
+
+    Args:
+        path (str): path to an xlsx file with the layout of inputs.xlsx
+
+    Returns:
+        dict: one result row with the keys of RESULT_FIELDS
+    """
+    try:
+        return result_row(read_input(path), path)
+    except Exception as e:
+        row = dict.fromkeys(RESULT_FIELDS, np.nan)
+        row['source'] = path
+        row['error'] = '{}: {}'.format(type(e).__name__, e)
+        return row
+
+def completed_sources(output:str)->set:
+    """return the sources already calculated in a results file
+
+    Args:
+        output (str): path to a results csv written by run_batch
+
+    Returns:
+        set: source paths of the rows without an error, empty if the file
+            does not exist
+    """
+    if not os.path.exists(output):
+        return set()
+    with open(output, newline='') as f:
+        return {row['source'] for row in csv.DictReader(f) if not row['error']}
+
+def drop_failed(output:str)->int:
+    """remove the rows with an error from a results file
+
+    Args:
+        output (str): path to a results csv written by run_batch
+
+    Returns:
+        int: number of rows removed
+    """
+    if not os.path.exists(output):
+        return 0
+    with open(output, newline='') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames
+        rows = list(reader)
+    kept = [row for row in rows if not row['error']]
+    if len(kept) < len(rows):
+        #written next to the file and swapped in, so a crash keeps the old one
+        with open(output + '.tmp', 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(kept)
+        os.replace(output + '.tmp', output)
+    return len(rows) - len(kept)
+
+def run_batch(source, output:str, workers:int=None, ordered:bool=True,
+              resume:bool=True, chunksize:int=1, cache:str=None)->int:
+    """calculate every input sheet in a directory or glob pattern
+
+    Args:
+        source (str or list): directory, glob pattern or list of xlsx paths
+        output (str): path of the results csv, one row per sheet
+        workers (int, optional): number of worker processes. Defaults to
+            os.cpu_count(). With 1 the sheets are calculated in this process.
+        ordered (bool, optional): write the rows in the order of the sheets
+            instead of the order they finish in. Defaults to True.
+        resume (bool, optional): skip sheets already calculated in output
+            and append to it, retrying the sheets that failed. Otherwise
+            output is overwritten. Defaults to True.
+        chunksize (int, optional): number of sheets sent to a worker at
+            once. Defaults to 1.
+        cache (str, optional): result store shared by the workers, see
+            cache_functions.open_store. Defaults to None.
+
+    Returns:
+        int: number of sheets calculated
+    """
+    paths = input_paths(source)
+    if resume:
+        drop_failed(output)
+    done = completed_sources(output) if resume else set()
+    paths = [p for p in paths if p not in done]
+    new_file = not (resume and os.path.exists(output))
+
+    with open(output, 'w' if new_file else 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        if new_file:
+            writer.writeheader()
+        if workers == 1:
+            #the cache is only for this run, keep the one of the caller
+            previous = result_cache()
+            if cache:
+                install(cache)
+            try:
+                for row in map(process_input, paths):
+                    writer.writerow(row)
+                    f.flush()
+            finally:
+                set_result_cache(previous)
+        else:
+            with Pool(workers, initializer=install if cache else None,
+                      initargs=(cache,) if cache else ()) as pool:
+                imap = pool.imap if ordered else pool.imap_unordered
+                for row in imap(process_input, paths, chunksize=chunksize):
+                    writer.writerow(row)
+                    f.flush()
+    return len(paths)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='calculate the EEDI of every input sheet in a directory')
+    parser.add_argument('source', nargs='+',
+                        help='xlsx files, directories or glob patterns')
+    parser.add_argument('-o', '--output', required=True, help='results csv file')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='number of worker processes (default: all cpus)')
+    parser.add_argument('--unordered', action='store_true',
+                        help='write rows as they finish instead of in input order')
+    parser.add_argument('--no-resume', action='store_true',
+                        help='overwrite the results file instead of resuming')
+    parser.add_argument('--cache', default=None,
+                        help='result store reused across runs, a .sqlite file or a directory')
+    args = parser.parse_args()
+
+    paths = [p for s in args.source for p in input_paths(s)]
+    n = run_batch(paths, args.output, workers=args.workers,
+                  ordered=not args.unordered, resume=not args.no_resume,
+                  cache=args.cache)
+    print('calculated {} sheets, results in {}'.format(n, args.output))
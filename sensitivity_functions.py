@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+from helper_functions import FLOAT_LIST
+from batch_functions import compute_eedi_batch
+
+# Partial derivatives of the attained EEDI with respect to every numeric ship
+# parameter and engine value. Each input of each ship is stepped up and down
+# on its own row of the batch tables, so the derivatives of a whole fleet come
+# from one pass through compute_eedi_batch. The Pae fixed point is converged
+# on every row, so its derivative is that of the solution and not of a fixed
+# number of iterations. Inputs sitting on a branch of the calculation (e.g.
+# p_pto_rated = 0) have different one-sided derivatives and are flagged.
+#
+#   ships, engines = fleet_tables(records)
+#   sensitivity(ships, engines)
+
+ENGINE_INPUTS = ['mcr', 'limited_power', 'sfc_liquid_fuel', 'sfc_pilot_fuel',
+                 'sfc_gas_fuel_kj', 'lcv_gas_fuel', 'cf_liquid_fuel',
+                 'cf_pilot_fuel', 'cf_gas_fuel']
+
+def _inputs(ships:dict, engines:dict, ship_inputs:list, engine_inputs:list)->pd.DataFrame:
+    #one row per (ship, input) with a finite value
+    n_ship = len(np.asarray(ships['ship_type']))
+    ship = np.asarray(engines['ship'], dtype=np.int64)
+    kind = np.asarray(engines['kind'])
+    #position of each engine among the engines of its kind on its ship
+    order = np.lexsort((np.arange(len(ship)), kind, ship))
+    group = ship[order] * 2 + (kind[order] == 'ae')
+    first = np.r_[0, np.flatnonzero(np.diff(group)) + 1]
+    number = np.empty(len(ship), dtype=np.int64)
+    number[order] = np.arange(len(ship)) - np.repeat(first, np.diff(np.r_[first, len(ship)]))
+
+    frames = []
+    for x in ship_inputs:
+        frames.append(pd.DataFrame({'ship': np.arange(n_ship), 'input': x,
+                                    'column': x, 'engine': -1,
+                                    'value': np.asarray(ships[x], dtype=float)}))
+    for x in engine_inputs:
+        frames.append(pd.DataFrame({'ship': ship,
+                                    'input': ['{}.{}[{}]'.format(k, x, i)
+                                              for k, i in zip(kind, number)],
+                                    'column': x, 'engine': np.arange(len(ship)),
+                                    'value': np.asarray(engines[x], dtype=float)}))
+    df = pd.concat(frames, ignore_index=True)
+    df = df[np.isfinite(df['value'])]
+    return df.sort_values('ship', kind='stable').reset_index(drop=True)
+
+def _expand(ships:dict, engines:dict, row_ship:np.ndarray)->tuple:
+    #copy of the tables with one ship per row of row_ship
+    ship = np.asarray(engines['ship'], dtype=np.int64)
+    order = np.argsort(ship, kind='stable')
+    counts = np.bincount(ship, minlength=len(np.asarray(ships['ship_type'])))
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    n_eng = counts[row_ship]
+    offsets = np.r_[0, np.cumsum(n_eng)[:-1]]
+    local = np.arange(n_eng.sum()) - np.repeat(offsets, n_eng)
+    take = order[np.repeat(starts[row_ship], n_eng) + local]
+
+    out_ships = {x: np.asarray(v)[row_ship] for x, v in ships.items()}
+    out_engines = {x: np.asarray(v)[take] for x, v in engines.items()}
+    out_engines['ship'] = np.repeat(np.arange(len(row_ship)), n_eng)
+    #row of each original engine within the expanded table of a row
+    rank = np.empty(len(ship), dtype=np.int64)
+    rank[order] = np.arange(len(ship)) - np.repeat(starts, counts)
+    return out_ships, out_engines, offsets, rank
+
+def sensitivity(ships, engines, output:str='eedi_with_tech', step:float=1e-4,
+                ship_inputs:list=None, engine_inputs:list=None,
+                chunk_size:int=200000)->pd.DataFrame:
+    """partial derivatives of the attained EEDI for every input of every ship
+
+    Derivatives are central differences with a step of step * max(|x|, 1)
+    evaluated on the converged calculation.
+
+    Args:
+        ships (pd.DataFrame or dict): ships as built by fleet_tables
+        engines (pd.DataFrame or dict): engines as built by fleet_tables
+        output (str, optional): result column of compute_eedi_batch to
+            differentiate. Defaults to 'eedi_with_tech'.
+        step (float, optional): relative step. Defaults to 1e-4.
+        ship_inputs (list, optional): ship parameters to differentiate by.
+            Defaults to the FLOAT_LIST parameters in ships.
+        engine_inputs (list, optional): engine columns to differentiate by,
+            per engine. Defaults to ENGINE_INPUTS.
+        chunk_size (int, optional): maximum number of rows evaluated at once.
+            Defaults to 200000.
+
+    Returns:
+        pd.DataFrame: one row per ship and input with the input value, the
+            derivative, the elasticity (relative change of the output per
+            relative change of the input), whether the forward and backward
+            derivatives agree and the rank of the input by absolute
+            elasticity within its ship. Engine inputs are named like
+            'me.mcr[0]' for the first main engine.
+    """
+    ships = {x: np.asarray(ships[x]) for x in ships}
+    engines = {x: np.asarray(engines[x]) for x in engines}
+    ship_inputs = [x for x in FLOAT_LIST if x in ships] if ship_inputs is None else ship_inputs
+    engine_inputs = ENGINE_INPUTS if engine_inputs is None else engine_inputs
+    for x in ship_inputs:
+        ships[x] = np.asarray(ships[x], dtype=float)
+    for x in engine_inputs:
+        engines[x] = np.asarray(engines[x], dtype=float)
+
+    inputs = _inputs(ships, engines, ship_inputs, engine_inputs)
+    inputs['step'] = step * np.maximum(np.abs(inputs['value']), 1)
+    base = compute_eedi_batch(ships, engines)[output].to_numpy()
+
+    #rows of each chunk: the input stepped up, then stepped down
+    values = np.empty((len(inputs), 2))
+    edges = np.unique(np.r_[np.arange(0, len(inputs), max(chunk_size // 2, 1)),
+                            len(inputs)])
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        chunk = inputs.iloc[lo:hi]
+        n = len(chunk)
+        row_ship = np.tile(chunk['ship'].to_numpy(), 2)
+        delta = np.r_[chunk['step'].to_numpy(), -chunk['step'].to_numpy()]
+        c_ships, c_engines, offsets, rank = _expand(ships, engines, row_ship)
+        column = np.tile(chunk['column'].to_numpy(), 2)
+        engine = np.tile(chunk['engine'].to_numpy(), 2)
+        for x in np.unique(column):
+            rows = np.flatnonzero((column == x) & (engine < 0))
+            if len(rows):
+                c_ships[x] = c_ships[x].copy()
+                c_ships[x][rows] += delta[rows]
+            rows = np.flatnonzero((column == x) & (engine >= 0))
+            if len(rows):
+                c_engines[x] = c_engines[x].copy()
+                c_engines[x][offsets[rows] + rank[engine[rows]]] += delta[rows]
+        out = compute_eedi_batch(c_ships, c_engines)[output].to_numpy()
+        values[lo:hi] = np.c_[out[:n], out[n:]]
+
+    h = inputs['step'].to_numpy()
+    f0 = base[inputs['ship'].to_numpy()]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        forward = (values[:, 0] - f0) / h
+        backward = (f0 - values[:, 1]) / h
+        inputs['derivative'] = (values[:, 0] - values[:, 1]) / (2 * h)
+        inputs['elasticity'] = inputs['derivative'] * inputs['value'] / f0
+        inputs['differentiable'] = (np.abs(forward - backward)
+                                    <= 1e-3 * np.abs(backward) + 1e-9 * np.abs(f0))
+    inputs['rank'] = (inputs['elasticity'].abs()
+                      .groupby(inputs['ship']).rank(ascending=False, method='first')
+                      .fillna(len(inputs)).astype(int))
+    out = inputs.drop(columns=['engine', 'column'])
+    return out.sort_values(['ship', 'rank']).reset_index(drop=True)
@@ -0,0 +1,374 @@
+import argparse
+import asyncio
+import io
+import json
+import os
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from email.parser import BytesParser
+from email.policy import HTTP
+
+import numpy as np
+
+from cache_functions import install
+from helper_functions import result_cache, set_result_cache
+from reader_functions import read_input, record_from_dict
+from runner_functions import result_row
+
+# HTTP service for the EEDI calculation using only asyncio and the standard
+# library. Requests are parsed on the event loop and the calculation,
+# including reading uploaded xlsx files, runs in a bounded worker pool. When
+# the pool already holds max_pending calculations new requests are refused
+# with 503 instead of being queued without limit.
+#
+#   python service_functions.py --port 8000 -j 4
+#
+#   POST /eedi    JSON record (see record_from_dict) or an xlsx upload,
+#                 returns the result row of runner_functions.result_row
+#   POST /batch   {"ships": [record, ...]}, returns {"results": [row, ...]}
+#   GET  /metrics request counts and latency percentiles per endpoint
+#   GET  /health
+
+XLSX_TYPES = ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+              'application/octet-stream')
+MAX_BODY = 16 * 1024 * 1024
+MAX_BATCH = 10000
+ROUTES = ('/eedi', '/batch', '/metrics', '/health')
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 413: 'Payload Too Large',
+           422: 'Unprocessable Entity', 500: 'Internal Server Error',
+           503: 'Service Unavailable'}
+
+class RequestError(Exception):
+    """error returned to the client with an HTTP status"""
+    def __init__(self, status:int, message:str):
+        super().__init__(message)
+        self.status = status
+
+def _json_safe(v):
+    #NaN is not valid JSON, numpy scalars are not serialisable
+    if isinstance(v, dict):
+        return {k: _json_safe(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)):
+        return [_json_safe(x) for x in v]
+    if isinstance(v, np.generic):
+        v = v.item()
+    if isinstance(v, float) and not np.isfinite(v):
+        return None
+    return v
+
+def calculate(kind:str, payload)->dict:
+    """calculate one ship, run in the worker pool
+
+    Args:
+        kind (str): 'json' for a record_from_dict payload or 'xlsx' for the
+            bytes of an input sheet
+        payload (dict or bytes): ship inputs
+
+    Returns:
+        dict: result row with the keys of runner_functions.RESULT_FIELDS
+    """
+    if kind == 'xlsx':
+        record = read_input(io.BytesIO(payload))
+    else:
+        record = record_from_dict(payload)
+    return _json_safe(result_row(record))
+
+def calculate_batch(payloads:list)->list:
+    """calculate a chunk of ships from record_from_dict payloads
+
+    Ships that fail get a row with only an 'error' field, so a single bad
+    ship does not fail the whole batch.
+
+    Args:
+        payloads (list): ship inputs as accepted by record_from_dict
+
+    Returns:
+        list: result rows in the order of payloads
+    """
+    rows = []
+    for payload in payloads:
+        try:
+            rows.append(calculate('json', payload))
+        except Exception as e:
+            rows.append({'error': '{}: {}'.format(type(e).__name__, e)})
+    return rows
+
+class LatencyMetrics:
+    """request counts and latencies per endpoint
+
+    Attributes:
+        window (int): number of most recent requests kept per endpoint for
+            the latency percentiles
+    """
+    def __init__(self, window:int=1000):
+        self.window = window
+        self.latencies = defaultdict(lambda: deque(maxlen=window))
+        self.counts = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route:str, status:int, seconds:float):
+        """record a finished request
+
+        Args:
+            route (str): endpoint path
+            status (int): HTTP status returned
+            seconds (float): time from reading the request to sending the
+                response
+        """
+        self.latencies[route].append(seconds * 1e3)
+        self.counts[route][status] += 1
+
+    def summary(self)->dict:
+        """latency percentiles in ms and counts by status per endpoint
+
+        Returns:
+            dict: endpoint to its statistics
+        """
+        out = {}
+        for route, latencies in self.latencies.items():
+            ms = np.fromiter(latencies, dtype=float)
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            out[route] = {'requests': sum(self.counts[route].values()),
+                          'status': {str(k): v for k, v in self.counts[route].items()},
+                          'mean_ms': ms.mean(), 'p50_ms': p50, 'p95_ms': p95,
+                          'p99_ms': p99, 'max_ms': ms.max()}
+        return out
+
+class EEDIService:
+    """asyncio HTTP server dispatching calculations to a worker pool
+
+    Attributes:
+        workers (int): size of the worker pool
+        max_pending (int): calculations allowed in the pool at once
+        pending (int): calculations currently in the pool
+        metrics (LatencyMetrics): request statistics
+    """
+    def __init__(self, workers:int=None, max_pending:int=None, threads:bool=False,
+                 max_body:int=MAX_BODY, max_batch:int=MAX_BATCH, cache:str=None):
+        """
+        Args:
+            workers (int, optional): number of workers. Defaults to
+                os.cpu_count().
+            max_pending (int, optional): calculations accepted at once before
+                requests are refused with 503. Defaults to 4 per worker.
+            threads (bool, optional): use a thread pool instead of a process
+                pool. Defaults to False.
+            max_body (int, optional): largest request body in bytes.
+                Defaults to MAX_BODY.
+            max_batch (int, optional): most ships in one batch request.
+                Defaults to MAX_BATCH.
+            cache (str, optional): result store shared by the workers, see
+                cache_functions.open_store. Defaults to None.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.workers
+        self.threads = threads
+        self.max_body = max_body
+        self.max_batch = max_batch
+        self.cache = cache
+        self.pending = 0
+        self.metrics = LatencyMetrics()
+        self.executor = None
+        self.server = None
+        self._previous_cache = None
+
+    async def start(self, host:str='127.0.0.1', port:int=8000):
+        """start the worker pool and listen for connections
+
+        Args:
+            host (str, optional): address to bind. Defaults to '127.0.0.1'.
+            port (int, optional): port to bind, 0 for any free port.
+                Defaults to 8000.
+        """
+        if self.threads:
+            if self.cache:
+                self._previous_cache = result_cache()
+                install(self.cache)
+            self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        else:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=install if self.cache else None,
+                initargs=(self.cache,) if self.cache else ())
+        self.server = await asyncio.start_server(self._connection, host, port)
+        return self.server
+
+    @property
+    def port(self)->int:
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """stop listening and shut down the worker pool"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            if self.threads and self.cache:
+                #the thread pool shared the process cache, hand it back
+                set_result_cache(self._previous_cache)
+
+    async def _run(self, fn, items:list)->list:
+        #every item is one task in the pool
+        n = len(items)
+        if self.pending + n > self.max_pending:
+            raise RequestError(503, 'calculation pool is full, retry later')
+        self.pending += n
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.gather(*[loop.run_in_executor(self.executor, fn, *item)
+                                          for item in items])
+        finally:
+            self.pending -= n
+
+    def _ship_payload(self, headers:dict, body:bytes)->tuple:
+        content_type = headers.get('content-type', 'application/json').split(';')[0].strip()
+        if content_type in XLSX_TYPES:
+            return 'xlsx', body
+        if content_type == 'multipart/form-data':
+            message = BytesParser(policy=HTTP).parsebytes(
+                b'Content-Type: ' + headers['content-type'].encode() + b'\r\n\r\n' + body)
+            for part in message.iter_parts():
+                if part.get_filename():
+                    return 'xlsx', part.get_payload(decode=True)
+            raise RequestError(400, 'multipart upload without a file')
+        return 'json', self._json(body)
+
+    @staticmethod
+    def _json(body:bytes):
+        try:
+            return json.loads(body or b'{}')
+        except ValueError as e:
+            raise RequestError(400, 'invalid JSON: {}'.format(e))
+
+    async def _route(self, method:str, path:str, headers:dict, body:bytes)->tuple:
+        if path == '/health':
+            return 200, {'status': 'ok'}
+        if path == '/metrics':
+            return 200, {'pending': self.pending, 'max_pending': self.max_pending,
+                         'workers': self.workers, 'endpoints': self.metrics.summary()}
+        if path not in ('/eedi', '/batch'):
+            raise RequestError(404, 'unknown endpoint {}'.format(path))
+        if method != 'POST':
+            raise RequestError(405, '{} only accepts POST'.format(path))
+
+        if path == '/eedi':
+            kind, payload = self._ship_payload(headers, body)
+            row, = await self._run(calculate, [(kind, payload)])
+            return 200, row
+
+        data = self._json(body)
+        ships = data.get('ships') if isinstance(data, dict) else data
+        if not isinstance(ships, list):
+            raise RequestError(400, 'batch body must be {"ships": [...]}')
+        if len(ships) > self.max_batch:
+            raise RequestError(413, 'batch of {} ships is larger than the limit of {}'
+                               .format(len(ships), self.max_batch))
+        #one chunk of ships per worker
+        n_chunks = max(min(len(ships), self.workers, self.max_pending), 1)
+        bounds = np.linspace(0, len(ships), n_chunks + 1).astype(int)
+        chunks = await self._run(calculate_batch, [(ships[a:b],) for a, b in
+                                                   zip(bounds[:-1], bounds[1:])])
+        return 200, {'results': [row for rows in chunks for row in rows]}
+
+    async def _read_request(self, reader:asyncio.StreamReader)->tuple:
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode('latin-1').split()
+        except ValueError:
+            raise RequestError(400, 'malformed request line')
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length', 0) or 0)
+        if length > self.max_body:
+            raise RequestError(413, 'request body larger than {} bytes'.format(self.max_body))
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target.split('?')[0], version, headers, body
+
+    async def _connection(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter):
+        try:
+            while True:
+                start = time.perf_counter()
+                keep_alive = False
+                path = 'invalid'
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, version, headers, body = request
+                    keep_alive = (headers.get('connection', '').lower() != 'close'
+                                  and version == 'HTTP/1.1')
+                    status, payload = await self._route(method, path, headers, body)
+                except RequestError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except Exception as e:
+                    status = 422 if path in ('/eedi', '/batch') else 500
+                    payload = {'error': '{}: {}'.format(type(e).__name__, e)}
+
+                data = json.dumps(_json_safe(payload)).encode()
+                head = ['HTTP/1.1 {} {}'.format(status, REASONS.get(status, '')),
+                        'Content-Type: application/json',
+                        'Content-Length: {}'.format(len(data)),
+                        'Connection: {}'.format('keep-alive' if keep_alive else 'close')]
+                if status == 503:
+                    head.append('Retry-After: 1')
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode() + data)
+                await writer.drain()
+                self.metrics.record(path if path in ROUTES else 'other', status,
+                                    time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(host:str='127.0.0.1', port:int=8000, workers:int=None,
+                max_pending:int=None, threads:bool=False, cache:str=None):
+    """run the service until cancelled
+
+    Args:
+        host (str, optional): address to bind. Defaults to '127.0.0.1'.
+        port (int, optional): port to bind. Defaults to 8000.
+        workers (int, optional): number of workers. Defaults to os.cpu_count().
+        max_pending (int, optional): calculations accepted at once. Defaults
+            to 4 per worker.
+        threads (bool, optional): use a thread pool. Defaults to False.
+        cache (str, optional): result store shared by the workers. Defaults
+            to None.
+    """
+    service = EEDIService(workers=workers, max_pending=max_pending, threads=threads,
+                          cache=cache)
+    server = await service.start(host, port)
+    print('serving on http://{}:{}'.format(host, service.port))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='serve the EEDI calculation over HTTP')
+    parser.add_argument('--host', default='127.0.0.1', help='address to bind')
+    parser.add_argument('--port', type=int, default=8000, help='port to bind')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='number of workers (default: all cpus)')
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help='calculations accepted at once (default: 4 per worker)')
+    parser.add_argument('--threads', action='store_true',
+                        help='use a thread pool instead of a process pool')
+    parser.add_argument('--cache', default=None,
+                        help='result store reused across runs, a .sqlite file or a directory')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_pending,
+                          args.threads, args.cache))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,235 @@
+import numpy as np
+import pandas as pd
+
+import batch_functions as bf
+from reference_functions import meets, required_eedi
+
+# Inverse calculation: the value of one design variable at which a ship just
+# meets the required EEDI of a target phase. The whole fleet is bisected at
+# once, each step being one call of compute_eedi_batch, so the engine power
+# limitation needed by thousands of ships is found in a few dozen batch runs.
+#
+#   ships, engines = fleet_tables(records)
+#   epl = solve(ships, engines, 'limited_power', phase = 3)
+
+# variable: whether the smallest ('min') or largest ('max') value meeting the
+# target is wanted
+VARIABLES = {'v_ref': 'min',
+             'mcr': 'max',
+             'limited_power': 'max',
+             'p_pto_rated': 'max'}
+
+# search interval, knots for v_ref and fractions of the installed main engine
+# mcr for the power variables
+BOUNDS = {'v_ref': (1., 40.),
+          'mcr': (0.01, 2.),
+          'limited_power': (0.01, 1.),
+          'p_pto_rated': (0., 1.)}
+
+def _arrays(table)->dict:
+    return {x: np.asarray(table[x]) for x in table}
+
+def set_variable(ships:dict, engines:dict, variable:str, value:np.ndarray)->tuple:
+    """set a design variable of every ship
+
+    Main engine mcr and engine power limitation are given for the whole
+    ship and shared between its main engines in proportion to their mcr.
+
+    Args:
+        ships (dict): ship arrays as built by fleet_tables
+        engines (dict): engine arrays as built by fleet_tables
+        variable (str): one of VARIABLES
+        value (np.ndarray): new value of each ship. v_ref in knots, the
+            other variables in kW
+
+    Returns:
+        tuple: ships, engines with the variable changed. Arrays that are not
+            changed are shared with the inputs
+    """
+    ships, engines = dict(ships), dict(engines)
+    value = np.asarray(value, dtype=float)
+    if variable == 'v_ref':
+        #the override is used instead of v_ref when the ship has a PTO or PTI
+        ships['v_ref'] = value
+        ships['v_ref_override'] = value
+    elif variable == 'p_pto_rated':
+        ships['p_pto_rated'] = value
+    elif variable in ('mcr', 'limited_power'):
+        ship = np.asarray(engines['ship'], dtype=np.int64)
+        is_me = np.asarray(engines['kind']) == 'me'
+        mcr = np.asarray(engines['mcr'], dtype=float)
+        mcr_me = np.bincount(ship, weights=np.where(is_me, mcr, 0.),
+                             minlength=len(value))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            share = mcr * (value / mcr_me)[ship]
+        engines[variable] = np.where(is_me, share, engines[variable])
+    else:
+        raise ValueError('variable must be one of {}, got {}'.format(
+            ', '.join(VARIABLES), variable))
+    return ships, engines
+
+def current_value(ships:dict, engines:dict, variable:str,
+                  result:pd.DataFrame)->np.ndarray:
+    """value of a design variable as used in the calculation
+
+    Args:
+        ships (dict): ship arrays as built by fleet_tables
+        engines (dict): engine arrays as built by fleet_tables
+        variable (str): one of VARIABLES
+        result (pd.DataFrame): compute_eedi_batch result of the ships
+
+    Returns:
+        np.ndarray: value of each ship, total of the main engines for mcr
+            and limited_power
+    """
+    if variable == 'v_ref':
+        return result['v_ref'].to_numpy()
+    if variable == 'p_pto_rated':
+        return np.asarray(ships['p_pto_rated'], dtype=float)
+    ship = np.asarray(engines['ship'], dtype=np.int64)
+    is_me = np.asarray(engines['kind']) == 'me'
+    return np.bincount(ship, weights=np.where(is_me, np.asarray(engines[variable],
+                                                                dtype=float), 0.),
+                       minlength=len(result))
+
+def speed_at_power(ships:dict, p_me_deduct:np.ndarray)->np.ndarray:
+    """reference speed from the speed-power relation of update_vref
+
+    Args:
+        ships (dict): ship arrays as built by fleet_tables
+        p_me_deduct (np.ndarray): main engine power corrected for PTO and PTI
+            in kW
+
+    Returns:
+        np.ndarray: speed in knots, 0 when the power gives no speed and NaN
+            for ships without a speed-power relation
+    """
+    n = len(p_me_deduct)
+    col = lambda x: np.asarray(ships[x], dtype=float)
+    equ = bf._code(np.asarray(ships['speed_power_equ']), bf.SPEED_POWER_EQUS)
+    a, b, c = col('speed_power_a'), col('speed_power_b'), col('speed_power_c')
+    v = bf.update_vref(v_ref = np.full(n, np.nan),
+                       p_me_deduct = p_me_deduct,
+                       p_sm_rated = np.ones(n),
+                       p_pto_rated = np.zeros(n),
+                       v_ref_override = np.zeros(n),
+                       speed_power_equ = equ,
+                       speed_power_a = a,
+                       speed_power_b = b,
+                       speed_power_c = c)
+    #the coefficients each equation divides by
+    nonzero = lambda x: np.isfinite(x) & (x != 0)
+    has_relation = np.select([equ == 0, equ == 1, equ == 2],
+                             [nonzero(a) & nonzero(b),
+                              nonzero(b),
+                              nonzero(b) & nonzero(c)],
+                             False)
+    v = np.where(np.isfinite(v) & (v > 0), v, 0.)
+    return np.where(has_relation, v, np.nan)
+
+def evaluate(ships:dict, engines:dict, variable:str, value:np.ndarray,
+             update_speed:bool=False)->pd.DataFrame:
+    """calculate the EEDI of every ship with a design variable changed
+
+    Args:
+        ships (dict): ship arrays as built by fleet_tables
+        engines (dict): engine arrays as built by fleet_tables
+        variable (str): one of VARIABLES
+        value (np.ndarray): new value of each ship
+        update_speed (bool, optional): for the power variables, take the
+            reference speed from the speed-power relation at the new power
+            instead of the input v_ref. Ships without a speed-power relation
+            keep their v_ref, a power that gives no speed makes the ship
+            non-compliant. Defaults to False.
+
+    Returns:
+        pd.DataFrame: compute_eedi_batch result
+    """
+    ships, engines = set_variable(ships, engines, variable, value)
+    #the bounds of a search often give zero powers, keep their NaN quiet
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = bf.compute_eedi_batch(ships, engines)
+        if update_speed and variable in ('mcr', 'limited_power'):
+            v = speed_at_power(ships, result['p_me_deduct'].to_numpy())
+            ships['v_ref'] = np.where(np.isnan(v), np.asarray(ships['v_ref'], dtype=float), v)
+            ships['v_ref_override'] = np.where(np.isnan(v), ships['v_ref_override'], v)
+            result = bf.compute_eedi_batch(ships, engines)
+    return result
+
+def solve(ships, engines, variable:str, phase:int=3, bounds:tuple=None,
+          tol:float=1e-6, with_tech:bool=True, update_speed:bool=False)->pd.DataFrame:
+    """find the value of a design variable at which each ship meets a phase
+
+    The variable is bisected between the bounds for all ships at once. The
+    returned value always lies on the compliant side of the boundary.
+
+    Args:
+        ships (pd.DataFrame or dict): ships as built by fleet_tables
+        engines (pd.DataFrame or dict): engines as built by fleet_tables
+        variable (str): 'v_ref' for the minimum reference speed, 'mcr' for
+            the maximum installed main engine power, 'limited_power' for the
+            maximum engine power limitation or 'p_pto_rated' for the maximum
+            shaft generator rating
+        phase (int, optional): target phase of reduction_table.csv.
+            Defaults to 3.
+        bounds (tuple, optional): lower and upper limit of the search,
+            scalars or one value per ship. Defaults to BOUNDS, knots for
+            v_ref and fractions of the installed main engine mcr otherwise.
+        tol (float, optional): width of the final interval relative to the
+            bounds. Defaults to 1e-6.
+        with_tech (bool, optional): compare eedi_with_tech instead of
+            eedi_no_tech with the required EEDI. Defaults to True.
+        update_speed (bool, optional): passed to evaluate. Defaults to False.
+
+    Returns:
+        pd.DataFrame: one row per ship with the current value, the solution
+            (NaN when no value within the bounds meets the phase), the
+            attained EEDI at the solution and the required EEDI
+    """
+    goal = VARIABLES.get(variable)
+    if goal is None:
+        raise ValueError('variable must be one of {}, got {}'.format(
+            ', '.join(VARIABLES), variable))
+    index = getattr(ships, 'index', None)
+    ships, engines = _arrays(ships), _arrays(engines)
+    column = 'eedi_with_tech' if with_tech else 'eedi_no_tech'
+
+    base = bf.compute_eedi_batch(ships, engines)
+    current = current_value(ships, engines, variable, base)
+    required = required_eedi(ships['ship_type'], base['capacity'].to_numpy(),
+                             np.asarray(ships['gt'], dtype=float))[..., phase]
+
+    lower, upper = BOUNDS[variable] if bounds is None else bounds
+    lower = np.broadcast_to(np.asarray(lower, dtype=float), current.shape)
+    upper = np.broadcast_to(np.asarray(upper, dtype=float), current.shape)
+    if bounds is None and variable != 'v_ref':
+        mcr_me = base['mcr_me'].to_numpy()
+        lower, upper = lower * mcr_me, upper * mcr_me
+
+    def met_at(value):
+        #a negative EEDI from innovative technology is compliant
+        result = evaluate(ships, engines, variable, value, update_speed)
+        return meets(result[column], result['v_ref'], required)
+
+    #bisect from the compliant towards the non-compliant end of the interval
+    good, bad = (upper, lower) if goal == 'min' else (lower, upper)
+    searchable = upper > lower
+    meets_bad = met_at(bad) & searchable
+    meets_good = met_at(good) & searchable
+    good = np.where(meets_bad, bad, good)
+    solvable = meets_good & ~meets_bad
+    for i in range(int(np.ceil(np.log2(1 / tol)))):
+        mid = (good + bad) / 2
+        ok = met_at(mid)
+        good = np.where(solvable & ok, mid, good)
+        bad = np.where(solvable & ~ok, mid, bad)
+    solution = np.where(meets_good | meets_bad, good, np.nan)
+
+    attained = evaluate(ships, engines, variable, np.where(np.isnan(solution),
+                                                           current, solution),
+                        update_speed)[column].to_numpy()
+    return pd.DataFrame({'current': current,
+                         'solution': solution,
+                         'attained': np.where(np.isnan(solution), np.nan, attained),
+                         'required': required},
+                        index=index)
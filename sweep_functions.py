@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+from batch_functions import FUEL_COLUMNS, fleet_tables, compute_eedi_batch
+from fuel_functions import fuel_codes
+
+# Design-space sweeps of a single ship. The base ship is expanded over the
+# Cartesian product of the grids chunk by chunk, so only chunk_size rows of
+# the ships and engines tables exist at any time, and each chunk is run
+# through compute_eedi_batch.
+
+RESULT_COLUMNS = ['eedi_no_tech', 'eedi_with_tech', 'v_ref', 'p_me', 'p_ae',
+                  'capacity']
+
+def _grid_arrays(grid:dict, ships:dict, engines:dict)->list:
+    axes = []
+    for name, values in grid.items():
+        values = np.atleast_1d(np.asarray(values))
+        if values.ndim != 1 or len(values) == 0:
+            raise ValueError('grid for {} must be a non-empty 1d sequence'.format(name))
+        kind, _, column = name.rpartition('.')
+        if kind in ('me', 'ae'):
+            if column not in engines:
+                raise ValueError('unknown engine column {}'.format(column))
+        elif kind or name not in ships:
+            raise ValueError('unknown sweep parameter {}'.format(name))
+        axes.append((name, kind, column, values))
+    return axes
+
+def sweep_size(grid:dict)->int:
+    """number of points in the Cartesian product of the grids
+
+    Args:
+        grid (dict): parameter name to sequence of values
+
+    Returns:
+        int: number of grid points
+    """
+    return int(np.prod([len(np.atleast_1d(v)) for v in grid.values()], dtype=np.int64))
+
+def iter_sweep(base, grid:dict, chunk_size:int=100000, columns:list=None):
+    """evaluate the EEDI over the Cartesian product of the grids in chunks
+
+    Args:
+        base (tuple): ShipRecord (or (df_inpt, cf_dict, df_me, df_ae)) of the
+            base ship
+        grid (dict): parameter name to sequence of values. Names are ship
+            parameters of load_variables such as 'v_ref', 'speed_power_a' or
+            'dwt', or engine columns prefixed with 'me.' or 'ae.' such as
+            'me.mcr', which set the column of every engine of that kind.
+        chunk_size (int, optional): number of grid points evaluated at once.
+            Defaults to 100000.
+        columns (list, optional): result columns of compute_eedi_batch to
+            keep. Defaults to RESULT_COLUMNS.
+
+    Yields:
+        pd.DataFrame: one row per grid point with the grid values, the
+            ship_type and gt of the base ship unless swept, and the result
+            columns, indexed by the position of the point in the product.
+            Result columns that are also swept, such as v_ref after
+            update_vref, get the suffix '_calc'.
+    """
+    columns = RESULT_COLUMNS if columns is None else list(columns)
+    ships, engines = fleet_tables([base])
+    cf_dict = base[1]
+    ships = {x: ships[x].to_numpy() for x in ships.columns}
+    engines = {x: engines[x].to_numpy() for x in engines.columns}
+    axes = _grid_arrays(grid, ships, engines)
+    shape = tuple(len(values) for name, kind, column, values in axes)
+    n_points = sweep_size(grid)
+    n_eng = len(engines['ship'])
+    is_kind = {k: engines['kind'] == k for k in ('me', 'ae')}
+
+    for start in range(0, n_points, chunk_size):
+        stop = min(start + chunk_size, n_points)
+        n = stop - start
+        positions = np.unravel_index(np.arange(start, stop), shape)
+
+        chunk_ships = {x: np.broadcast_to(v, (n,)) for x, v in ships.items()}
+        chunk_engines = {x: np.tile(v, n) for x, v in engines.items()}
+        chunk_engines['ship'] = np.repeat(np.arange(n), n_eng)
+        out = {}
+        for (name, kind, column, values), pos in zip(axes, positions):
+            out[name] = values[pos]
+            if kind:
+                col = chunk_engines[column]
+                if col.dtype.kind in 'iuf' and values.dtype.kind in 'iuf':
+                    col = col.astype(np.result_type(col, values))
+                else:
+                    col = col.astype(object)
+                mask = np.tile(is_kind[kind], n)
+                col[mask] = np.repeat(values[pos], is_kind[kind].sum())
+                chunk_engines[column] = col
+                if column.endswith('_fuel_type'):
+                    #keep the fuel codes, lcv and cf of fleet_tables in step
+                    #with the names, from the cf table of the base ship
+                    fuel = column[:-len('_fuel_type')]
+                    chunk_engines[fuel + '_fuel_code'] = fuel_codes(col)
+                    for derived, index in FUEL_COLUMNS[fuel]:
+                        fuel_values = np.array([cf_dict.get(x, (np.nan, np.nan))[index]
+                                                for x in values], dtype=float)
+                        derived_col = chunk_engines[derived].astype(float)
+                        derived_col[mask] = np.repeat(fuel_values[pos], is_kind[kind].sum())
+                        chunk_engines[derived] = derived_col
+            else:
+                chunk_ships[column] = values[pos]
+
+        #ship_type and gt as in the chunks of iter_eedi_batch, for compliant()
+        for x in ('ship_type', 'gt'):
+            out.setdefault(x, chunk_ships[x])
+        result = compute_eedi_batch(chunk_ships, chunk_engines)
+        out.update({(x + '_calc' if x in grid else x): result[x].to_numpy()
+                    for x in columns})
+        yield pd.DataFrame(out, index=pd.RangeIndex(start, stop))
+
+def sweep(base, grid:dict, chunk_size:int=100000, columns:list=None)->pd.DataFrame:
+    """evaluate the EEDI over the Cartesian product of the grids
+
+    Args:
+        base (tuple): ShipRecord of the base ship
+        grid (dict): parameter name to sequence of values, see iter_sweep
+        chunk_size (int, optional): number of grid points evaluated at once.
+            Defaults to 100000.
+        columns (list, optional): result columns to keep. Defaults to
+            RESULT_COLUMNS.
+
+    Returns:
+        pd.DataFrame: tidy table with one row per grid point
+    """
+    return pd.concat(list(iter_sweep(base, grid, chunk_size=chunk_size,
+                                     columns=columns)))
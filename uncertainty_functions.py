@@ -0,0 +1,242 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from batch_functions import fleet_tables, compute_eedi_batch
+from reference_functions import PHASES, meets, required_eedi
+
+# Monte Carlo propagation of input uncertainty. Every sample of the uncertain
+# inputs is one row of the batch tables, so N samples of a ship are evaluated
+# by compute_eedi_batch in chunks and the attained EEDI comes out as a
+# distribution rather than a single value.
+#
+#   mc = monte_carlo(record, {'v_ref': normal(0.2),
+#                             'me.sfc_liquid_fuel': normal(0.02, relative=True),
+#                             'cf.heavy_fuel_oil': uniform(-0.01, 0.01)},
+#                    n = 1000000)
+#   mc.percentiles, mc.phase_probability
+
+PERCENTILES = (5, 25, 50, 75, 95)
+RESULT_COLUMNS = ['eedi_no_tech', 'eedi_with_tech', 'capacity', 'v_ref']
+
+# cf table prefix: position of the value in cf_dict, engine columns holding
+# it and the fuel type column selecting the engines
+FUEL_COLUMNS = {'lcv': (0, [('gas_fuel_type', 'lcv_gas_fuel')]),
+                'cf': (1, [('liquid_fuel_type', 'cf_liquid_fuel'),
+                           ('pilot_fuel_type', 'cf_pilot_fuel'),
+                           ('gas_fuel_type', 'cf_gas_fuel')])}
+
+class Distribution(NamedTuple):
+    """error added to the value of an input
+
+    Attributes:
+        kind (str): 'normal', 'uniform' or 'triangular'
+        a (float): standard deviation for 'normal', lower limit otherwise
+        b (float): upper limit for 'uniform' and 'triangular'
+        relative (bool): a and b are fractions of the value instead of
+            absolute errors
+    """
+    kind: str
+    a: float
+    b: float = np.nan
+    relative: bool = False
+
+    def sample(self, rng:np.random.Generator, value:np.ndarray)->np.ndarray:
+        """draw one sample for each element of value
+
+        Args:
+            rng (np.random.Generator): random number generator
+            value (np.ndarray): nominal values
+
+        Returns:
+            np.ndarray: sampled values with the shape of value
+        """
+        value = np.asarray(value, dtype=float)
+        if self.kind == 'normal':
+            error = rng.normal(0., self.a, value.shape)
+        elif self.kind == 'uniform':
+            error = rng.uniform(self.a, self.b, value.shape)
+        elif self.kind == 'triangular':
+            error = rng.triangular(self.a, 0., self.b, value.shape)
+        else:
+            raise ValueError('unknown distribution {}'.format(self.kind))
+        return value * (1 + error) if self.relative else value + error
+
+def normal(sd:float, relative:bool=False)->Distribution:
+    """normally distributed error with mean 0
+
+    Args:
+        sd (float): standard deviation
+        relative (bool, optional): sd is a fraction of the value.
+            Defaults to False.
+
+    Returns:
+        Distribution: error distribution
+    """
+    return Distribution('normal', sd, relative=relative)
+
+def uniform(low:float, high:float, relative:bool=False)->Distribution:
+    """uniformly distributed error between low and high
+
+    Args:
+        low (float): lower limit of the error
+        high (float): upper limit of the error
+        relative (bool, optional): limits are fractions of the value.
+            Defaults to False.
+
+    Returns:
+        Distribution: error distribution
+    """
+    return Distribution('uniform', low, high, relative)
+
+def triangular(low:float, high:float, relative:bool=False)->Distribution:
+    """triangular error between low and high with its mode at 0
+
+    Args:
+        low (float): lower limit of the error
+        high (float): upper limit of the error
+        relative (bool, optional): limits are fractions of the value.
+            Defaults to False.
+
+    Returns:
+        Distribution: error distribution
+    """
+    return Distribution('triangular', low, high, relative)
+
+class MonteCarloResult(NamedTuple):
+    """attained EEDI distribution of a ship
+
+    Attributes:
+        samples (pd.DataFrame): one row per sample with the result columns
+            and the required EEDI of phases 0 to 3
+        percentiles (pd.DataFrame): percentiles of the result columns, one
+            row per percentile
+        phase_probability (pd.Series): share of the samples whose
+            eedi_with_tech meets the required EEDI of each phase
+    """
+    samples: pd.DataFrame
+    percentiles: pd.DataFrame
+    phase_probability: pd.Series
+
+def _targets(distributions:dict, ships:dict, engines:dict)->list:
+    targets = []
+    for name, dist in distributions.items():
+        kind, _, column = name.rpartition('.')
+        if kind in ('me', 'ae'):
+            if column not in engines:
+                raise ValueError('unknown engine column {}'.format(column))
+        elif kind in FUEL_COLUMNS:
+            if not any((engines[fuel_type] == column).any()
+                       for fuel_type, col in FUEL_COLUMNS[kind][1]):
+                raise ValueError('no engine uses the fuel {}'.format(column))
+        elif kind or name not in ships:
+            raise ValueError('unknown uncertain input {}'.format(name))
+        targets.append((name, kind, column, dist))
+    return targets
+
+def iter_samples(base, distributions:dict, n:int, seed:int=0,
+                 chunk_size:int=100000, columns:list=None):
+    """evaluate the EEDI for random samples of the uncertain inputs in chunks
+
+    Args:
+        base (tuple): ShipRecord (or (df_inpt, cf_dict, df_me, df_ae)) of the
+            ship
+        distributions (dict): input name to Distribution. Names are ship
+            parameters of load_variables such as 'v_ref' or 'dwt', engine
+            columns prefixed with 'me.' or 'ae.' such as 'me.mcr' or
+            'ae.sfc_liquid_fuel', sampled independently for every engine, or
+            fuel names prefixed with 'cf.' or 'lcv.' for the values of the cf
+            table, shared by every engine using the fuel
+        n (int): number of samples
+        seed (int, optional): random seed. Defaults to 0.
+        chunk_size (int, optional): number of samples evaluated at once.
+            Defaults to 100000.
+        columns (list, optional): result columns of compute_eedi_batch to
+            keep. Defaults to RESULT_COLUMNS.
+
+    Yields:
+        pd.DataFrame: one row per sample with the sampled ship parameters,
+            the ship_type and gt of the base ship unless sampled, and the
+            result columns. Result columns that are also sampled, such as
+            v_ref, get the suffix '_calc'.
+    """
+    columns = RESULT_COLUMNS if columns is None else list(columns)
+    rng = np.random.default_rng(seed)
+    ships, engines = fleet_tables([base])
+    ships = {x: ships[x].to_numpy() for x in ships.columns}
+    engines = {x: engines[x].to_numpy() for x in engines.columns}
+    targets = _targets(distributions, ships, engines)
+    n_eng = len(engines['ship'])
+
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        m = stop - start
+        chunk_ships = {x: np.broadcast_to(v, (m,)) for x, v in ships.items()}
+        chunk_engines = {x: np.tile(v, m) for x, v in engines.items()}
+        chunk_engines['ship'] = np.repeat(np.arange(m), n_eng)
+        out = {}
+
+        for name, kind, column, dist in targets:
+            if kind in ('me', 'ae'):
+                mask = chunk_engines['kind'] == kind
+                col = chunk_engines[column].astype(float)
+                col[mask] = dist.sample(rng, col[mask])
+                chunk_engines[column] = col
+            elif kind:
+                #one value per sample for every engine burning the fuel
+                position, fuel_columns = FUEL_COLUMNS[kind]
+                value = dist.sample(rng, np.full(m, base[1][column][position]))
+                value = np.repeat(value, n_eng)
+                for fuel_type, col in fuel_columns:
+                    chunk_engines[col] = np.where(chunk_engines[fuel_type] == column,
+                                                  value, chunk_engines[col])
+            else:
+                chunk_ships[column] = out[column] = dist.sample(rng, chunk_ships[column])
+
+        #ship_type and gt as in the chunks of iter_eedi_batch, for compliant()
+        for x in ('ship_type', 'gt'):
+            out.setdefault(x, chunk_ships[x])
+        result = compute_eedi_batch(chunk_ships, chunk_engines)
+        out.update({(x + '_calc' if x in out else x): result[x].to_numpy()
+                    for x in columns})
+        yield pd.DataFrame(out, index=pd.RangeIndex(start, stop))
+
+def monte_carlo(base, distributions:dict, n:int=100000, seed:int=0,
+                chunk_size:int=100000,
+                percentiles:tuple=PERCENTILES)->MonteCarloResult:
+    """propagate input uncertainty through the EEDI calculation
+
+    Args:
+        base (tuple): ShipRecord of the ship
+        distributions (dict): input name to Distribution, see iter_samples
+        n (int, optional): number of samples. Defaults to 100000.
+        seed (int, optional): random seed. Defaults to 0.
+        chunk_size (int, optional): number of samples evaluated at once.
+            Defaults to 100000.
+        percentiles (tuple, optional): percentiles to report.
+            Defaults to PERCENTILES.
+
+    Returns:
+        MonteCarloResult: samples, percentiles and probability of meeting each
+            phase. Samples that could not be calculated are NaN, ignored in
+            the percentiles and counted as not meeting a phase
+    """
+    samples = pd.concat(list(iter_samples(base, distributions, n, seed=seed,
+                                          chunk_size=chunk_size)))
+    ship_type = base[0]['ship_type'].iloc[0]
+    gt = samples['gt'] if 'gt' in samples else base[0]['gt'].iloc[0]
+    required = required_eedi(ship_type, samples['capacity'].to_numpy(), gt)
+    for p in PHASES:
+        samples['required_phase_{}'.format(p)] = required[:, p]
+
+    attained = samples['eedi_with_tech'].to_numpy()
+    v_ref = samples['v_ref_calc' if 'v_ref_calc' in samples else 'v_ref'].to_numpy()
+    met = meets(attained[:, None], v_ref[:, None], required)
+    phase_probability = pd.Series(met.mean(axis=0),
+                                  index=['phase_{}'.format(p) for p in PHASES])
+    values = samples[['eedi_no_tech', 'eedi_with_tech']].to_numpy()
+    table = pd.DataFrame(np.nanpercentile(values, percentiles, axis=0),
+                         index=pd.Index(percentiles, name='percentile'),
+                         columns=['eedi_no_tech', 'eedi_with_tech'])
+    return MonteCarloResult(samples, table, phase_probability)
@@ -0,0 +1,254 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from reference_functions import meets, required_eedi
+
+# Streaming output of chunked calculations. Chunks yielded by iter_sweep,
+# iter_samples or iter_eedi_batch are written to a csv or Parquet file as they
+# arrive, so a million point sweep never exists as a single DataFrame. Rows
+# are buffered until flush_rows rows or flush_seconds seconds have collected,
+# and can be filtered on the way, e.g. to the compliant rows or to the Pareto
+# front of a few result columns.
+#
+#   write_results(iter_sweep(base, grid), 'sweep.parquet',
+#                 keep = compliant(phase = 3),
+#                 pareto = {'eedi_with_tech': 'min', 'v_ref': 'max'})
+#
+# Parquet files need pyarrow, which is imported only when one is written.
+
+FORMATS = ('csv', 'parquet')
+
+def compliant(phase:int=3, column:str='eedi_with_tech', ship_type:str=None,
+              gt:float=np.nan):
+    """filter keeping the rows that meet the required EEDI of a phase
+
+    Args:
+        phase (int, optional): phase of reduction_table.csv. Defaults to 3.
+        column (str, optional): attained EEDI column. Defaults to
+            'eedi_with_tech'.
+        ship_type (str, optional): ship type of every row, taken from the
+            'ship_type' column of the chunks when None. Defaults to None.
+        gt (float, optional): gross tonnage of every row, taken from the 'gt'
+            column of the chunks when present. Defaults to NaN.
+
+    Rows meet the phase as in reference_functions.meets, with the reference
+    speed of the 'v_ref_calc' column of swept or sampled chunks, or of the
+    'v_ref' column otherwise.
+
+    Returns:
+        callable: function of a chunk returning a boolean mask of its rows
+
+    Raises:
+        ValueError: when a chunk has no 'ship_type' column and ship_type is
+            None
+    """
+    def keep(chunk:pd.DataFrame)->np.ndarray:
+        if ship_type is None and 'ship_type' not in chunk:
+            raise ValueError('compliant needs a ship_type column in the chunks '
+                             'or the ship_type argument')
+        types = chunk['ship_type'].to_numpy() if ship_type is None else ship_type
+        tonnage = chunk['gt'].to_numpy(dtype=float) if 'gt' in chunk else gt
+        required = required_eedi(types, chunk['capacity'].to_numpy(dtype=float),
+                                 tonnage)[..., phase]
+        v_ref = chunk['v_ref_calc' if 'v_ref_calc' in chunk else 'v_ref']
+        return meets(chunk[column], v_ref, required)
+    return keep
+
+def pareto_mask(values:np.ndarray)->np.ndarray:
+    """rows not dominated by any other row when every column is minimised
+
+    Rows with a missing value are never on the front. Identical rows are
+    all kept.
+
+    Args:
+        values (np.ndarray): one row per point, one column per objective
+
+    Returns:
+        np.ndarray: boolean mask of the rows on the Pareto front
+    """
+    values = np.asarray(values, dtype=float)
+    mask = np.zeros(len(values), dtype=bool)
+    rows = np.flatnonzero(np.isfinite(values).all(axis=1))
+    #the lexicographically smallest remaining point is never dominated
+    rows = rows[np.lexsort(values[rows].T[::-1])]
+    while len(rows):
+        best = values[rows[0]]
+        mask[rows[0]] = True
+        rest = values[rows[1:]]
+        dominated = (rest >= best).all(axis=1) & (rest > best).any(axis=1)
+        rows = rows[1:][~dominated]
+    return mask
+
+class ResultWriter:
+    """csv or Parquet file written chunk by chunk
+
+    Attributes:
+        path (str): output file
+        rows_in (int): rows passed to write
+        rows_written (int): rows written to the file
+        flushes (int): number of writes to the file
+    """
+    def __init__(self, path:str, flush_rows:int=100000, flush_seconds:float=30.,
+                 keep=None, pareto:dict=None, index:bool=True, format:str=None):
+        """
+        Args:
+            path (str): output file, replaced if it exists
+            flush_rows (int, optional): buffered rows that trigger a write.
+                Defaults to 100000.
+            flush_seconds (float, optional): time since the last write that
+                triggers a write. Defaults to 30.
+            keep (callable, optional): function of a chunk returning a
+                boolean mask of the rows to write, such as compliant().
+                Defaults to None.
+            pareto (dict, optional): column to 'min' or 'max'. Only the rows
+                on the Pareto front of these columns over all chunks are
+                written, when the writer is closed. Defaults to None.
+            index (bool, optional): write the index of the chunks, the grid
+                point of iter_sweep or the ship of iter_eedi_batch.
+                Defaults to True.
+            format (str, optional): one of FORMATS. Defaults to the
+                extension of path.
+        """
+        format = os.path.splitext(path)[1].lstrip('.').lower() if format is None else format
+        if format not in FORMATS:
+            raise ValueError('format must be one of {}, got {}'.format(
+                ', '.join(FORMATS), format))
+        if pareto is not None:
+            bad = [x for x in pareto.values() if x not in ('min', 'max')]
+            if bad:
+                raise ValueError('pareto directions must be min or max, got {}'.format(bad[0]))
+
+        self.path = path
+        self.format = format
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.keep = keep
+        self.pareto = pareto
+        self.index = index
+        self.rows_in = 0
+        self.rows_written = 0
+        self.flushes = 0
+        self._buffer = []
+        self._buffered = 0
+        self._front = None
+        self._columns = None
+        self._file = None
+        self._schema = None
+        self._closed = False
+        self._last_flush = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _objectives(self, df:pd.DataFrame)->np.ndarray:
+        #every objective as a column to minimise
+        return np.column_stack([df[x].to_numpy(dtype=float) * (1 if d == 'min' else -1)
+                                for x, d in self.pareto.items()])
+
+    def write(self, chunk:pd.DataFrame):
+        """add a chunk of rows, writing the buffer when a threshold is reached
+
+        Args:
+            chunk (pd.DataFrame): rows with the same columns as the previous
+                chunks
+        """
+        self.rows_in += len(chunk)
+        if self._columns is None:
+            self._columns = chunk.iloc[:0]
+        if self.keep is not None:
+            chunk = chunk[np.asarray(self.keep(chunk), dtype=bool)]
+        if self.pareto is not None:
+            #only the current front is kept, it is written on close
+            front = chunk if self._front is None else pd.concat([self._front, chunk])
+            self._front = front[pareto_mask(self._objectives(front))]
+            return
+        if len(chunk):
+            self._buffer.append(chunk)
+            self._buffered += len(chunk)
+        if (self._buffered >= self.flush_rows
+                or time.monotonic() - self._last_flush >= self.flush_seconds):
+            self.flush()
+
+    def flush(self):
+        """write the buffered rows to the file"""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        df = pd.concat(self._buffer) if len(self._buffer) > 1 else self._buffer[0]
+        self._buffer = []
+        self._buffered = 0
+        if self.format == 'csv':
+            self._write_csv(df)
+        else:
+            self._write_parquet(df)
+        self.rows_written += len(df)
+        self.flushes += 1
+
+    def _write_csv(self, df:pd.DataFrame):
+        header = self._file is None
+        if header:
+            self._file = open(self.path, 'w', newline='')
+        df.to_csv(self._file, header=header, index=self.index,
+                  index_label=df.index.name or 'index')
+        self._file.flush()
+
+    def _write_parquet(self, df:pd.DataFrame):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError('writing Parquet files needs pyarrow') from e
+        if self.index:
+            df = df.rename_axis(df.index.name or 'index').reset_index()
+        if self._file is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self._schema = table.schema
+            self._file = pq.ParquetWriter(self.path, self._schema)
+        else:
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        #every flush is one row group
+        self._file.write_table(table)
+
+    def close(self):
+        """write the remaining rows and close the file"""
+        if self._closed:
+            return
+        self._closed = True
+        if self.pareto is not None and self._front is not None:
+            self._buffer = [self._front]
+            self._front = None
+        self.flush()
+        if self._file is None:
+            #no rows were written, leave a file with the columns of the chunks
+            #and no rows, or an empty file when no chunk was written
+            if self._columns is None and self.format == 'csv':
+                open(self.path, 'w').close()
+            else:
+                empty = pd.DataFrame() if self._columns is None else self._columns
+                (self._write_csv if self.format == 'csv' else self._write_parquet)(empty)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def write_results(chunks, path:str, **kwargs)->int:
+    """stream chunks of results to a csv or Parquet file
+
+    Args:
+        chunks (iterable): pd.DataFrame chunks, such as those yielded by
+            iter_sweep, iter_samples or iter_eedi_batch
+        path (str): output file with a .csv or .parquet extension
+        **kwargs: passed to ResultWriter
+
+    Returns:
+        int: number of rows written
+    """
+    with ResultWriter(path, **kwargs) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+    return writer.rows_written